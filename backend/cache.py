@@ -0,0 +1,136 @@
+"""
+In-process Result Cache for Read Endpoints
+"""
+
+import sys
+import os
+import time
+import threading
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+# Add parent directory to path for config import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# Every cache created in this process, so they can be invalidated together
+_caches: List["TTLCache"] = []
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl_seconds: float = config.CACHE_TTL_SECONDS, maxsize: int = 256):
+        """
+        Args:
+            ttl_seconds: Lifetime of an entry in seconds
+            maxsize: Maximum number of entries kept (least recently used evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, threading.Lock] = {}
+        # Bumped by clear(), so computations started before it are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def _lookup(self, key: Hashable):
+        """Return (hit, value) for key; caller must hold self._lock"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value) for key without computing anything on a miss"""
+        with self._lock:
+            return self._lookup(key)
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        """Insert an entry and enforce maxsize; caller must hold self._lock"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing it on a miss
+
+        Concurrent misses on the same key wait for a single computation
+        instead of all hitting BigQuery at once
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                return value
+            key_lock = self._pending.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another caller may have filled the entry while we waited
+            with self._lock:
+                hit, value = self._lookup(key)
+                if hit:
+                    return value
+                generation = self._generation
+
+            try:
+                value = compute()
+                with self._lock:
+                    # A clear() during compute may have invalidated the inputs
+                    if self._generation == generation:
+                        self._store(key, value)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+            return value
+
+    def clear(self):
+        """Drop all entries; results still being computed will not be stored"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+def cached(ttl_seconds: float = config.CACHE_TTL_SECONDS, maxsize: int = 256):
+    """
+    Cache a method's results keyed by its arguments (self is not part of the key)
+
+    Args:
+        ttl_seconds: Lifetime of an entry in seconds
+        maxsize: Maximum number of distinct argument combinations kept
+    """
+    def decorator(func):
+        cache = TTLCache(ttl_seconds, maxsize)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return cache.get_or_compute(key, lambda: func(self, *args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def clear_all():
+    """Invalidate every cache in this process"""
+    for cache in _caches:
+        cache.clear()
@@ -4,68 +4,193 @@ BigQuery Database Connection and Query Functions
 
 import sys
 import os
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, FrozenSet, Iterator
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
+from google.api_core.exceptions import NotFound
+import google.auth
+import google.auth.transport.requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 
 # Add parent directory to path for config import
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from embedding_codec import unpack_embedding_matrix
+from cache import cached
+
+# Size of the HTTP connection pool shared by concurrent API requests
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+
+def _make_http_session() -> google.auth.transport.requests.AuthorizedSession:
+    """Authorized session with a connection pool large enough for concurrent requests"""
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = google.auth.transport.requests.AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared BigQuery client, created once per process so requests reuse its
+# credentials and HTTP connection pool
+_client = bigquery.Client(project=config.PROJECT_ID, _http=_make_http_session())
+
+# Storage Read API client for bulk reads (Arrow over gRPC)
+_bqstorage_client = bigquery_storage.BigQueryReadClient()
+
+# Fully qualified dataset, resolved once so every query text is stable
+_DATASET = f"{config.PROJECT_ID}.{config.DATASET_ID}"
+
+# Bounded pool for running independent queries of one method concurrently
+_query_executor = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_QUERIES)
+
+# Optional person columns that list queries only select when asked for
+PERSON_DETAIL_FIELDS = ('description', 'occupation', 'field_of_work', 'birth_date', 'death_date')
+VISUALIZATION_DETAIL_FIELDS = ('description', 'occupation')
+
+# Repeated columns, returned as [] instead of None
+_REPEATED_FIELDS = ('occupation', 'field_of_work')
+
+
+def _detail_columns(fields: FrozenSet[str], allowed: Tuple[str, ...], prefix: str = '') -> List[str]:
+    """
+    Validate requested optional columns and return them in a stable order
+    
+    Args:
+        fields: Requested optional column names
+        allowed: Columns the query supports
+        prefix: Table alias prefix for the SELECT list (e.g. 'p.')
+        
+    Returns:
+        List of SELECT-list entries
+    """
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f"{prefix}{field}" for field in allowed if field in fields]
+
+
+def _detail_values(row, fields: FrozenSet[str], allowed: Tuple[str, ...]) -> Dict:
+    """Pull the requested optional columns out of a result row"""
+    values = {}
+    for field in allowed:
+        if field in fields:
+            value = row[field]
+            values[field] = (value or []) if field in _REPEATED_FIELDS else value
+    return values
 
 
 class Database:
     """Handle BigQuery database operations"""
     
     def __init__(self):
-        """Initialize BigQuery client"""
-        self.client = bigquery.Client(project=config.PROJECT_ID)
+        """Attach to the shared BigQuery client"""
+        self.client = _client
+        self.bqstorage_client = _bqstorage_client
         self.dataset_id = config.DATASET_ID
+    
+    def warm_up(self):
+        """Fetch an OAuth token up front so the first request doesn't pay for it"""
+        credentials = self.client._credentials
+        if not credentials.valid:
+            credentials.refresh(google.auth.transport.requests.Request())
+    
+    def ping(self):
+        """Run a trivial query to check BigQuery is reachable (never cached)"""
+        list(self._query("SELECT 1"))
+    
+    def _query(self, query: str, job_config: Optional[bigquery.QueryJobConfig] = None):
+        """
+        Run a query and wait for its rows
+        
+        Uses the jobs.query fast path, which returns small result sets in a
+        single round trip instead of inserting a job and polling it
         
-    def get_all_persons(self, limit: int = 1000, offset: int = 0) -> List[Dict]:
+        Args:
+            query: SQL query text
+            job_config: Optional job configuration (query parameters etc.)
+            
+        Returns:
+            RowIterator over the results
         """
-        Get all persons with basic info
+        return self.client.query_and_wait(query, job_config=job_config)
+    
+    def _query_all(self, *queries: str) -> list:
+        """
+        Run independent queries concurrently and wait for all of them
+        
+        Args:
+            queries: SQL query texts
+            
+        Returns:
+            List of RowIterators, aligned with queries
+        """
+        futures = [_query_executor.submit(self._query, query) for query in queries]
+        return [future.result() for future in futures]
+        
+    @cached()
+    def get_all_persons(self, limit: int = 1000, after_name: Optional[str] = None,
+                        after_id: Optional[str] = None,
+                        fields: FrozenSet[str] = frozenset()) -> List[Dict]:
+        """
+        Get all persons with basic info, ordered by (name, person_id)
+        
+        Uses keyset pagination: pass the name and person_id of the last row of
+        the previous page to get the next one. Cost doesn't grow with page depth
+        the way OFFSET does.
         
         Args:
             limit: Maximum number of results
-            offset: Offset for pagination
+            after_name: Name of the last person on the previous page
+            after_id: person_id of the last person on the previous page
+            fields: Optional columns to include (see PERSON_DETAIL_FIELDS);
+                by default only id, name, coordinates and cluster are read
             
         Returns:
             List of person dictionaries
         """
+        detail_columns = ''.join(
+            f"{column},\n            " for column in _detail_columns(fields, PERSON_DETAIL_FIELDS, 'p.')
+        )
+        
         query = f"""
         SELECT 
             p.person_id,
             p.name,
-            p.description,
-            p.occupation,
-            p.field_of_work,
-            p.birth_date,
-            p.death_date,
-            c.x,
+            {detail_columns}c.x,
             c.y,
             c.z,
             c.cluster_id,
             c.cluster_label
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.persons` p
-        LEFT JOIN `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
+        FROM `{_DATASET}.persons` p
+        LEFT JOIN `{_DATASET}.coordinates_3d` c
         ON p.person_id = c.person_id
-        ORDER BY p.name
-        LIMIT {limit}
-        OFFSET {offset}
+        WHERE @after_name IS NULL
+           OR p.name > @after_name
+           OR (p.name = @after_name AND p.person_id > @after_id)
+        ORDER BY p.name, p.person_id
+        LIMIT @limit
         """
         
-        results = self.client.query(query).result()
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("after_name", "STRING", after_name),
+                bigquery.ScalarQueryParameter("after_id", "STRING", after_id),
+                bigquery.ScalarQueryParameter("limit", "INT64", limit)
+            ]
+        )
+        
+        results = self._query(query, job_config)
         
         persons = []
         for row in results:
             persons.append({
                 'person_id': row.person_id,
                 'name': row.name,
-                'description': row.description,
-                'occupation': row.occupation or [],
-                'field_of_work': row.field_of_work or [],
-                'birth_date': row.birth_date,
-                'death_date': row.death_date,
+                **_detail_values(row, fields, PERSON_DETAIL_FIELDS),
                 'coordinates': {
                     'x': float(row.x) if row.x is not None else None,
                     'y': float(row.y) if row.y is not None else None,
@@ -88,6 +213,12 @@ class Database:
             Person dictionary or None
         """
         query = f"""
+        WITH ev AS (
+            SELECT event_type, COUNT(*) as cnt
+            FROM `{_DATASET}.life_events`
+            WHERE person_id = @person_id
+            GROUP BY event_type
+        )
         SELECT 
             p.person_id,
             p.wikidata_id,
@@ -104,16 +235,12 @@ class Database:
             c.z,
             c.cluster_id,
             c.cluster_label,
-            COUNT(e.event_id) as total_events
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.persons` p
-        LEFT JOIN `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
+            (SELECT IFNULL(SUM(cnt), 0) FROM ev) as total_events,
+            ARRAY(SELECT AS STRUCT event_type, cnt FROM ev) as event_types
+        FROM `{_DATASET}.persons` p
+        LEFT JOIN `{_DATASET}.coordinates_3d` c
         ON p.person_id = c.person_id
-        LEFT JOIN `{config.PROJECT_ID}.{self.dataset_id}.life_events` e
-        ON p.person_id = e.person_id
         WHERE p.person_id = @person_id
-        GROUP BY p.person_id, p.wikidata_id, p.name, p.description,
-                 p.occupation, p.field_of_work, p.birth_date, p.death_date,
-                 p.birth_place, p.death_place, c.x, c.y, c.z, c.cluster_id, c.cluster_label
         """
         
         job_config = bigquery.QueryJobConfig(
@@ -122,23 +249,15 @@ class Database:
             ]
         )
         
-        results = list(self.client.query(query, job_config=job_config).result())
+        results = list(self._query(query, job_config))
         
         if not results:
             return None
         
         row = results[0]
         
-        # Get event type breakdown
-        event_query = f"""
-        SELECT event_type, COUNT(*) as count
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.life_events`
-        WHERE person_id = @person_id
-        GROUP BY event_type
-        """
-        
-        event_results = self.client.query(event_query, job_config=job_config).result()
-        event_types = {r.event_type: r.count for r in event_results}
+        # Event type breakdown comes back as an array of structs
+        event_types = {e['event_type']: e['cnt'] for e in row.event_types}
         
         return {
             'person_id': row.person_id,
@@ -162,101 +281,129 @@ class Database:
             'event_types': event_types
         }
     
-    def get_visualization_data(self) -> List[Dict]:
+    def iter_visualization_data(self, fields: FrozenSet[str] = frozenset()) -> Iterator[Dict]:
         """
-        Get all persons with 3D coordinates for visualization
+        Stream all persons with 3D coordinates for visualization
+        
+        The query runs immediately (so errors surface to the caller); rows are
+        then fetched page by page as the returned iterator is consumed.
+        
+        Reads the denormalized visualization_snapshot table written after each
+        dim_reduction.py run (see scripts/create_views.py), falling back to
+        joining persons and coordinates_3d if it doesn't exist yet.
+        
+        Args:
+            fields: Optional columns to include (see VISUALIZATION_DETAIL_FIELDS);
+                by default only id, name, coordinates and cluster are read
         
         Returns:
-            List of persons with coordinates
+            Iterator of persons with coordinates
         """
+        snapshot_columns = ''.join(
+            f"{column},\n            " for column in _detail_columns(fields, VISUALIZATION_DETAIL_FIELDS)
+        )
+        join_columns = ''.join(
+            f"{column},\n            " for column in _detail_columns(fields, VISUALIZATION_DETAIL_FIELDS, 'p.')
+        )
+        
         query = f"""
+        SELECT 
+            person_id,
+            name,
+            {snapshot_columns}x,
+            y,
+            z,
+            cluster_id,
+            cluster_label
+        FROM `{_DATASET}.visualization_snapshot`
+        ORDER BY name
+        """
+        
+        join_query = f"""
         SELECT 
             p.person_id,
             p.name,
-            p.description,
-            p.occupation,
-            c.x,
+            {join_columns}c.x,
             c.y,
             c.z,
             c.cluster_id,
             c.cluster_label
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.persons` p
-        INNER JOIN `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
+        FROM `{_DATASET}.persons` p
+        INNER JOIN `{_DATASET}.coordinates_3d` c
         ON p.person_id = c.person_id
         ORDER BY p.name
         """
         
-        results = self.client.query(query).result()
+        try:
+            results = self._query(query)
+        except NotFound:
+            results = self._query(join_query)
         
-        persons = []
-        for row in results:
-            persons.append({
+        return (
+            {
                 'person_id': row.person_id,
                 'name': row.name,
-                'description': row.description,
-                'occupation': row.occupation or [],
+                **_detail_values(row, fields, VISUALIZATION_DETAIL_FIELDS),
                 'x': float(row.x),
                 'y': float(row.y),
                 'z': float(row.z),
                 'cluster_id': int(row.cluster_id),
                 'cluster_label': row.cluster_label
-            })
-        
-        return persons
+            }
+            for row in results
+        )
     
+    @cached()
     def get_clusters_info(self) -> List[Dict]:
         """
         Get information about all clusters
         
+        Reads the precomputed clusters_summary materialized view and the
+        cluster_top_occupations roll-up (see scripts/create_views.py). Falls
+        back to aggregating the base tables if the roll-ups don't exist yet.
+        
         Returns:
             List of cluster information
         """
         query = f"""
         SELECT 
-            c.cluster_id,
-            c.cluster_label,
-            COUNT(*) as person_count,
-            AVG(c.x) as avg_x,
-            AVG(c.y) as avg_y,
-            AVG(c.z) as avg_z
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
-        GROUP BY c.cluster_id, c.cluster_label
-        ORDER BY c.cluster_id
+            cluster_id,
+            cluster_label,
+            person_count,
+            avg_x,
+            avg_y,
+            avg_z
+        FROM `{_DATASET}.clusters_summary`
+        ORDER BY cluster_id
         """
         
-        results = self.client.query(query).result()
+        occ_query = f"""
+        SELECT cluster_id, occupation, cnt
+        FROM `{_DATASET}.cluster_top_occupations`
+        ORDER BY cluster_id, rk
+        """
+        
+        try:
+            results, occ_results = self._query_all(query, occ_query)
+        except NotFound:
+            results, occ_results = self._get_clusters_info_from_base_tables()
+        
+        # Fold ranked occupations into per-cluster lists
+        top_occupations = {}
+        for r in occ_results:
+            top_occupations.setdefault(int(r.cluster_id), []).append(
+                {'occupation': r.occupation, 'count': r.cnt}
+            )
         
         clusters = []
         for row in results:
             cluster_id = int(row.cluster_id)
             
-            # Get top occupations for this cluster
-            occ_query = f"""
-            SELECT occupation, COUNT(*) as count
-            FROM `{config.PROJECT_ID}.{self.dataset_id}.persons` p
-            INNER JOIN `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
-            ON p.person_id = c.person_id
-            CROSS JOIN UNNEST(p.occupation) as occupation
-            WHERE c.cluster_id = @cluster_id
-            GROUP BY occupation
-            ORDER BY count DESC
-            LIMIT 5
-            """
-            
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("cluster_id", "INT64", cluster_id)
-                ]
-            )
-            
-            occ_results = list(self.client.query(occ_query, job_config=job_config).result())
-            top_occupations = [{'occupation': r.occupation, 'count': r.count} for r in occ_results]
-            
             clusters.append({
                 'cluster_id': cluster_id,
                 'cluster_label': row.cluster_label,
                 'person_count': row.person_count,
-                'top_occupations': top_occupations,
+                'top_occupations': top_occupations.get(cluster_id, []),
                 'avg_coordinates': {
                     'x': float(row.avg_x),
                     'y': float(row.avg_y),
@@ -266,30 +413,76 @@ class Database:
         
         return clusters
     
-    def get_persons_by_cluster(self, cluster_id: int) -> List[Dict]:
+    def _get_clusters_info_from_base_tables(self):
+        """
+        Compute cluster summaries and top-5 occupations directly from
+        coordinates_3d and persons (two queries, independent of cluster count)
+        
+        Returns:
+            Tuple of (summary_rows, ranked_occupation_rows)
+        """
+        query = f"""
+        SELECT 
+            c.cluster_id,
+            c.cluster_label,
+            COUNT(*) as person_count,
+            AVG(c.x) as avg_x,
+            AVG(c.y) as avg_y,
+            AVG(c.z) as avg_z
+        FROM `{_DATASET}.coordinates_3d` c
+        GROUP BY c.cluster_id, c.cluster_label
+        ORDER BY c.cluster_id
+        """
+        
+        occ_query = f"""
+        WITH occ AS (
+            SELECT c.cluster_id, occupation, COUNT(*) as cnt
+            FROM `{_DATASET}.persons` p
+            INNER JOIN `{_DATASET}.coordinates_3d` c
+            ON p.person_id = c.person_id
+            CROSS JOIN UNNEST(p.occupation) as occupation
+            GROUP BY c.cluster_id, occupation
+        )
+        SELECT cluster_id, occupation, cnt
+        FROM occ
+        WHERE TRUE
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY cluster_id ORDER BY cnt DESC) <= 5
+        ORDER BY cluster_id, cnt DESC
+        """
+        
+        results, occ_results = self._query_all(query, occ_query)
+        
+        return results, occ_results
+    
+    @cached()
+    def get_persons_by_cluster(self, cluster_id: int,
+                               fields: FrozenSet[str] = frozenset()) -> List[Dict]:
         """
         Get all persons in a specific cluster
         
         Args:
             cluster_id: Cluster identifier
+            fields: Optional columns to include (see PERSON_DETAIL_FIELDS)
             
         Returns:
             List of persons in cluster
         """
+        detail_columns = ''.join(
+            f"{column},\n            " for column in _detail_columns(fields, PERSON_DETAIL_FIELDS, 'p.')
+        )
+        
         query = f"""
         SELECT 
             p.person_id,
             p.name,
-            p.description,
-            p.occupation,
-            c.x,
+            {detail_columns}c.x,
             c.y,
             c.z
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.persons` p
-        INNER JOIN `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d` c
+        FROM `{_DATASET}.persons` p
+        INNER JOIN `{_DATASET}.coordinates_3d` c
         ON p.person_id = c.person_id
         WHERE c.cluster_id = @cluster_id
-        ORDER BY p.name
+        ORDER BY p.name, p.person_id
         """
         
         job_config = bigquery.QueryJobConfig(
@@ -298,15 +491,14 @@ class Database:
             ]
         )
         
-        results = self.client.query(query, job_config=job_config).result()
+        results = self._query(query, job_config)
         
         persons = []
         for row in results:
             persons.append({
                 'person_id': row.person_id,
                 'name': row.name,
-                'description': row.description,
-                'occupation': row.occupation or [],
+                **_detail_values(row, fields, PERSON_DETAIL_FIELDS),
                 'coordinates': {
                     'x': float(row.x),
                     'y': float(row.y),
@@ -316,50 +508,92 @@ class Database:
         
         return persons
     
+    def find_nearest_persons(self, x: float, y: float, z: float, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the k persons closest to a 3D point, computed inside BigQuery
+        
+        Only k rows come back, instead of the whole coordinates table
+        
+        Args:
+            x, y, z: Query point coordinates
+            k: Number of neighbours to return
+            
+        Returns:
+            List of (person_id, distance) tuples, closest first
+        """
+        query = f"""
+        SELECT
+            person_id,
+            SQRT(POW(x - @x, 2) + POW(y - @y, 2) + POW(z - @z, 2)) as distance
+        FROM `{_DATASET}.coordinates_3d`
+        ORDER BY distance
+        LIMIT @k
+        """
+        
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("x", "FLOAT64", x),
+                bigquery.ScalarQueryParameter("y", "FLOAT64", y),
+                bigquery.ScalarQueryParameter("z", "FLOAT64", z),
+                bigquery.ScalarQueryParameter("k", "INT64", k)
+            ]
+        )
+        
+        results = self._query(query, job_config)
+        
+        return [(row.person_id, float(row.distance)) for row in results]
+    
+    @cached()
     def get_all_embeddings(self) -> Tuple[List[str], np.ndarray]:
         """
         Get all embeddings from database
         
+        Rows are streamed as Arrow record batches through the BigQuery Storage
+        Read API. No ORDER BY, so the read can be split across several streams;
+        person_ids stay aligned with the matrix rows.
+        
         Returns:
             Tuple of (person_ids, embedding_matrix)
         """
         query = f"""
-        SELECT person_id, embedding_vector
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.embeddings`
-        ORDER BY person_id
+        SELECT person_id, embedding_vector, embedding_scale
+        FROM `{_DATASET}.embeddings`
         """
         
-        results = self.client.query(query).result()
+        arrow_table = self._query(query).to_arrow(bqstorage_client=self.bqstorage_client)
         
-        person_ids = []
-        embeddings = []
+        person_ids = arrow_table.column('person_id').to_pylist()
+        if not person_ids:
+            return person_ids, np.array([])
         
-        for row in results:
-            person_ids.append(row.person_id)
-            embeddings.append(row.embedding_vector)
+        # Packed BYTES vectors decode in one pass into an (N, dim) float32 matrix
+        embeddings = unpack_embedding_matrix(
+            arrow_table.column('embedding_vector').to_pylist(),
+            arrow_table.column('embedding_scale').to_pylist(),
+        )
         
-        return person_ids, np.array(embeddings)
+        return person_ids, embeddings
     
+    @cached()
     def get_all_coordinates(self) -> Tuple[List[str], np.ndarray]:
         """
         Get all 3D coordinates from database
         
         Returns:
-            Tuple of (person_ids, coordinates_matrix)
+            Tuple of (person_ids, float32 coordinates_matrix of shape (N, 3))
         """
         query = f"""
         SELECT person_id, x, y, z
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.coordinates_3d`
-        ORDER BY person_id
+        FROM `{_DATASET}.coordinates_3d`
         """
         
-        results = self.client.query(query).result()
+        arrow_table = self._query(query).to_arrow(bqstorage_client=self.bqstorage_client)
         
-        person_ids = []
-        coordinates = []
-        
-        for row in results:
-            person_ids.append(row.person_id)
-            coordinates.append([float(row.x), float(row.y), float(row.z)])
+        # Contiguous float32 (N, 3): half the memory traffic of float64 for
+        # the distance scan in find_similar_persons
+        person_ids = arrow_table.column('person_id').to_pylist()
+        coordinates = np.empty((len(person_ids), 3), dtype=np.float32)
+        for i, axis in enumerate(('x', 'y', 'z')):
+            coordinates[:, i] = arrow_table.column(axis).to_numpy()
         
-        return person_ids, np.array(coordinates)
+        return person_ids, coordinates
@@ -4,8 +4,14 @@ Embedding Generation Service for User Input
 
 import sys
 import os
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 import numpy as np
+import joblib
 from datetime import datetime
 from vertexai.language_models import TextEmbeddingModel
 import vertexai
@@ -18,6 +24,31 @@ import umap
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
 
+# Shared Vertex AI model handle, loaded once per process
+_embedding_model = None
+
+# Texts per Vertex AI get_embeddings call, and concurrent calls per request
+EMBEDDING_BATCH_SIZE = 5
+EMBEDDING_MAX_WORKERS = 4
+
+# Number of narrative embeddings kept in memory
+EMBEDDING_CACHE_SIZE = 10_000
+
+# Sort key for events without a start date (they sort first)
+_MIN_DATE = datetime.min.date()
+_sort_date = itemgetter(0)
+
+
+def get_embedding_model() -> TextEmbeddingModel:
+    """Return the shared Vertex AI embedding model, initializing it on first use"""
+    global _embedding_model
+    
+    if _embedding_model is None:
+        vertexai.init(project=config.PROJECT_ID, location=config.VERTEX_AI_REGION)
+        _embedding_model = TextEmbeddingModel.from_pretrained(config.EMBEDDING_MODEL)
+    
+    return _embedding_model
+
 
 class EmbeddingService:
     """Generate embeddings for user-provided life events"""
@@ -25,14 +56,22 @@ class EmbeddingService:
     def __init__(self):
         """Initialize Vertex AI and load PCA/UMAP models"""
         # Initialize Vertex AI
-        vertexai.init(project=config.PROJECT_ID, location=config.VERTEX_AI_REGION)
-        self.embedding_model = TextEmbeddingModel.from_pretrained(config.EMBEDDING_MODEL)
+        self.embedding_model = get_embedding_model()
         
         # Will load PCA/UMAP models from saved state or retrain
         self.pca_model = None
         self.umap_model = None
         self._models_loaded = False
         
+        # Narrative embeddings keyed by content hash (LRU, float16)
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        
+        # (clusters_info, centroid matrix) cached by find_nearest_cluster;
+        # published as one tuple so concurrent callers never pair a cluster
+        # list with another list's matrix
+        self._centroids = None
+        
     def load_reduction_models(self, pca_model, umap_model):
         """
         Load pre-trained PCA and UMAP models
@@ -43,8 +82,36 @@ class EmbeddingService:
         """
         self.pca_model = pca_model
         self.umap_model = umap_model
+        
+        # PCA is a single affine map; keep its parameters as float32 so
+        # project_to_3d can skip sklearn's per-call input validation
+        components = pca_model.components_
+        if getattr(pca_model, 'whiten', False):
+            components = components / np.sqrt(pca_model.explained_variance_)[:, np.newaxis]
+        self._pca_mean = np.asarray(pca_model.mean_, dtype=np.float32)
+        self._pca_components_t = np.ascontiguousarray(components.T, dtype=np.float32)
+        
+        # Run one transform up front so the first user request doesn't pay
+        # for UMAP's lazy initialization (numba compilation, search index)
+        self.umap_model.transform(np.zeros((1, self._pca_components_t.shape[1]), dtype=np.float32))
+        
         self._models_loaded = True
         
+    def load_from_disk(self, pca_path: str, umap_path: str):
+        """
+        Load PCA and UMAP models saved by dim_reduction.py
+        
+        Arrays are memory-mapped read-only, so several worker processes share
+        one copy of the model data in the page cache
+        
+        Args:
+            pca_path: Path to the joblib-dumped PCA model
+            umap_path: Path to the joblib-dumped UMAP model
+        """
+        pca_model = joblib.load(pca_path, mmap_mode='r')
+        umap_model = joblib.load(umap_path, mmap_mode='r')
+        self.load_reduction_models(pca_model, umap_model)
+        
     def create_narrative_from_events(self, events: List[dict], name: str = None, description: str = None) -> str:
         """
         Create a narrative text from life events (similar to event_text_processor.py)
@@ -68,22 +135,20 @@ class EmbeddingService:
                 bio += "."
             narrative_parts.append(bio)
         
-        # Group events by type
-        event_types = {}
+        # Group events by type as (sort_date, event) pairs in a single pass
+        event_types = defaultdict(list)
         for event in events:
-            event_type = event.get('event_type', 'other')
-            if event_type not in event_types:
-                event_types[event_type] = []
-            event_types[event_type].append(event)
+            event_types[event.get('event_type', 'other')].append(
+                (event.get('start_date') or _MIN_DATE, event)
+            )
         
         # Create narratives for each type
         
         # Education
         if 'education' in event_types:
-            edu_events = sorted(event_types['education'], 
-                              key=lambda e: e.get('start_date') or datetime.min.date())
+            edu_events = sorted(event_types['education'], key=_sort_date)
             edu_parts = []
-            for event in edu_events:
+            for _, event in edu_events:
                 title = event.get('event_title', '')
                 org = event.get('organization', '')
                 if title and org:
@@ -100,10 +165,9 @@ class EmbeddingService:
         
         # Employment
         if 'employment' in event_types:
-            emp_events = sorted(event_types['employment'],
-                               key=lambda e: e.get('start_date') or datetime.min.date())
+            emp_events = sorted(event_types['employment'], key=_sort_date)
             emp_parts = []
-            for event in emp_events:
+            for _, event in emp_events:
                 title = event.get('event_title', '')
                 org = event.get('organization', '')
                 if title and org:
@@ -125,7 +189,7 @@ class EmbeddingService:
         if 'award' in event_types:
             award_events = event_types['award']
             if len(award_events) <= 5:
-                award_names = [e.get('event_title', '') for e in award_events if e.get('event_title')]
+                award_names = [e.get('event_title', '') for _, e in award_events if e.get('event_title')]
                 if award_names:
                     awards_str = ", ".join(award_names)
                     narrative_parts.append(f"Received awards: {awards_str}.")
@@ -133,11 +197,9 @@ class EmbeddingService:
                 narrative_parts.append(f"Received {len(award_events)} awards and honors.")
         
         # Other events
-        for event_type in event_types:
-            if event_type not in ['education', 'employment', 'award']:
-                events_of_type = event_types[event_type]
-                if events_of_type:
-                    narrative_parts.append(f"Notable {event_type} events: {len(events_of_type)}.")
+        for event_type, events_of_type in event_types.items():
+            if event_type not in ('education', 'employment', 'award'):
+                narrative_parts.append(f"Notable {event_type} events: {len(events_of_type)}.")
         
         # Join all parts
         narrative = " ".join(narrative_parts)
@@ -148,6 +210,71 @@ class EmbeddingService:
         
         return narrative
     
+    @staticmethod
+    def _text_key(text: str) -> str:
+        """Content hash used as the embedding cache key"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Call Vertex AI once for up to EMBEDDING_BATCH_SIZE texts"""
+        embeddings = self.embedding_model.get_embeddings(texts)
+        return [np.array(e.values, dtype=np.float32) for e in embeddings]
+    
+    def generate_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Generate 768-dimensional embeddings for several texts
+        
+        Identical texts are embedded once and served from an in-memory cache
+        keyed by content hash afterwards. Cache misses are sent to Vertex AI
+        in batches of EMBEDDING_BATCH_SIZE, with batches issued concurrently.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            List of 768D embedding vectors, aligned with texts
+        """
+        keys = [self._text_key(text) for text in texts]
+        vectors = {}
+        
+        with self._embedding_cache_lock:
+            for key in keys:
+                cached_vector = self._embedding_cache.get(key)
+                if cached_vector is not None:
+                    self._embedding_cache.move_to_end(key)
+                    vectors[key] = cached_vector
+        
+        # Unique texts still to embed
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        
+        if missing:
+            missing_keys = list(missing)
+            batches = [
+                missing_keys[i:i + EMBEDDING_BATCH_SIZE]
+                for i in range(0, len(missing_keys), EMBEDDING_BATCH_SIZE)
+            ]
+            
+            with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(batches))) as executor:
+                batch_results = list(executor.map(
+                    lambda batch: self._embed_batch([missing[key] for key in batch]),
+                    batches
+                ))
+            
+            with self._embedding_cache_lock:
+                for batch, batch_vectors in zip(batches, batch_results):
+                    for key, vector in zip(batch, batch_vectors):
+                        # Stored as float16 to halve cache memory
+                        vectors[key] = vector.astype(np.float16)
+                        self._embedding_cache[key] = vectors[key]
+                
+                while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+        
+        return [vectors[key].astype(np.float32) for key in keys]
+    
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate 768-dimensional embedding for text
@@ -158,11 +285,7 @@ class EmbeddingService:
         Returns:
             768D embedding vector
         """
-        # Call Vertex AI
-        embeddings = self.embedding_model.get_embeddings([text])
-        embedding_vector = np.array(embeddings[0].values)
-        
-        return embedding_vector
+        return self.generate_embeddings([text])[0]
     
     def project_to_3d(self, embedding_768d: np.ndarray) -> np.ndarray:
         """
@@ -178,13 +301,36 @@ class EmbeddingService:
             raise RuntimeError("PCA/UMAP models not loaded. Call load_reduction_models() first.")
         
         # PCA: 768D -> 50D
-        embedding_50d = self.pca_model.transform(embedding_768d.reshape(1, -1))
+        embedding_50d = (np.asarray(embedding_768d, dtype=np.float32) - self._pca_mean) @ self._pca_components_t
+        embedding_50d = embedding_50d.reshape(1, -1)
         
         # UMAP: 50D -> 3D
         coordinates_3d = self.umap_model.transform(embedding_50d)
         
         return coordinates_3d[0]
     
+    def _load_centroids(self, clusters_info: List[dict]) -> Tuple[List[dict], np.ndarray]:
+        """
+        Return (clusters_info, its (K, 3) centroid matrix)
+        
+        Rebuilt only when a different clusters list is passed in; the
+        database layer returns the same cached list until it is invalidated
+        
+        Args:
+            clusters_info: List of cluster information dicts
+        """
+        centroids = self._centroids
+        if centroids is not None and centroids[0] is clusters_info:
+            return centroids
+        
+        matrix = np.asarray([
+            [c['avg_coordinates']['x'], c['avg_coordinates']['y'], c['avg_coordinates']['z']]
+            for c in clusters_info
+        ], dtype=np.float32).reshape(-1, 3)
+        centroids = (clusters_info, matrix)
+        self._centroids = centroids
+        return centroids
+    
     def find_nearest_cluster(self, coordinates_3d: np.ndarray, clusters_info: List[dict]) -> dict:
         """
         Find the nearest cluster to given 3D coordinates
@@ -194,25 +340,18 @@ class EmbeddingService:
             clusters_info: List of cluster information dicts
             
         Returns:
-            Nearest cluster dict
+            Nearest cluster dict (None if there are no clusters)
         """
-        min_distance = float('inf')
-        nearest_cluster = None
+        clusters, matrix = self._load_centroids(clusters_info)
         
-        for cluster in clusters_info:
-            cluster_center = np.array([
-                cluster['avg_coordinates']['x'],
-                cluster['avg_coordinates']['y'],
-                cluster['avg_coordinates']['z']
-            ])
-            
-            distance = np.linalg.norm(coordinates_3d - cluster_center)
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_cluster = cluster
+        if not clusters:
+            return None
+        
+        # Squared distance has the same argmin and skips the sqrt
+        deltas = matrix - np.asarray(coordinates_3d, dtype=np.float32)
+        nearest = int(np.argmin(np.einsum('ij,ij->i', deltas, deltas)))
         
-        return nearest_cluster
+        return clusters[nearest]
     
     def find_similar_persons(self, coordinates_3d: np.ndarray, 
                             all_person_ids: List[str], 
@@ -230,11 +369,17 @@ class EmbeddingService:
         Returns:
             List of (person_id, distance) tuples
         """
-        # Calculate distances to all persons
-        distances = np.linalg.norm(all_coordinates - coordinates_3d, axis=1)
+        # Calculate distances to all persons, staying in the matrix's float32
+        # instead of promoting the whole subtraction to float64
+        query_point = np.asarray(coordinates_3d, dtype=all_coordinates.dtype)
+        distances = np.linalg.norm(all_coordinates - query_point, axis=1)
         
-        # Get top k indices
-        top_k_indices = np.argsort(distances)[:top_k]
+        # Get top k indices: O(N) partition, then sort only those k
+        if top_k < len(distances):
+            top_k_indices = np.argpartition(distances, top_k)[:top_k]
+            top_k_indices = top_k_indices[np.argsort(distances[top_k_indices])]
+        else:
+            top_k_indices = np.argsort(distances)
         
         # Return person IDs and distances
         similar = [(all_person_ids[i], float(distances[i])) for i in top_k_indices]
@@ -5,25 +5,33 @@ FastAPI application for serving life trajectory embeddings and visualization dat
 
 import sys
 import os
+import asyncio
+import functools
 import time
 import pickle
 import json
-from typing import List, Optional
+import base64
+import hmac
+from typing import Iterator, List, Optional
 from datetime import datetime
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import numpy as np
+import orjson
 
 # Local imports
 from models import (
     UserEmbeddingRequest, UserEmbeddingResponse, PersonSummary, PersonDetail,
-    VisualizationData, VisualizationPerson, ClusterInfo, SimilarPerson,
+    VisualizationData, ClusterInfo, SimilarPerson,
     Coordinate3D, HealthResponse
 )
-from database import Database
+from database import Database, PERSON_DETAIL_FIELDS, VISUALIZATION_DETAIL_FIELDS
 from embeddings import EmbeddingService
+from cache import TTLCache, clear_all as clear_all_caches
 
 # Add parent directory for config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,7 +43,8 @@ app = FastAPI(
     description="API for visualizing and comparing life trajectories as embeddings",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -45,12 +54,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Initialize services
 db = Database()
 embedding_service = EmbeddingService()
 
+# Serialized responses for the heaviest endpoints
+_response_cache = TTLCache(maxsize=8)
+
+# Rows serialized per chunk when streaming /visualization
+VISUALIZATION_STREAM_BATCH = 1000
+
+# Bounded pool for blocking Database calls that a handler fans out in parallel
+_db_executor = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_QUERIES)
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking Database call on _db_executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(func, *args, **kwargs))
+
+
+# Background task started at startup (held so it isn't garbage collected)
+_keepalive_task = None
+
+
+async def _keep_connections_warm():
+    """Ping BigQuery periodically so idle periods don't drop pooled connections"""
+    while True:
+        await asyncio.sleep(config.KEEPALIVE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(db.ping)
+        except Exception as e:
+            print(f"  Warning: BigQuery keep-alive ping failed: {e}")
+
+
 # Load PCA/UMAP models at startup
 _models_loaded = False
 _pca_model = None
@@ -60,21 +100,34 @@ _umap_model = None
 @app.on_event("startup")
 async def startup_event():
     """Load PCA/UMAP models and cache data at startup"""
-    global _models_loaded, _pca_model, _umap_model
+    global _models_loaded, _pca_model, _umap_model, _keepalive_task
+    
+    # Fetch BigQuery credentials before the first request needs them
+    try:
+        db.warm_up()
+    except Exception as e:
+        print(f"  Warning: Could not pre-fetch BigQuery credentials: {e}")
+    
+    # Keep the BigQuery connection pool hot between requests
+    _keepalive_task = asyncio.create_task(_keep_connections_warm())
     
     print("Loading reduction models from file...")
     
-    # Try to load from local coordinates file
-    coords_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                               'data', 'processed', 'coordinates_3d.json')
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pca_path = os.path.join(project_root, config.PCA_MODEL_FILE)
+    umap_path = os.path.join(project_root, config.UMAP_MODEL_FILE)
     
-    if os.path.exists(coords_file):
-        print(f"  Found coordinates file: {coords_file}")
-        # Models will be loaded lazily when needed
-        # For now, just verify the file exists
+    try:
+        embedding_service.load_from_disk(pca_path, umap_path)
+        _pca_model = embedding_service.pca_model
+        _umap_model = embedding_service.umap_model
         _models_loaded = True
-    else:
-        print(f"  Warning: Coordinates file not found at {coords_file}")
+        print(f"  Loaded {pca_path} and {umap_path}")
+    except FileNotFoundError as e:
+        print(f"  Warning: Reduction model not found ({e.filename})")
+        print(f"  Run scripts/dim_reduction.py to create it; user embedding generation will not be available")
+    except Exception as e:
+        print(f"  Warning: Could not load reduction models: {e}")
         print(f"  User embedding generation will not be available")
 
 
@@ -93,7 +146,7 @@ async def health_check():
     """Health check endpoint"""
     # Test BigQuery connection
     try:
-        persons = db.get_all_persons(limit=1)
+        db.ping()
         bigquery_status = "healthy"
     except Exception as e:
         bigquery_status = f"unhealthy: {str(e)}"
@@ -110,25 +163,71 @@ async def health_check():
     )
 
 
+def _encode_cursor(person: dict) -> str:
+    """Encode the (name, person_id) of a page's last row as an opaque cursor"""
+    raw = json.dumps([person['name'], person['person_id']]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by _encode_cursor into (name, person_id)"""
+    try:
+        name, person_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(name), str(person_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _parse_fields(fields: Optional[str], allowed: tuple) -> frozenset:
+    """Parse a comma-separated `fields` query parameter into a set of column names"""
+    if not fields:
+        return frozenset()
+    requested = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    return requested
+
+
 @app.get("/api/v1/persons", response_model=List[PersonSummary], tags=["persons"])
 async def get_persons(
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    cluster_id: Optional[int] = Query(None, description="Filter by cluster ID")
+    cursor: Optional[str] = Query(None, description="Pagination cursor from the X-Next-Cursor header"),
+    cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
+    fields: Optional[str] = Query(None, description="Comma-separated optional fields to include")
 ):
     """
-    Get list of all persons with basic information
+    Get list of all persons with basic information, ordered by name
     
     - **limit**: Maximum number of results (1-1000)
-    - **offset**: Pagination offset
+    - **cursor**: Opaque cursor returned in the `X-Next-Cursor` header of the previous page
     - **cluster_id**: Optional filter by cluster
+    - **fields**: Optional extra fields (description, occupation, field_of_work, birth_date, death_date)
     """
+    after_name, after_id = _decode_cursor(cursor) if cursor else (None, None)
+    requested_fields = _parse_fields(fields, PERSON_DETAIL_FIELDS)
+    
     try:
         if cluster_id is not None:
-            persons = db.get_persons_by_cluster(cluster_id)
-            persons = persons[offset:offset+limit]
+            persons = db.get_persons_by_cluster(cluster_id, fields=requested_fields)
+            if after_name is not None:
+                persons = [
+                    p for p in persons
+                    if (p['name'], p['person_id']) > (after_name, after_id)
+                ]
+            persons = persons[:limit]
         else:
-            persons = db.get_all_persons(limit=limit, offset=offset)
+            persons = db.get_all_persons(
+                limit=limit, after_name=after_name, after_id=after_id, fields=requested_fields
+            )
+        
+        # A full page means there may be more rows
+        if len(persons) == limit:
+            response.headers["X-Next-Cursor"] = _encode_cursor(persons[-1])
         
         # Convert to response model
         result = []
@@ -136,8 +235,11 @@ async def get_persons(
             result.append(PersonSummary(
                 person_id=p['person_id'],
                 name=p['name'],
-                description=p.get('description'),
-                occupation=p.get('occupation', []),
+                description=p.get('description') if 'description' in requested_fields else None,
+                occupation=p.get('occupation', []) if 'occupation' in requested_fields else [],
+                field_of_work=p.get('field_of_work', []) if 'field_of_work' in requested_fields else [],
+                birth_date=p.get('birth_date') if 'birth_date' in requested_fields else None,
+                death_date=p.get('death_date') if 'death_date' in requested_fields else None,
                 cluster_id=p.get('cluster_id'),
                 cluster_label=p.get('cluster_label'),
                 coordinates=Coordinate3D(**p['coordinates']) if p.get('coordinates') else None
@@ -187,37 +289,73 @@ async def get_person(person_id: str):
 
 
 @app.get("/api/v1/visualization", response_model=VisualizationData, tags=["visualization"])
-async def get_visualization_data():
+async def get_visualization_data(
+    fields: Optional[str] = Query(None, description="Comma-separated optional fields to include")
+):
     """
     Get complete dataset for 3D visualization
     
     Returns all persons with 3D coordinates and cluster assignments
+    
+    - **fields**: Optional extra fields (description, occupation)
     """
+    requested_fields = _parse_fields(fields, VISUALIZATION_DETAIL_FIELDS)
+    cache_key = ("visualization", requested_fields)
+    
+    hit, content = _response_cache.get(cache_key)
+    if hit:
+        return Response(content=content, media_type="application/json")
+    
     try:
-        persons = db.get_visualization_data()
-        
-        # Convert to response model
-        viz_persons = [
-            VisualizationPerson(**p) for p in persons
-        ]
-        
-        # Get metadata
-        clusters = db.get_clusters_info()
-        
-        metadata = {
-            "total_persons": len(viz_persons),
-            "num_clusters": len(clusters),
-            "reduction_method": "PCA(50D) + UMAP(3D)",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        return VisualizationData(
-            persons=viz_persons,
-            metadata=metadata
+        # Run the queries up front (concurrently) so failures still produce a 500
+        rows, clusters = await asyncio.gather(
+            _run_blocking(db.iter_visualization_data, fields=requested_fields),
+            _run_blocking(db.get_clusters_info)
         )
-        
+        num_clusters = len(clusters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching visualization data: {str(e)}")
+    
+    return StreamingResponse(
+        _stream_visualization_payload(cache_key, rows, num_clusters),
+        media_type="application/json"
+    )
+
+
+def _stream_visualization_payload(cache_key, rows: Iterator[dict], num_clusters: int) -> Iterator[bytes]:
+    """
+    Serialize visualization rows to JSON as they arrive from BigQuery
+    
+    Yields the VisualizationData document in chunks of VISUALIZATION_STREAM_BATCH
+    rows, and caches the complete body once the last chunk has been sent.
+    """
+    chunks = [b'{"persons":[']
+    yield chunks[0]
+    
+    total_persons = 0
+    while True:
+        batch = list(islice(rows, VISUALIZATION_STREAM_BATCH))
+        if not batch:
+            break
+        # Drop the enclosing brackets so batches join into one array
+        chunk = orjson.dumps(batch)[1:-1]
+        if total_persons:
+            chunk = b"," + chunk
+        total_persons += len(batch)
+        chunks.append(chunk)
+        yield chunk
+    
+    metadata = {
+        "total_persons": total_persons,
+        "num_clusters": num_clusters,
+        "reduction_method": "PCA(50D) + UMAP(3D)",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    chunk = b'],"metadata":' + orjson.dumps(metadata) + b"}"
+    chunks.append(chunk)
+    yield chunk
+    
+    _response_cache.set(cache_key, b"".join(chunks))
 
 
 @app.get("/api/v1/clusters", response_model=List[ClusterInfo], tags=["clusters"])
@@ -276,6 +414,19 @@ async def get_cluster(cluster_id: int):
         raise HTTPException(status_code=500, detail=f"Error fetching cluster: {str(e)}")
 
 
+def _find_similar_persons(coordinates_3d: np.ndarray, top_k: int = 10) -> List[tuple]:
+    """Step 6 of /generate-embedding: (person_id, distance) of the nearest persons"""
+    if config.NEAREST_NEIGHBOR_BACKEND == 'bigquery':
+        return db.find_nearest_persons(
+            float(coordinates_3d[0]), float(coordinates_3d[1]), float(coordinates_3d[2]), k=top_k
+        )
+    
+    all_person_ids, all_coordinates = db.get_all_coordinates()
+    return embedding_service.find_similar_persons(
+        coordinates_3d, all_person_ids, all_coordinates, top_k=top_k
+    )
+
+
 @app.post("/api/v1/generate-embedding", response_model=UserEmbeddingResponse, tags=["embedding"])
 async def generate_user_embedding(request: UserEmbeddingRequest):
     """
@@ -309,11 +460,8 @@ async def generate_user_embedding(request: UserEmbeddingRequest):
         # Step 2: Generate 768D embedding
         embedding_768d = embedding_service.generate_embedding(narrative)
         
-        # Step 3: Load models if not already loaded
+        # Step 3: Models are loaded from disk at startup
         if embedding_service.pca_model is None:
-            # Load from saved dim_reduction run
-            # For simplicity, we'll regenerate from database
-            # In production, save PCA/UMAP models to disk
             raise HTTPException(
                 status_code=503,
                 detail="PCA/UMAP models not available. Run dim_reduction.py first."
@@ -322,20 +470,23 @@ async def generate_user_embedding(request: UserEmbeddingRequest):
         # Step 4: Project to 3D
         coordinates_3d = embedding_service.project_to_3d(embedding_768d)
         
+        # Steps 5 and 6 are independent: fetch clusters and neighbors concurrently
+        clusters, similar_persons_data = await asyncio.gather(
+            _run_blocking(db.get_clusters_info),
+            _run_blocking(_find_similar_persons, coordinates_3d)
+        )
+        
         # Step 5: Find nearest cluster
-        clusters = db.get_clusters_info()
         nearest_cluster = embedding_service.find_nearest_cluster(coordinates_3d, clusters)
         
-        # Step 6: Find similar persons
-        all_person_ids, all_coordinates = db.get_all_coordinates()
-        similar_persons_data = embedding_service.find_similar_persons(
-            coordinates_3d, all_person_ids, all_coordinates, top_k=10
-        )
-        
         # Get detailed info for similar persons
+        persons = await asyncio.gather(*(
+            _run_blocking(db.get_person_by_id, person_id)
+            for person_id, _ in similar_persons_data
+        ))
+        
         similar_persons = []
-        for person_id, distance in similar_persons_data:
-            person = db.get_person_by_id(person_id)
+        for (person_id, distance), person in zip(similar_persons_data, persons):
             if person:
                 # Calculate similarity score (inverse of distance, normalized)
                 max_distance = 20.0  # Approximate max distance in 3D space
@@ -379,10 +530,25 @@ async def generate_user_embedding(request: UserEmbeddingRequest):
         raise HTTPException(status_code=500, detail=f"Error generating embedding: {str(e)}")
 
 
+@app.post("/api/v1/admin/cache/invalidate", tags=["admin"])
+async def invalidate_cache(x_admin_key: Optional[str] = Header(None)):
+    """
+    Drop all cached query results and responses
+    
+    Called by dim_reduction.py after new coordinates are written. Requires
+    the X-Admin-Key header to match config.ADMIN_API_KEY
+    """
+    if not config.ADMIN_API_KEY or not hmac.compare_digest(
+            (x_admin_key or '').encode(), config.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Invalid or missing admin key")
+    clear_all_caches()
+    return {"status": "invalidated", "timestamp": datetime.utcnow().isoformat()}
+
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={"detail": "Resource not found"}
     )
@@ -390,7 +556,7 @@ async def not_found_handler(request, exc):
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
@@ -72,8 +72,11 @@ class PersonSummary(BaseModel):
     """Summary information for a person"""
     person_id: str
     name: str
-    description: Optional[str]
-    occupation: List[str]
+    description: Optional[str] = None
+    occupation: List[str] = []
+    field_of_work: List[str] = []
+    birth_date: Optional[date] = None
+    death_date: Optional[date] = None
     cluster_id: Optional[int]
     cluster_label: Optional[str]
     coordinates: Optional[Coordinate3D]
@@ -102,8 +105,8 @@ class VisualizationPerson(BaseModel):
     """Person data optimized for 3D visualization"""
     person_id: str
     name: str
-    description: Optional[str]
-    occupation: List[str]
+    description: Optional[str] = None
+    occupation: List[str] = []
     x: float
     y: float
     z: float
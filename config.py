@@ -17,15 +17,24 @@ DATASET_LOCATION = ''  # Keep in same region as Workbench for performance
 VERTEX_AI_REGION = ''  # Vertex AI embeddings (us-central1 has good availability)
 EMBEDDING_MODEL = ''
 EMBEDDING_DIMENSION = 768
+EMBEDDING_MAX_INPUT_TOKENS = 2048  # Per-text input limit of the model; narratives are cut to fit when generated
 
 # Service Account
 SERVICE_ACCOUNT_EMAIL = ''
 
 # API Settings (for later)
 API_VERSION = 'v1'
+API_BASE_URL = 'http://localhost:8080'  # Used by pipeline scripts to invalidate API caches
+ADMIN_API_KEY = ''  # Shared secret for admin endpoints, sent as the X-Admin-Key header; empty disables them
+CACHE_TTL_SECONDS = 3600  # Read endpoints cache BigQuery results; data only changes on pipeline runs
+NEAREST_NEIGHBOR_BACKEND = 'bigquery'  # 'bigquery' (top-k computed server-side) or 'memory' (scan cached coordinates)
+KEEPALIVE_INTERVAL_SECONDS = 300  # API pings BigQuery this often so pooled connections don't go cold
+MAX_CONCURRENT_QUERIES = 8  # Worker threads for issuing independent BigQuery queries in parallel
 
 # Paths
 DATA_DIR = '/home/jupyter/lifeembedding/data'
 LOGS_DIR = '/home/jupyter/lifeembedding/logs'
+PCA_MODEL_FILE = 'data/models/pca_model.joblib'  # Relative to project root; written by dim_reduction.py
+UMAP_MODEL_FILE = 'data/models/umap_model.joblib'
 
 print(f"✅ Configuration loaded for project: {PROJECT_ID}")
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Compact BYTES encoding for embedding vectors stored in BigQuery
+
+Vectors are stored as packed float16 (2 bytes per value instead of 8 for
+FLOAT64 REPEATED). A row whose embedding_scale is set holds int8 values
+instead, to be multiplied by that scale.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def pack_embedding(vector: Sequence[float]) -> bytes:
+    """Pack an embedding as little-endian float16 bytes"""
+    return np.asarray(vector, dtype='<f2').tobytes()
+
+
+def unpack_embedding(data: bytes, scale: Optional[float] = None) -> np.ndarray:
+    """
+    Decode a packed embedding into a float32 vector
+
+    Args:
+        data: Bytes from the embedding_vector column
+        scale: embedding_scale of the row; None means float16 packing
+    """
+    if scale is None:
+        return np.frombuffer(data, dtype='<f2').astype(np.float32)
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+
+def unpack_embedding_matrix(blobs: Sequence[bytes],
+                            scales: Optional[Sequence[Optional[float]]] = None) -> np.ndarray:
+    """
+    Decode many packed embeddings of equal dimension into an (N, dim) float32 matrix
+
+    When every row is float16 (no scales) the blobs are joined and decoded in
+    one pass rather than row by row
+    """
+    if not blobs:
+        return np.empty((0, 0), dtype=np.float32)
+    if scales is not None and any(scale is not None for scale in scales):
+        return np.stack([unpack_embedding(data, scale) for data, scale in zip(blobs, scales)])
+    return np.frombuffer(b''.join(blobs), dtype='<f2').reshape(len(blobs), -1).astype(np.float32)
@@ -16,15 +16,21 @@ const api = axios.create({
 
 // API Service Functions
 export const apiService = {
-  // Get all persons (paginated)
-  getPersons: async (limit = 100, offset = 0, clusterId = null) => {
+  // Get all persons (cursor-paginated; pass nextCursor from the previous page)
+  getPersons: async (limit = 100, cursor = null, clusterId = null) => {
     try {
-      const params = { limit, offset };
+      const params = { limit };
+      if (cursor !== null) {
+        params.cursor = cursor;
+      }
       if (clusterId !== null) {
         params.cluster_id = clusterId;
       }
       const response = await api.get('/persons', { params });
-      return response.data;
+      return {
+        persons: response.data,
+        nextCursor: response.headers['x-next-cursor'] || null,
+      };
     } catch (error) {
       console.error('Error fetching persons:', error);
       throw error;
@@ -34,7 +40,10 @@ export const apiService = {
   // Get visualization data (all persons with 3D coordinates)
   getVisualizationData: async () => {
     try {
-      const response = await api.get('/visualization');
+      // Only occupation is shown on hover; descriptions come from /person/{id}
+      const response = await api.get('/visualization', {
+        params: { fields: 'occupation' },
+      });
       return response.data;
     } catch (error) {
       console.error('Error fetching visualization data:', error);
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Shared BigQuery client and progress logger for the table/view setup scripts
+One client per process with an HTTP pool large enough for concurrent RPCs
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+from functools import lru_cache
+from google.cloud import bigquery
+import google.auth
+import google.auth.transport.requests
+from requests.adapters import HTTPAdapter
+import config
+
+# Default requests pool is 10 connections; concurrent table RPCs need more
+HTTP_POOL_SIZE = 32
+HTTP_MAX_RETRIES = 3
+
+# Setup scripts report progress here: a single stdout handler writing bare
+# messages, so output reads the same as plain prints
+logger = logging.getLogger("lifeemb.ddl")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Return the process-wide BigQuery client, creating it on first use"""
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = google.auth.transport.requests.AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                          max_retries=HTTP_MAX_RETRIES)
+    session.mount("https://", adapter)
+    return bigquery.Client(project=config.PROJECT_ID, _http=session)
@@ -3,36 +3,163 @@
 """
 BigQuery Data Ingestion Module
 Loads cleaned Wikidata crawl data into BigQuery tables
+
+Records are streamed from the cleaned file, encoded straight to gzipped
+NDJSON staging files and loaded with batch load jobs. Staying row-streamed
+(rather than reading the whole file into a DataFrame) keeps memory flat,
+and NDJSON lets BigQuery coerce the ISO date strings into DATE/TIMESTAMP
+columns, which a Parquet load would reject as STRING.
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
+import orjson
 import uuid
+import ijson
+import tempfile
+import gzip
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import bigquery
-from google.cloud.exceptions import GoogleCloudError
+from google.cloud.exceptions import GoogleCloudError, NotFound
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+import logging.handlers
+import queue
+import atexit
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 import config
+from create_tables import TABLE_SPECS
+
+# Clustering each table is created with; ingestion restores it on tables
+# that lack it
+TABLE_CLUSTERING = {name: clustering_fields for name, _, _, clustering_fields, _ in TABLE_SPECS}
+
+# Set up logging: records are queued by the ingesting thread and written
+# to the file/console by a background listener, so logging never blocks on I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler(f'{config.LOGS_DIR}/bq_ingestion.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
 
-# Set up logging
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Records are queued with the bare message; the listener's handlers format them
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'{config.LOGS_DIR}/bq_ingestion.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Columns copied from the cleaned records (ids and created_at are added on top)
+_PERSON_FIELDS = (
+    'wikidata_id', 'name', 'description', 'birth_date', 'death_date', 'birth_place', 'death_place'
+)
+_PERSON_LIST_FIELDS = ('occupation', 'field_of_work', 'citizenship', 'languages')
+_EVENT_FIELDS = (
+    'event_type', 'event_title', 'event_description', 'start_date', 'end_date', 'point_in_time',
+    'location', 'organization', 'role_or_degree', 'field_or_major', 'sport', 'instrument', 'source'
+)
+
+
+
+def _key_prefixes(fields):
+    """Pair each field with its pre-encoded ',"<field>":' NDJSON prefix"""
+    return tuple((field, f',"{field}":'.encode('utf-8')) for field in fields)
+
+
+_PERSON_KEYS = _key_prefixes(_PERSON_FIELDS)
+_PERSON_LIST_KEYS = _key_prefixes(_PERSON_LIST_FIELDS)
+_EVENT_KEYS = _key_prefixes(_EVENT_FIELDS)
+
+# Load jobs uploaded concurrently while later records are still being transformed
+LOAD_JOB_WORKERS = 8
+
+# Staging files are also handed off once the events file holds this many
+# (uncompressed) bytes, so persons with hundreds of events can't make one
+# upload balloon and stall the pipeline
+EVENTS_BYTES_PER_LOAD = 64 * 1024 * 1024
+
+# Staging files allowed to wait for or be in upload at once; the transform
+# loop blocks beyond this so temp files don't pile up on disk
+MAX_PENDING_LOADS = 2 * LOAD_JOB_WORKERS
+
+
+# person_id is uuid5(NAMESPACE_URL, <entity URL>) so re-ingesting a record gives the same id
+WIKIDATA_ENTITY_URL = 'http://www.wikidata.org/entity/'
+
+# Lifetime of the per-run staging tables in case a run dies before dropping them
+STAGING_TABLE_EXPIRATION = timedelta(days=1)
+
+# RFC 4122 variant nibble (10xx) for each random hex digit
+_UUID_VARIANT = {c: '89ab'[int(c, 16) & 3] for c in '0123456789abcdef'}
+
+
+def _gen_uuids(n: int) -> List[str]:
+    """
+    Generate n random (version 4) UUID strings from a single os.urandom call
+    
+    Formats straight from the hex digest into the dashed 8-4-4-4-12 layout
+    already stored in the tables, without building UUID objects
+    """
+    h = os.urandom(16 * n).hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-4{h[i + 13:i + 16]}-"
+        f"{_UUID_VARIANT[h[i + 16]]}{h[i + 17:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
 
 class BigQueryIngestor:
     """Handles data ingestion into BigQuery tables"""
     
+    # Post-ingestion checks; {persons}/{events} are filled with the table ids
+    _VALIDATION_QUERIES = {
+        "Persons count": "SELECT COUNT(*) as count FROM `{persons}`",
+        "Events count": "SELECT COUNT(*) as count FROM `{events}`",
+        "Events per person": """
+            SELECT 
+                COUNT(DISTINCT person_id) as persons,
+                COUNT(*) as events,
+                ROUND(COUNT(*) / COUNT(DISTINCT person_id), 2) as avg_events_per_person
+            FROM `{events}`
+        """,
+        "Event type breakdown": """
+            SELECT 
+                event_type,
+                COUNT(*) as count
+            FROM `{events}`
+            GROUP BY event_type
+            ORDER BY count DESC
+            LIMIT 10
+        """,
+        "Persons without events": """
+            SELECT COUNT(*) as count
+            FROM `{persons}` p
+            LEFT JOIN `{events}` e ON p.person_id = e.person_id
+            WHERE e.event_id IS NULL
+        """,
+        "Occupation distribution": """
+            SELECT 
+                occupation,
+                COUNT(*) as count
+            FROM `{persons}`,
+            UNNEST(occupation) as occupation
+            GROUP BY occupation
+            ORDER BY count DESC
+            LIMIT 10
+        """
+    }
+    
     def __init__(self):
         """Initialize BigQuery client and table references"""
         self.client = bigquery.Client(project=config.PROJECT_ID)
@@ -42,176 +169,368 @@ class BigQueryIngestor:
         self.persons_table = f"{config.PROJECT_ID}.{self.dataset_id}.persons"
         self.life_events_table = f"{config.PROJECT_ID}.{self.dataset_id}.life_events"
         
+        # Load jobs (free, no streaming-insert quotas) append to per-run
+        # staging tables created with the target schema, which are then
+        # MERGEd into the targets
+        self.load_job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND
+        )
+        
+        # Fetch both tables once up front: a missing table fails here rather
+        # than after the whole input has been transformed, and the Table
+        # objects supply the staging-table schema and MERGE targets. Cluster
+        # them on the join key before writing into them.
+        self._persons_tbl = self.ensure_clustered(self.client.get_table(self.persons_table), TABLE_CLUSTERING['persons'])
+        self._events_tbl = self.ensure_clustered(self.client.get_table(self.life_events_table), TABLE_CLUSTERING['life_events'])
+        self._events_tbl = self.ensure_event_sequence_column(self._events_tbl)
+        
+        # Ingestion-run timestamp stamped on every row as created_at (JSON-encoded)
+        self._run_ts_json = orjson.dumps(datetime.utcnow().isoformat())
+        
+        # Uploads staged files in the background while ingest_data keeps transforming
+        self._pool = ThreadPoolExecutor(max_workers=LOAD_JOB_WORKERS)
+        self._pending_loads = threading.BoundedSemaphore(MAX_PENDING_LOADS)
+        
         logger.info(f"Initialized BigQuery client for project: {config.PROJECT_ID}")
         logger.info(f"Target dataset: {self.dataset_id}")
     
-    def load_cleaned_data(self, filepath: str) -> List[Dict[str, Any]]:
-        """Load cleaned JSON data"""
-        logger.info(f"Loading cleaned data from {filepath}...")
+    def ensure_clustered(self, table: bigquery.Table, clustering_fields: List[str]) -> bigquery.Table:
+        """
+        Set clustering on a table created without it (e.g. before create_tables.py clustered it)
+        
+        BigQuery applies a changed clustering spec to data written afterwards,
+        so this must run before the load jobs
+        
+        Returns:
+            The (possibly updated) table
+        """
+        if table.clustering_fields == clustering_fields:
+            return table
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        try:
+            table.clustering_fields = clustering_fields
+            table = self.client.update_table(table, ['clustering_fields'])
+            logger.info(f"Clustered {table.full_table_id} by {', '.join(clustering_fields)}")
+            
+        except GoogleCloudError as e:
+            logger.warning(f"Could not set clustering on {table.full_table_id}: {e}")
         
-        logger.info(f"Loaded {len(data)} person records")
-        return data
+        return table
     
-    def transform_person_data(self, person: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform person data to match BigQuery schema"""
-        
-        # Generate UUID for person_id
-        person_id = str(uuid.uuid4())
-        
-        # Transform to BigQuery schema
-        bq_person = {
-            'person_id': person_id,
-            'wikidata_id': person.get('wikidata_id'),
-            'name': person.get('name'),
-            'description': person.get('description'),
-            'occupation': person.get('occupation', []),
-            'field_of_work': person.get('field_of_work', []),
-            'citizenship': person.get('citizenship', []),
-            'languages': person.get('languages', []),
-            'birth_date': person.get('birth_date'),
-            'death_date': person.get('death_date'),
-            'birth_place': person.get('birth_place'),
-            'death_place': person.get('death_place'),
-            'created_at': datetime.utcnow().isoformat()
-        }
+    def ensure_event_sequence_column(self, table: bigquery.Table) -> bigquery.Table:
+        """
+        Add the event_sequence column to a life_events table created before it existed
+        
+        Returns:
+            The (possibly updated) table
+        """
+        if any(field.name == 'event_sequence' for field in table.schema):
+            return table
         
-        return bq_person, person_id
+        table.schema = [*table.schema, bigquery.SchemaField(
+            "event_sequence", "INT64", mode="NULLABLE",
+            description="Per-person chronological ordinal (set at ingestion for events with a start_date)"
+        )]
+        table = self.client.update_table(table, ['schema'])
+        logger.info(f"Added event_sequence column to {table.full_table_id}")
+        return table
     
-    def transform_life_events(self, person: Dict[str, Any], person_id: str) -> List[Dict[str, Any]]:
-        """Transform life events to match BigQuery schema"""
+    def make_ids(self, person: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """
+        Ids for a person and their life events
         
-        bq_events = []
+        Derived from wikidata_id, so re-ingesting the same record produces the
+        same ids and the MERGE skips it; records without a wikidata_id get
+        random ids
         
-        for event in person.get('life_events', []):
-            # Generate UUID for event_id
-            event_id = str(uuid.uuid4())
-            
-            bq_event = {
-                'event_id': event_id,
-                'person_id': person_id,
-                'event_type': event.get('event_type'),
-                'event_title': event.get('event_title'),
-                'event_description': event.get('event_description'),
-                'start_date': event.get('start_date'),
-                'end_date': event.get('end_date'),
-                'point_in_time': event.get('point_in_time'),
-                'location': event.get('location'),
-                'organization': event.get('organization'),
-                'role_or_degree': event.get('role_or_degree'),
-                'field_or_major': event.get('field_or_major'),
-                'sport': event.get('sport'),
-                'instrument': event.get('instrument'),
-                'source': event.get('source'),
-                'created_at': datetime.utcnow().isoformat()
-            }
-            
-            bq_events.append(bq_event)
+        Returns:
+            Tuple of (person_id, event_ids aligned with life_events)
+        """
+        num_events = len(person.get('life_events', []))
+        wikidata_id = person.get('wikidata_id')
+        
+        if not wikidata_id:
+            ids = _gen_uuids(1 + num_events)
+            return ids[0], ids[1:]
         
-        return bq_events
+        person_uuid = uuid.uuid5(uuid.NAMESPACE_URL, WIKIDATA_ENTITY_URL + wikidata_id)
+        event_ids = [str(uuid.uuid5(person_uuid, str(i))) for i in range(num_events)]
+        return str(person_uuid), event_ids
     
-    def insert_persons_batch(self, persons: List[Dict[str, Any]]) -> int:
-        """Insert persons data in batch"""
+    def create_staging_table(self, target: bigquery.Table, run_id: str) -> bigquery.Table:
+        """Create an empty, expiring copy of target's schema for this run's load jobs"""
+        staging = bigquery.Table(f"{target.project}.{target.dataset_id}.{target.table_id}_staging_{run_id}",
+                                 schema=target.schema)
+        staging.expires = datetime.utcnow() + STAGING_TABLE_EXPIRATION
+        return self.client.create_table(staging)
+    
+    def merge_staging_table(self, staging: bigquery.Table, target: bigquery.Table, key: str) -> int:
+        """
+        Insert staging rows whose key isn't in target yet
+        
+        Rows already present (from an earlier run, or duplicated within this
+        one) are skipped, so re-running ingestion is a no-op
         
-        logger.info(f"Inserting {len(persons)} persons into {self.persons_table}...")
+        Returns:
+            Number of rows inserted
+        """
+        query = f"""
+            MERGE `{target.project}.{target.dataset_id}.{target.table_id}` t
+            USING (
+                SELECT * FROM `{staging.project}.{staging.dataset_id}.{staging.table_id}`
+                WHERE TRUE
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY {key}) = 1
+            ) s
+            ON t.{key} = s.{key}
+            WHEN NOT MATCHED THEN INSERT ROW
+        """
         
         try:
-            errors = self.client.insert_rows_json(self.persons_table, persons)
-            
-            if errors:
-                logger.error(f"Errors inserting persons: {errors}")
-                return 0
-            
-            logger.info(f"✓ Successfully inserted {len(persons)} persons")
-            return len(persons)
+            job = self.client.query(query)
+            job.result()
+            inserted = job.num_dml_affected_rows or 0
+            logger.info("Merged %d new rows into %s", inserted, target.table_id)
+            return inserted
             
         except GoogleCloudError as e:
-            logger.error(f"BigQuery error inserting persons: {e}")
+            logger.error("BigQuery error merging into %s: %s", target.table_id, e)
             return 0
     
-    def insert_events_batch(self, events: List[Dict[str, Any]]) -> int:
-        """Insert life events data in batch"""
+    def update_event_sequence(self, staging: bigquery.Table) -> int:
+        """
+        Recompute event_sequence for every person with events in staging
         
-        logger.info(f"Inserting {len(events)} life events into {self.life_events_table}...")
+        Numbers each person's dated events by start_date (event_id breaks
+        ties), so v_event_timeline reads the ordinal instead of running a
+        window over the whole table on every query
+        
+        Returns:
+            Number of events whose event_sequence changed
+        """
+        query = f"""
+            MERGE `{self.life_events_table}` t
+            USING (
+                SELECT
+                    event_id,
+                    ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY start_date, event_id) AS event_sequence
+                FROM `{self.life_events_table}`
+                WHERE start_date IS NOT NULL
+                  AND person_id IN (
+                      SELECT DISTINCT person_id
+                      FROM `{staging.project}.{staging.dataset_id}.{staging.table_id}`
+                  )
+            ) s
+            ON t.event_id = s.event_id
+            WHEN MATCHED AND t.event_sequence IS DISTINCT FROM s.event_sequence THEN
+                UPDATE SET event_sequence = s.event_sequence
+        """
         
         try:
-            errors = self.client.insert_rows_json(self.life_events_table, events)
+            job = self.client.query(query)
+            job.result()
+            updated = job.num_dml_affected_rows or 0
+            logger.info("Updated event_sequence on %d events", updated)
+            return updated
             
-            if errors:
-                logger.error(f"Errors inserting events: {errors}")
-                return 0
+        except GoogleCloudError as e:
+            logger.error("BigQuery error updating event_sequence: %s", e)
+            return 0
+    
+    def stream_cleaned_data(self, filepath: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream person records from the cleaned JSON file one at a time
+        
+        Parses incrementally with ijson, so memory stays flat regardless of
+        file size and ingestion starts before the whole file is read
+        """
+        logger.info(f"Streaming cleaned data from {filepath}...")
+        
+        with open(filepath, 'rb') as f:
+            # use_float: numbers as float rather than Decimal, which orjson can't encode
+            yield from ijson.items(f, 'item', use_float=True)
+    
+    def person_ndjson(self, person: Dict[str, Any], person_id: str) -> bytes:
+        """
+        Encode a person as one NDJSON line matching the BigQuery schema
+        
+        Field values are encoded straight from the cleaned record next to
+        pre-encoded keys, without building an intermediate row dict
+        """
+        get = person.get
+        return b''.join((
+            b'{"person_id":', orjson.dumps(person_id),
+            *(key + orjson.dumps(get(field)) for field, key in _PERSON_KEYS),
+            *(key + orjson.dumps(get(field, [])) for field, key in _PERSON_LIST_KEYS),
+            b',"created_at":', self._run_ts_json, b'}\n'
+        ))
+    
+    def events_ndjson(self, person: Dict[str, Any], person_id: str, event_ids: List[str]) -> bytes:
+        """Encode a person's life events as NDJSON lines (event_ids aligned with life_events)"""
+        person_part = b',"person_id":' + orjson.dumps(person_id)
+        tail = b',"created_at":' + self._run_ts_json + b'}\n'
+        
+        lines = []
+        for event, event_id in zip(person.get('life_events', []), event_ids):
+            get = event.get
+            lines.append(b''.join((
+                b'{"event_id":', orjson.dumps(event_id), person_part,
+                *(key + orjson.dumps(get(field)) for field, key in _EVENT_KEYS),
+                tail
+            )))
+        
+        return b''.join(lines)
+    
+    def load_ndjson(self, fp, table: bigquery.Table, label: str) -> int:
+        """
+        Load an NDJSON file (plain or gzip-compressed) into a table with a single load job
+        
+        Args:
+            fp: Binary file object (rewound before upload)
+            table: Destination table
+            label: Row description for logging (e.g. 'persons')
             
-            logger.info(f"✓ Successfully inserted {len(events)} life events")
-            return len(events)
+        Returns:
+            Number of rows loaded (0 on failure)
+        """
+        logger.info("Loading %s into %s...", label, table.full_table_id)
+        
+        try:
+            fp.seek(0)
+            job = self.client.load_table_from_file(fp, table, job_config=self.load_job_config)
+            job.result()
+            
+            logger.info("✓ Successfully loaded %d %s", job.output_rows, label)
+            return job.output_rows
             
         except GoogleCloudError as e:
-            logger.error(f"BigQuery error inserting events: {e}")
+            logger.error("BigQuery error loading %s: %s", label, e)
             return 0
     
-    def ingest_data(self, data: List[Dict[str, Any]], batch_size: int = 100):
-        """Main ingestion process with batching"""
+    @staticmethod
+    def _new_staging_file() -> gzip.GzipFile:
+        """
+        Open a temporary gzip-compressed NDJSON staging file
+        
+        NDJSON compresses several-fold, so the upload to the load job is that
+        much smaller; level 1 keeps compression cheap next to encoding
+        """
+        return gzip.GzipFile(fileobj=tempfile.TemporaryFile(), mode='wb', compresslevel=1)
+    
+    def _load_and_close(self, staging: gzip.GzipFile, table: bigquery.Table, label: str) -> int:
+        """Finish a staging file, load it, then close (and so delete) it"""
+        empty = staging.tell() == 0
+        raw = staging.fileobj
+        staging.close()  # writes the gzip trailer; raw stays open
+        
+        try:
+            if empty:
+                logger.info("No %s to load into %s", label, table.full_table_id)
+                return 0
+            return self.load_ndjson(raw, table, label)
+        finally:
+            raw.close()
+    
+    def _submit_load(self, fp, table: bigquery.Table, label: str):
+        """Queue one staging file for loading, waiting while too many are pending"""
+        self._pending_loads.acquire()
+        future = self._pool.submit(self._load_and_close, fp, table, label)
+        future.add_done_callback(lambda _: self._pending_loads.release())
+        return future
+    
+    def _submit_staged(self, persons_fp, events_fp, staged: int, loads: list,
+                       persons_staging: bigquery.Table, events_staging: bigquery.Table):
+        """Hand one pair of staging files to the upload pool"""
+        loads.append((
+            self._submit_load(persons_fp, persons_staging, 'persons'),
+            self._submit_load(events_fp, events_staging, 'life events'),
+            staged
+        ))
+    
+    def ingest_data(self, data: Iterable[Dict[str, Any]], persons_per_load: int = 10000,
+                    events_bytes_per_load: int = EVENTS_BYTES_PER_LOAD):
+        """
+        Main ingestion process
+        
+        Transformed rows are staged as gzipped NDJSON in temporary files. Every
+        persons_per_load persons (or events_bytes_per_load bytes of events,
+        whichever comes first) the files are handed to a thread pool and
+        loaded with one load job per table, so uploads overlap with
+        transforming the rest of the input.
+        
+        Loads go to per-run staging tables that are then MERGEd into persons
+        and life_events on their ids. Ids are derived from wikidata_id, so
+        records ingested by an earlier run are skipped instead of duplicated.
+        """
         
         logger.info("="*60)
         logger.info("STARTING DATA INGESTION")
         logger.info("="*60)
         
-        total_persons = 0
-        total_events = 0
+        # created_at is per ingestion run, not per row
+        self._run_ts_json = orjson.dumps(datetime.utcnow().isoformat())
+        
         failed_persons = 0
         
-        persons_batch = []
-        events_batch = []
+        run_id = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        persons_staging = self.create_staging_table(self._persons_tbl, run_id)
+        events_staging = self.create_staging_table(self._events_tbl, run_id)
         
-        for i, person in enumerate(data, 1):
-            try:
-                # Transform person data
-                bq_person, person_id = self.transform_person_data(person)
-                persons_batch.append(bq_person)
+        try:
+            loads = []
+            persons_fp, events_fp = self._new_staging_file(), self._new_staging_file()
+            staged = 0
+            
+            for i, person in enumerate(data, 1):
+                try:
+                    person_id, event_ids = self.make_ids(person)
                 
-                # Transform life events
-                bq_events = self.transform_life_events(person, person_id)
-                events_batch.extend(bq_events)
+                    # Encode both rows before writing either, so a bad record is skipped whole
+                    person_line = self.person_ndjson(person, person_id)
+                    event_lines = self.events_ndjson(person, person_id, event_ids)
                 
-                # Insert in batches
-                if len(persons_batch) >= batch_size:
-                    success = self.insert_persons_batch(persons_batch)
-                    total_persons += success
-                    if success == 0:
-                        failed_persons += len(persons_batch)
-                    persons_batch = []
+                    persons_fp.write(person_line)
+                    events_fp.write(event_lines)
+                    staged += 1
                 
-                if len(events_batch) >= batch_size * 10:  # Larger batch for events
-                    success = self.insert_events_batch(events_batch)
-                    total_events += success
-                    events_batch = []
+                    # Upload in the background and start new staging files
+                    if staged >= persons_per_load or events_fp.tell() >= events_bytes_per_load:
+                        self._submit_staged(persons_fp, events_fp, staged, loads, persons_staging, events_staging)
+                        persons_fp, events_fp = self._new_staging_file(), self._new_staging_file()
+                        staged = 0
                 
-                # Progress logging
-                if i % 50 == 0:
-                    logger.info(f"Progress: {i}/{len(data)} persons processed")
+                    # Progress logging
+                    if i % 50 == 0:
+                        logger.info("Progress: %d persons processed", i)
                     
-            except Exception as e:
-                logger.error(f"Error processing person {person.get('name', 'Unknown')}: {e}")
-                failed_persons += 1
-        
-        # Insert remaining batches
-        if persons_batch:
-            success = self.insert_persons_batch(persons_batch)
-            total_persons += success
-            if success == 0:
-                failed_persons += len(persons_batch)
-        
-        if events_batch:
-            success = self.insert_events_batch(events_batch)
-            total_events += success
+                except Exception as e:
+                    logger.error("Error processing person %s: %s", person.get('name', 'Unknown'), e)
+                    failed_persons += 1
+            
+            # Load remaining rows
+            self._submit_staged(persons_fp, events_fp, staged, loads, persons_staging, events_staging)
+            
+            for persons_future, events_future, staged in loads:
+                if persons_future.result() == 0:
+                    failed_persons += staged
+                events_future.result()
+            
+            # Move new rows into the real tables
+            total_persons = self.merge_staging_table(persons_staging, self._persons_tbl, 'person_id')
+            total_events = self.merge_staging_table(events_staging, self._events_tbl, 'event_id')
+            if total_events:
+                self.update_event_sequence(events_staging)
+            
+        finally:
+            for staging in (persons_staging, events_staging):
+                self.client.delete_table(staging, not_found_ok=True)
         
         # Summary
         logger.info("\n" + "="*60)
         logger.info("INGESTION COMPLETE")
         logger.info("="*60)
-        logger.info(f"Total persons inserted: {total_persons}")
-        logger.info(f"Total events inserted: {total_events}")
+        logger.info(f"Total persons inserted (new): {total_persons}")
+        logger.info(f"Total events inserted (new): {total_events}")
         logger.info(f"Failed persons: {failed_persons}")
         logger.info("="*60)
         
@@ -225,53 +544,27 @@ class BigQueryIngestor:
         logger.info("="*60)
         
         queries = {
-            "Persons count": f"SELECT COUNT(*) as count FROM `{self.persons_table}`",
-            "Events count": f"SELECT COUNT(*) as count FROM `{self.life_events_table}`",
-            "Events per person": f"""
-                SELECT 
-                    COUNT(DISTINCT person_id) as persons,
-                    COUNT(*) as events,
-                    ROUND(COUNT(*) / COUNT(DISTINCT person_id), 2) as avg_events_per_person
-                FROM `{self.life_events_table}`
-            """,
-            "Event type breakdown": f"""
-                SELECT 
-                    event_type,
-                    COUNT(*) as count
-                FROM `{self.life_events_table}`
-                GROUP BY event_type
-                ORDER BY count DESC
-                LIMIT 10
-            """,
-            "Persons without events": f"""
-                SELECT COUNT(*) as count
-                FROM `{self.persons_table}` p
-                LEFT JOIN `{self.life_events_table}` e ON p.person_id = e.person_id
-                WHERE e.event_id IS NULL
-            """,
-            "Occupation distribution": f"""
-                SELECT 
-                    occupation,
-                    COUNT(*) as count
-                FROM `{self.persons_table}`,
-                UNNEST(occupation) as occupation
-                GROUP BY occupation
-                ORDER BY count DESC
-                LIMIT 10
-            """
+            name: query.format(persons=self.persons_table, events=self.life_events_table)
+            for name, query in self._VALIDATION_QUERIES.items()
         }
         
-        for query_name, query in queries.items():
-            logger.info(f"\n{query_name}:")
+        # Independent queries: run them all at once, then report in order
+        futures = {
+            query_name: self._pool.submit(lambda q: list(self.client.query(q).result()), query)
+            for query_name, query in queries.items()
+        }
+        
+        for query_name, future in futures.items():
+            logger.info("\n%s:", query_name)
             try:
-                result = self.client.query(query).result()
+                result = future.result()
                 
                 for row in result:
                     row_dict = dict(row)
-                    logger.info(f"  {row_dict}")
+                    logger.info("  %s", row_dict)
                     
             except GoogleCloudError as e:
-                logger.error(f"Error running validation query: {e}")
+                logger.error("Error running validation query: %s", e)
         
         logger.info("\n" + "="*60)
 
@@ -289,22 +582,29 @@ def main():
         return
     
     # Initialize ingestor
-    ingestor = BigQueryIngestor()
+    try:
+        ingestor = BigQueryIngestor()
+    except NotFound as e:
+        logger.error(f"Target table not found: {e}")
+        logger.error("Please run create_tables.py first")
+        return
     
-    # Load cleaned data
-    data = ingestor.load_cleaned_data(input_file)
+    # Stream cleaned data (records are parsed as ingestion consumes them)
+    data = ingestor.stream_cleaned_data(input_file)
     
     # Confirm before ingestion
-    logger.info(f"\nReady to ingest {len(data)} persons into BigQuery")
+    logger.info(f"\nReady to ingest persons from {input_file} into BigQuery")
     logger.info(f"Target dataset: {config.DATASET_ID}")
     logger.info(f"Tables: persons, life_events")
     
     # Ingest data
-    total_persons, total_events, failed = ingestor.ingest_data(data, batch_size=100)
+    total_persons, total_events, failed = ingestor.ingest_data(data)
     
     # Validate
     if total_persons > 0:
         ingestor.validate_ingestion()
+    elif failed == 0:
+        logger.info("No new persons: every record was already in BigQuery")
     else:
         logger.error("No data was ingested. Check errors above.")
     
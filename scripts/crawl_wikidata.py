@@ -9,12 +9,16 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from SPARQLWrapper import SPARQLWrapper, JSON
-import json
+import urllib3
+import orjson
 import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import logging
 from datetime import datetime
+from functools import lru_cache
 import config
 
 # Set up logging
@@ -28,144 +32,279 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def setup_sparql():
-    """Initialize SPARQL wrapper with proper user agent"""
-    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
-    sparql.setReturnFormat(JSON)
-    sparql.addCustomHttpHeader("User-Agent", "LifeEmbedding-JHU-Project/1.0 (lifeembedding@jhu.edu)")
-    return sparql
+SPARQL_ENDPOINT = "https://query.wikidata.org/sparql"
+WIKIDATA_ENTITY_PREFIX = "http://www.wikidata.org/entity/"
 
-def get_person_ids(sparql, target=1000):
+# Queries larger than this are POSTed; smaller ones stay GET so re-runs can
+# hit the endpoint's response cache
+POST_THRESHOLD_BYTES = 2048
+
+# Parallel metadata workers; Wikidata allows 5 concurrent queries per client
+MAX_WORKERS = 5
+# Global request rate across all workers
+MAX_QUERIES_PER_SECOND = 5
+# Throttling responses are retried, honouring Retry-After or else backing off
+# exponentially from BACKOFF_BASE_SECONDS
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 2
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart"""
+    
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def pause(self, seconds):
+        """Hold back every caller for at least the given number of seconds"""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+rate_limiter = RateLimiter(MAX_QUERIES_PER_SECOND)
+
+# One thread-safe keep-alive connection pool shared by all workers
+SPARQL_POOL = urllib3.PoolManager(
+    maxsize=MAX_WORKERS,
+    headers={
+        "User-Agent": "LifeEmbedding-JHU-Project/1.0 (lifeembedding@jhu.edu)",
+        "Accept": "application/sparql-results+json",
+    },
+)
+
+def retry_after_seconds(response):
+    """Return the Retry-After delay in seconds, or None if absent or not numeric"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+def sparql_query(query):
+    """
+    Run a SPARQL query against Wikidata and return the decoded JSON results
+    
+    Requests go through the shared rate limiter; on 429/503 every worker is
+    paused for the server's Retry-After (or an exponential backoff) and the
+    query is retried
+    """
+    use_post = len(query.encode('utf-8')) > POST_THRESHOLD_BYTES
+    
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.wait()
+        if use_post:
+            response = SPARQL_POOL.request_encode_body(
+                "POST", SPARQL_ENDPOINT, fields={"query": query}, encode_multipart=False
+            )
+        else:
+            response = SPARQL_POOL.request_encode_url("GET", SPARQL_ENDPOINT, fields={"query": query})
+        
+        if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        
+        delay = retry_after_seconds(response) or BACKOFF_BASE_SECONDS * 2 ** attempt
+        logger.warning(f"Throttled by Wikidata (HTTP {response.status}), retrying in {delay:.0f}s")
+        rate_limiter.pause(delay)
+    
+    if response.status != 200:
+        raise urllib3.exceptions.HTTPError(
+            f"SPARQL query failed with HTTP {response.status}: {response.data[:200]!r}"
+        )
+    return orjson.loads(response.data)
+
+# Occupations fetched per SPARQL request in get_person_ids
+OCCUPATIONS_PER_QUERY = 10
+
+def build_occupation_query(occ_qids, per_occupation):
+    """
+    Build one query returning (occ, person) pairs plus basic info for several occupations
+    
+    Each occupation gets its own LIMITed sub-select so the per-occupation cap
+    still holds, and the blocks are UNIONed into a single request
+    """
+    blocks = []
+    for occ_qid in occ_qids:
+        blocks.append(f"""
+          {{
+            {{
+              SELECT DISTINCT ?person WHERE {{
+                ?person wdt:P31 wd:Q5;                # Human
+                        wdt:P106 wd:{occ_qid}.        # Specific occupation
+                
+                # Must have English Wikipedia
+                ?article schema:about ?person;
+                         schema:isPartOf <https://en.wikipedia.org/>.
+              }}
+              LIMIT {per_occupation}
+            }}
+            BIND(wd:{occ_qid} AS ?occ)
+          }}""")
+    
+    occupation_blocks = "\n          UNION".join(blocks)
+    
+    return f"""
+        SELECT ?occ ?person ?name ?desc ?birthDate ?deathDate ?birthPlace ?deathPlace WHERE {{
+          {{{occupation_blocks}
+          }}
+          
+          # Basic info for every candidate, so step 2 needn't query it again
+          OPTIONAL {{
+            ?person rdfs:label ?name.
+            FILTER(LANG(?name) = "en")
+          }}
+          OPTIONAL {{
+            ?person schema:description ?desc.
+            FILTER(LANG(?desc) = "en")
+          }}
+          OPTIONAL {{ ?person wdt:P569 ?birthDate. }}
+          OPTIONAL {{ ?person wdt:P570 ?deathDate. }}
+          OPTIONAL {{ 
+            ?person wdt:P19 ?birthPlaceEntity.
+            ?birthPlaceEntity rdfs:label ?birthPlace.
+            FILTER(LANG(?birthPlace) = "en")
+          }}
+          OPTIONAL {{ 
+            ?person wdt:P20 ?deathPlaceEntity.
+            ?deathPlaceEntity rdfs:label ?deathPlace.
+            FILTER(LANG(?deathPlace) = "en")
+          }}
+        }}
+        """
+
+def get_person_ids(target=1000):
     """
     Get diverse person IDs from Wikidata across 50+ occupations
     Targets ~20 people per occupation for rich clustering
+    
+    Returns:
+        Dict mapping person ID to its basic info, in discovery order
     """
     logger.info(f"Fetching person IDs across diverse occupations (target: {target})...")
     
-    # Define 50+ diverse occupations (QIDs)
-    occupations = {
+    # Define 50+ diverse occupations as (QID, label) pairs
+    occupations = [
         # STEM
-        "Q5482740": "computer scientist",
-        "Q169470": "physicist", 
-        "Q170790": "mathematician",
-        "Q593644": "chemist",
-        "Q15978367": "biologist",
-        "Q11063": "astronomer",
-        "Q205375": "engineer",
-        "Q901402": "data scientist",
-        "Q105186": "medical doctor",
+        ("Q5482740", "computer scientist"),
+        ("Q169470", "physicist"), 
+        ("Q170790", "mathematician"),
+        ("Q593644", "chemist"),
+        ("Q15978367", "biologist"),
+        ("Q11063", "astronomer"),
+        ("Q205375", "engineer"),
+        ("Q901402", "data scientist"),
+        ("Q105186", "medical doctor"),
         
         # Social Sciences & Humanities
-        "Q188094": "economist",
-        "Q4964182": "philosopher",
-        "Q36180": "writer",
-        "Q6625963": "novelist",
-        "Q49757": "poet",
-        "Q201788": "historian",
-        "Q4773904": "anthropologist",
-        "Q20826540": "sociologist",
-        "Q211346": "political scientist",
-        "Q212980": "psychologist",
+        ("Q188094", "economist"),
+        ("Q4964182", "philosopher"),
+        ("Q36180", "writer"),
+        ("Q6625963", "novelist"),
+        ("Q49757", "poet"),
+        ("Q201788", "historian"),
+        ("Q4773904", "anthropologist"),
+        ("Q20826540", "sociologist"),
+        ("Q211346", "political scientist"),
+        ("Q212980", "psychologist"),
         
         # Arts & Creative
-        "Q1028181": "painter",
-        "Q1281618": "sculptor",
-        "Q483501": "artist",
-        "Q822146": "photographer",
-        "Q639669": "musician",
-        "Q36834": "composer",
-        "Q488205": "singer-songwriter",
-        "Q3282637": "film producer",
-        "Q2526255": "film director",
-        "Q33999": "actor",
-        "Q10800557": "film actor",
+        ("Q1028181", "painter"),
+        ("Q1281618", "sculptor"),
+        ("Q483501", "artist"),
+        ("Q822146", "photographer"),
+        ("Q639669", "musician"),
+        ("Q36834", "composer"),
+        ("Q488205", "singer-songwriter"),
+        ("Q3282637", "film producer"),
+        ("Q2526255", "film director"),
+        ("Q33999", "actor"),
+        ("Q10800557", "film actor"),
         
         # Sports & Athletics
-        "Q2066131": "athlete",
-        "Q937857": "association football player",
-        "Q5137571": "basketball player",
-        "Q10871364": "baseball player",
-        "Q13141064": "tennis player",
+        ("Q2066131", "athlete"),
+        ("Q937857", "association football player"),
+        ("Q3665646", "basketball player"),
+        ("Q10871364", "baseball player"),
+        ("Q13141064", "tennis player"),
         
         # Business & Leadership
-        "Q131524": "entrepreneur",
-        "Q170790": "business executive",
-        "Q212238": "civil servant",
-        "Q82955": "politician",
-        "Q15253558": "activist",
+        ("Q131524", "entrepreneur"),
+        ("Q43845", "businessperson"),
+        ("Q212238", "civil servant"),
+        ("Q82955", "politician"),
+        ("Q15253558", "activist"),
         
         # Law & Military
-        "Q40348": "lawyer",
-        "Q16533": "judge",
-        "Q47064": "military personnel",
+        ("Q40348", "lawyer"),
+        ("Q16533", "judge"),
+        ("Q47064", "military personnel"),
         
         # Education & Religion
-        "Q1622272": "university teacher",
-        "Q1234713": "theologian",
+        ("Q1622272", "university teacher"),
+        ("Q1234713", "theologian"),
         
         # Media & Communication
-        "Q1930187": "journalist",
-        "Q947873": "television presenter",
-        "Q2722764": "radio personality",
+        ("Q1930187", "journalist"),
+        ("Q947873", "television presenter"),
+        ("Q2722764", "radio personality"),
         
         # Tech & Innovation
-        "Q5137571": "software developer",
-        "Q1114448": "researcher",
-    }
+        ("Q183888", "software developer"),
+        ("Q1114448", "researcher"),
+    ]
     
-    person_ids = []
+    person_info = {}
     occupation_counts = {}
     
     # Query ~25 people per occupation (to get ~20 complete after filtering)
     per_occupation = 25
     
-    for occ_qid, occ_label in tqdm(occupations.items(), desc="Fetching occupations"):
-        query = f"""
-        SELECT DISTINCT ?person WHERE {{
-          ?person wdt:P31 wd:Q5;                    # Human
-                  wdt:P106 wd:{occ_qid}.            # Specific occupation
-
-          # Must have English Wikipedia
-          ?article schema:about ?person;
-                   schema:isPartOf <https://en.wikipedia.org/>.
-                   
-          # Prefer people with some notable activity (but not required)
-          OPTIONAL {{ ?person wdt:P166 ?award. }}
-          OPTIONAL {{ ?person wdt:P69 ?education. }}
-          OPTIONAL {{ ?person wdt:P108 ?employer. }}
-        }}
-        LIMIT {per_occupation}
-        """
+    # Several occupations per request instead of one round-trip each; chunked
+    # so a single query stays well under the endpoint's query timeout
+    chunks = [occupations[i:i + OCCUPATIONS_PER_QUERY]
+              for i in range(0, len(occupations), OCCUPATIONS_PER_QUERY)]
+    
+    for chunk in tqdm(chunks, desc="Fetching occupations"):
+        query = build_occupation_query([occ_qid for occ_qid, _ in chunk], per_occupation)
         
         try:
-            sparql.setQuery(query)
-            results = sparql.query().convert()
-            
-            occupation_person_ids = []
-            for result in results["results"]["bindings"]:
-                person_id = result["person"]["value"].split("/")[-1]
-                if person_id not in person_ids:
-                    person_ids.append(person_id)
-                    occupation_person_ids.append(person_id)
-            
-            occupation_counts[occ_label] = len(occupation_person_ids)
-            logger.info(f"  {occ_label}: {len(occupation_person_ids)} people")
-            
-            time.sleep(0.5)  # Rate limiting between occupation queries
-            
+            results = sparql_query(query)
         except Exception as e:
-            logger.error(f"Error fetching {occ_label}: {e}")
-            time.sleep(2)
+            logger.error(f"Error fetching {', '.join(label for _, label in chunk)}: {e}")
+            continue
+        
+        chunk_counts = {occ_qid: 0 for occ_qid, _ in chunk}
+        for result in results["results"]["bindings"]:
+            occ_qid = result["occ"]["value"].split("/")[-1]
+            person_id = result["person"]["value"].split("/")[-1]
+            # Extra rows per person (e.g. several birth dates) keep the first
+            if person_id not in person_info:
+                person_info[person_id] = parse_basic_info(result)
+                chunk_counts[occ_qid] = chunk_counts.get(occ_qid, 0) + 1
+        
+        for occ_qid, occ_label in chunk:
+            occupation_counts[occ_label] = chunk_counts[occ_qid]
+            logger.info(f"  {occ_label}: {chunk_counts[occ_qid]} people")
     
-    logger.info(f"\nTotal people found: {len(person_ids)} across {len(occupation_counts)} occupations")
-    logger.info(f"Average per occupation: {len(person_ids) / len(occupation_counts):.1f}")
+    logger.info(f"\nTotal people found: {len(person_info)} across {len(occupation_counts)} occupations")
+    logger.info(f"Average per occupation: {len(person_info) / len(occupation_counts):.1f}")
     
-    return person_ids
+    return person_info
 
+@lru_cache(maxsize=50000)
 def parse_wikidata_date(date_string):
     """
     Parse Wikidata date format to Python date
     Handles various formats: +1955-01-01T00:00:00Z, +1955-00-00, etc.
+    Memoized since the same timestamps recur across many events and people
     """
     if not date_string:
         return None
@@ -187,42 +326,88 @@ def parse_wikidata_date(date_string):
         logger.warning(f"Could not parse date: {date_string} - {e}")
         return None
 
-def extract_person_basic_info(person_id, sparql):
-    """Extract basic biographical information"""
-    
-    query = f"""
-    SELECT ?name ?desc ?birthDate ?deathDate ?birthPlace ?deathPlace WHERE {{
-      wd:{person_id} rdfs:label ?name.
-      FILTER(LANG(?name) = "en")
+# Life-event properties fetched for every person, in output order
+LIFE_EVENT_PROPERTIES = {
+    "P69": "education",
+    "P108": "employment", 
+    "P39": "position",
+    "P551": "residence",
+    "P937": "work_location",
+    "P166": "award",
+    "P800": "notable_work",
+    "P793": "significant_event",
+    "P1344": "participant_in",
+    "P54": "sports_team",
+}
 
-      OPTIONAL {{
-        wd:{person_id} schema:description ?desc.
-        FILTER(LANG(?desc) = "en")
-      }}
-      
-      OPTIONAL {{ wd:{person_id} wdt:P569 ?birthDate. }}
-      OPTIONAL {{ wd:{person_id} wdt:P570 ?deathDate. }}
-      OPTIONAL {{ 
-        wd:{person_id} wdt:P19 ?birthPlaceEntity.
-        ?birthPlaceEntity rdfs:label ?birthPlace.
-        FILTER(LANG(?birthPlace) = "en")
-      }}
-      OPTIONAL {{ 
-        wd:{person_id} wdt:P20 ?deathPlaceEntity.
-        ?deathPlaceEntity rdfs:label ?deathPlace.
-        FILTER(LANG(?deathPlace) = "en")
+# Category sections: (section, property, output variable)
+CATEGORY_PROPERTIES = [
+    ("occupation", "P106", "occupation"),
+    ("field", "P101", "field"),
+    ("citizenship", "P27", "citizenship"),
+    ("language", "P1412", "language"),
+]
+
+def build_person_query(person_id):
+    """
+    Build a single query returning categories and life events
+    
+    Each part is a UNION block tagged with a ?section literal (and life events
+    additionally with ?etype), so one round-trip replaces the former
+    categories and per-property life-event queries. Basic info comes from the
+    step 1 query (build_occupation_query)
+    """
+    category_blocks = "\n      UNION".join(f"""
+      {{
+        wd:{person_id} wdt:{prop_id} ?{var}Entity.
+        ?{var}Entity rdfs:label ?{var}.
+        FILTER(LANG(?{var}) = "en")
+        BIND("{section}" AS ?section)
+      }}""" for section, prop_id, var in CATEGORY_PROPERTIES)
+    
+    event_blocks = "\n          UNION".join(f"""
+          {{
+            wd:{person_id} p:{prop_id} ?statement.
+            ?statement ps:{prop_id} ?value.
+            BIND("{event_type}" AS ?etype)
+          }}""" for prop_id, event_type in LIFE_EVENT_PROPERTIES.items())
+    
+    return f"""
+    SELECT ?section ?occupation ?field ?citizenship ?language
+           ?etype ?value ?valueLabel ?startDate ?endDate ?pointInTime
+           ?degree ?degreeLabel ?major ?majorLabel WHERE {{{category_blocks}
+      UNION
+      {{
+        {{{event_blocks}
+        }}
+        
+        # Temporal qualifiers
+        OPTIONAL {{ ?statement pq:P580 ?startDate. }}
+        OPTIONAL {{ ?statement pq:P582 ?endDate. }}
+        OPTIONAL {{ ?statement pq:P585 ?pointInTime. }}
+        
+        # Education qualifiers
+        OPTIONAL {{ 
+          ?statement pq:P512 ?degree.
+          ?degree rdfs:label ?degreeLabel.
+          FILTER(LANG(?degreeLabel) = "en")
+        }}
+        OPTIONAL {{ 
+          ?statement pq:P812 ?major.
+          ?major rdfs:label ?majorLabel.
+          FILTER(LANG(?majorLabel) = "en")
+        }}
+        
+        # Explicit label lookup; the wikibase:label service is far slower
+        ?value rdfs:label ?valueLabel.
+        FILTER(LANG(?valueLabel) = "en")
+        BIND("event" AS ?section)
       }}
     }}
-    LIMIT 1
     """
 
-    sparql.setQuery(query)
-    result = sparql.query().convert()
-    
-    if not result["results"]["bindings"]:
-        return None
-
-    data = result["results"]["bindings"][0]
+def parse_basic_info(data):
+    """Extract basic biographical information from a step 1 result row"""
     
     return {
         "name": data.get("name", {}).get("value"),
@@ -233,211 +418,126 @@ def extract_person_basic_info(person_id, sparql):
         "death_place": data.get("deathPlace", {}).get("value"),
     }
 
-def extract_person_categories(person_id, sparql):
+def parse_categories(rows_by_section):
     """Extract occupations, fields of work, citizenship, and languages"""
     
-    query = f"""
-    SELECT ?occupation ?field ?citizenship ?language WHERE {{
-      wd:{person_id} wdt:P106 ?occEntity.
-      ?occEntity rdfs:label ?occupation.
-      FILTER(LANG(?occupation) = "en")
-      
-      OPTIONAL {{
-        wd:{person_id} wdt:P101 ?fieldEntity.
-        ?fieldEntity rdfs:label ?field.
-        FILTER(LANG(?field) = "en")
-      }}
-      
-      OPTIONAL {{
-        wd:{person_id} wdt:P27 ?citizenshipEntity.
-        ?citizenshipEntity rdfs:label ?citizenship.
-        FILTER(LANG(?citizenship) = "en")
-      }}
-      
-      OPTIONAL {{
-        wd:{person_id} wdt:P1412 ?languageEntity.
-        ?languageEntity rdfs:label ?language.
-        FILTER(LANG(?language) = "en")
-      }}
-    }}
-    """
-
-    sparql.setQuery(query)
-    result = sparql.query().convert()
-    
-    occupations = []
-    fields = []
-    citizenships = []
-    languages = []
-    
-    for binding in result["results"]["bindings"]:
-        occ = binding.get("occupation", {}).get("value")
-        if occ and occ not in occupations:
-            occupations.append(occ)
-        
-        field = binding.get("field", {}).get("value")
-        if field and field not in fields:
-            fields.append(field)
-            
-        citizenship = binding.get("citizenship", {}).get("value")
-        if citizenship and citizenship not in citizenships:
-            citizenships.append(citizenship)
-            
-        language = binding.get("language", {}).get("value")
-        if language and language not in languages:
-            languages.append(language)
-    
+    categories = []
+    for section, _, var in CATEGORY_PROPERTIES:
+        values = []
+        seen = set()
+        for binding in rows_by_section.get(section, []):
+            value = binding.get(var, {}).get("value")
+            if value and value not in seen:
+                seen.add(value)
+                values.append(value)
+        categories.append(values)
+    
+    occupations, fields, citizenships, languages = categories
     return occupations, fields, citizenships, languages
 
-def extract_life_events(person_id, sparql):
+def parse_life_events(bindings):
     """
     Extract comprehensive life events with temporal and location information
     Includes: education, employment, residence, awards, participation, and domain-specific events
     """
     
-    # Simplified query - query each property type separately for reliability
     events = []
     seen_events = set()
     
-    # Define property mappings
-    properties = {
-        "P69": "education",
-        "P108": "employment", 
-        "P39": "position",
-        "P551": "residence",
-        "P937": "work_location",
-        "P166": "award",
-        "P800": "notable_work",
-        "P793": "significant_event",
-        "P1344": "participant_in",
-        "P54": "sports_team",
-    }
-    
-    for prop_id, event_type in properties.items():
-        # Simple query per property
-        query = f"""
-        SELECT ?value ?valueLabel ?startDate ?endDate ?pointInTime 
-               ?degree ?degreeLabel ?major ?majorLabel ?location ?locationLabel WHERE {{
-          
-          wd:{person_id} p:{prop_id} ?statement.
-          ?statement ps:{prop_id} ?value.
-          
-          # Temporal qualifiers
-          OPTIONAL {{ ?statement pq:P580 ?startDate. }}
-          OPTIONAL {{ ?statement pq:P582 ?endDate. }}
-          OPTIONAL {{ ?statement pq:P585 ?pointInTime. }}
-          
-          # Education qualifiers
-          OPTIONAL {{ 
-            ?statement pq:P512 ?degree.
-            ?degree rdfs:label ?degreeLabel.
-            FILTER(LANG(?degreeLabel) = "en")
-          }}
-          OPTIONAL {{ 
-            ?statement pq:P812 ?major.
-            ?major rdfs:label ?majorLabel.
-            FILTER(LANG(?majorLabel) = "en")
-          }}
-          
-          # Location
-          OPTIONAL {{ 
-            ?value wdt:P131 ?location.
-            ?location rdfs:label ?locationLabel.
-            FILTER(LANG(?locationLabel) = "en")
-          }}
-          
-          SERVICE wikibase:label {{ 
-            bd:serviceParam wikibase:language "en".
-            ?value rdfs:label ?valueLabel.
-          }}
-        }}
-        """
-        
-        try:
-            sparql.setQuery(query)
-            result = sparql.query().convert()
+    # Group rows by event type so events keep the LIFE_EVENT_PROPERTIES order
+    rows_by_type = {}
+    for binding in bindings:
+        event_type = binding.get("etype", {}).get("value")
+        rows_by_type.setdefault(event_type, []).append(binding)
+    
+    for prop_id, event_type in LIFE_EVENT_PROPERTIES.items():
+        for binding in rows_by_type.get(event_type, []):
+            value_label = binding.get("valueLabel", {}).get("value", "")
+            if not value_label:
+                continue
             
-            for binding in result["results"]["bindings"]:
-                value_label = binding.get("valueLabel", {}).get("value", "")
-                if not value_label:
-                    continue
-                
-                # Parse dates
-                start_date = parse_wikidata_date(binding.get("startDate", {}).get("value"))
-                end_date = parse_wikidata_date(binding.get("endDate", {}).get("value"))
-                point_in_time = parse_wikidata_date(binding.get("pointInTime", {}).get("value"))
-                
-                # Use point_in_time as start_date if missing
-                if not start_date and point_in_time:
-                    start_date = point_in_time
-                
-                # Get qualifiers
-                degree = binding.get("degreeLabel", {}).get("value")
-                major = binding.get("majorLabel", {}).get("value")
-                location = binding.get("locationLabel", {}).get("value")
-                
-                # Build event title
-                title_parts = [value_label]
-                if degree:
-                    title_parts.append(degree)
-                if major:
-                    title_parts.append(f"in {major}")
-                
-                event_title = " - ".join(title_parts) if len(title_parts) > 1 else value_label
-                
-                # Create unique key
-                event_key = f"{event_type}_{value_label}_{start_date}_{degree}"
+            # Parse dates
+            start_date = parse_wikidata_date(binding.get("startDate", {}).get("value"))
+            end_date = parse_wikidata_date(binding.get("endDate", {}).get("value"))
+            point_in_time = parse_wikidata_date(binding.get("pointInTime", {}).get("value"))
+            
+            # Use point_in_time as start_date if missing
+            if not start_date and point_in_time:
+                start_date = point_in_time
+            
+            # Get qualifiers
+            degree = binding.get("degreeLabel", {}).get("value")
+            major = binding.get("majorLabel", {}).get("value")
+            
+            # Location is filled in later by resolve_event_locations
+            value_uri = binding.get("value", {}).get("value", "")
+            value_id = value_uri.split("/")[-1] if value_uri.startswith(WIKIDATA_ENTITY_PREFIX) else None
+            
+            # Build event title
+            title_parts = [value_label]
+            if degree:
+                title_parts.append(degree)
+            if major:
+                title_parts.append(f"in {major}")
+            
+            event_title = " - ".join(title_parts) if len(title_parts) > 1 else value_label
+            
+            # Create unique key
+            event_key = (event_type, value_label, start_date, degree)
+            
+            if event_key not in seen_events:
+                event_data = {
+                    "event_type": event_type,
+                    "event_title": event_title,
+                    "event_description": f"{event_type} event",
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "point_in_time": point_in_time,
+                    "location": None,
+                    "organization": value_label if event_type in ["education", "employment", "sports_team"] else None,
+                    "role_or_degree": degree,
+                    "field_or_major": major,
+                    "sport": None,
+                    "instrument": None,
+                    "source": f"wikidata:{prop_id}",
+                    "value_id": value_id
+                }
                 
-                if event_key not in seen_events:
-                    event_data = {
-                        "event_type": event_type,
-                        "event_title": event_title,
-                        "event_description": f"{event_type} event",
-                        "start_date": start_date,
-                        "end_date": end_date,
-                        "point_in_time": point_in_time,
-                        "location": location,
-                        "organization": value_label if event_type in ["education", "employment", "sports_team"] else None,
-                        "role_or_degree": degree,
-                        "field_or_major": major,
-                        "sport": None,
-                        "instrument": None,
-                        "source": f"wikidata:{prop_id}"
-                    }
-                    
-                    events.append(event_data)
-                    seen_events.add(event_key)
-        
-        except Exception as e:
-            logger.debug(f"No {event_type} events for {person_id}: {e}")
-            continue
-        
-        time.sleep(0.1)  # Small delay between property queries
+                events.append(event_data)
+                seen_events.add(event_key)
     
     return events
 
 
 
-def extract_person_metadata(person_id, sparql):
-    """Extract complete metadata for a person"""
+def extract_person_metadata(person_id, basic_info):
+    """Extract complete metadata for a person with a single SPARQL request"""
     
     logger.info(f"Extracting metadata for {person_id}...")
     
-    # Basic info
-    basic_info = extract_person_basic_info(person_id, sparql)
-    if not basic_info:
+    # Basic info (fetched along with the ID in step 1)
+    if not basic_info or not basic_info["name"]:
         logger.warning(f"No basic info found for {person_id}")
         return None
     
-    time.sleep(0.5)  # Rate limiting
+    result = sparql_query(build_person_query(person_id))
     
-    # Categories (now includes citizenship and languages)
-    occupations, fields, citizenships, languages = extract_person_categories(person_id, sparql)
+    # Dispatch rows to their section (each category, event)
+    rows_by_section = {}
+    for binding in result["results"]["bindings"]:
+        section = binding.get("section", {}).get("value")
+        rows_by_section.setdefault(section, []).append(binding)
     
-    time.sleep(0.5)  # Rate limiting
+    # Categories (now includes citizenship and languages)
+    occupations, fields, citizenships, languages = parse_categories(rows_by_section)
     
-    # Life events (enhanced with new properties)
-    events = extract_life_events(person_id, sparql)
+    # Life events (enhanced with new properties), skipped for profiles that
+    # is_complete_profile would reject whatever their events
+    if is_worth_events(basic_info, occupations, fields):
+        events = parse_life_events(rows_by_section.get("event", []))
+    else:
+        logger.debug(f"Skipping life events for incomplete profile {person_id}")
+        events = []
     
     metadata = {
         "wikidata_id": person_id,
@@ -457,6 +557,67 @@ def extract_person_metadata(person_id, sparql):
     
     return metadata
 
+# Distinct event values looked up per location query
+LOCATIONS_PER_QUERY = 200
+
+def build_location_query(value_ids):
+    """Build one query returning the English P131 label for many event values"""
+    values = " ".join(f"wd:{value_id}" for value_id in value_ids)
+    return f"""
+    SELECT ?value ?locationLabel WHERE {{
+      VALUES ?value {{ {values} }}
+      ?value wdt:P131 ?location.
+      ?location rdfs:label ?locationLabel.
+      FILTER(LANG(?locationLabel) = "en")
+    }}
+    """
+
+def resolve_event_locations(profiles):
+    """
+    Fill each event's location from its value's P131 (located in)
+    
+    Done once per distinct value after the crawl rather than as an OPTIONAL in
+    every per-person query, where it multiplied rows for each candidate value
+    """
+    value_ids = sorted({
+        event["value_id"]
+        for profile in profiles
+        for event in profile.get("life_events", [])
+        if event.get("value_id")
+    })
+    
+    locations = {}
+    for i in tqdm(range(0, len(value_ids), LOCATIONS_PER_QUERY), desc="Resolving locations"):
+        chunk = value_ids[i:i + LOCATIONS_PER_QUERY]
+        try:
+            results = sparql_query(build_location_query(chunk))
+        except Exception as e:
+            logger.error(f"Error resolving locations for {len(chunk)} event values: {e}")
+            continue
+        
+        for binding in results["results"]["bindings"]:
+            value_id = binding["value"]["value"].split("/")[-1]
+            locations.setdefault(value_id, binding["locationLabel"]["value"])
+    
+    for profile in profiles:
+        for event in profile.get("life_events", []):
+            event["location"] = locations.get(event.pop("value_id", None))
+    
+    logger.info(f"Resolved locations for {len(locations)} of {len(value_ids)} event values")
+
+def is_worth_events(basic_info, occupations, fields):
+    """
+    Quick pre-check before parsing life events
+    
+    is_complete_profile needs 3 of its 4 checks, so a profile already failing
+    two of name/occupation/field_of_work can never pass
+    """
+    return sum([
+        basic_info.get("name") is not None,
+        len(occupations) > 0,
+        len(fields) > 0,
+    ]) >= 2
+
 def is_complete_profile(metadata):
     """Check if profile has minimum required fields"""
     if not metadata:
@@ -484,12 +645,47 @@ def completeness_score(metadata):
         1 if metadata.get("birth_place") else 0,
     ])
 
-def save_intermediate_results(data, filename="intermediate_crawl.json"):
-    """Save intermediate results as backup"""
+CHECKPOINT_FILE = "intermediate_crawl.ndjson"
+
+def load_checkpoint(filename=CHECKPOINT_FILE):
+    """
+    Load profiles saved by earlier runs, keyed by wikidata_id
+    
+    A line cut short by a crash mid-write is skipped
+    """
+    filepath = os.path.join(config.DATA_DIR, "raw", filename)
+    if not os.path.exists(filepath):
+        return {}
+    
+    prior = {}
+    with open(filepath, 'rb') as f:
+        for line in f:
+            try:
+                metadata = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                logger.warning(f"Skipping unreadable checkpoint line in {filepath}")
+                continue
+            prior[metadata["wikidata_id"]] = metadata
+    
+    logger.info(f"Loaded {len(prior)} profiles from {filepath}")
+    return prior
+
+def open_checkpoint(filename=CHECKPOINT_FILE):
+    """Open the append-only NDJSON backup of extracted profiles"""
     filepath = os.path.join(config.DATA_DIR, "raw", filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    logger.info(f"Saved intermediate results to {filepath}")
+    logger.info(f"Appending intermediate results to {filepath}")
+    checkpoint = open(filepath, 'ab')
+    # Terminate a partial last line so new records start on their own line
+    if checkpoint.tell() > 0:
+        with open(filepath, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                checkpoint.write(b"\n")
+    return checkpoint
+
+def append_checkpoint(checkpoint, metadata):
+    """Append one profile as a single NDJSON line"""
+    checkpoint.write(orjson.dumps(metadata, option=orjson.OPT_APPEND_NEWLINE))
 
 def main():
     """Main execution function"""
@@ -502,37 +698,46 @@ def main():
     # Output file path
     output_path = os.path.join(config.DATA_DIR, "raw", "wikidata_people_1000.json")
     
-    # Setup
-    sparql = setup_sparql()
-    
     # Get person IDs across diverse occupations
     logger.info("Step 1: Fetching person IDs across occupations...")
-    person_ids = get_person_ids(sparql, target=1000)
+    person_info = get_person_ids(target=1000)
+    person_ids = list(person_info)
     logger.info(f"Found {len(person_ids)} potential people")
     
     # Extract metadata
     logger.info("\nStep 2: Extracting metadata and life events...")
-    logger.info("This will take 5-7 hours with proper rate limiting...")
-    all_metadata = []
+    logger.info(f"Using {MAX_WORKERS} workers, at most {MAX_QUERIES_PER_SECOND} queries/s...")
     failed_ids = []
+    
+    # Resume: reuse profiles already extracted by an interrupted run
+    prior = load_checkpoint()
+    results = {i: prior[person_id] for i, person_id in enumerate(person_ids) if person_id in prior}
+    if results:
+        logger.info(f"Resuming: {len(results)} profiles already extracted, skipping them")
 
-    for i, person_id in enumerate(tqdm(person_ids, desc="Extracting metadata")):
-        try:
-            metadata = extract_person_metadata(person_id, sparql)
-            if metadata:
-                all_metadata.append(metadata)
-                
-                # Save intermediate results every 50 persons (more frequent for long runs)
-                if (i + 1) % 50 == 0:
-                    save_intermediate_results(all_metadata, f"intermediate_crawl_{i+1}.json")
-                    logger.info(f"\n  Checkpoint: {len(all_metadata)} profiles extracted so far")
-                    
-            time.sleep(1.5)  # Rate limiting - be respectful to Wikidata
+    with open_checkpoint() as checkpoint, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(extract_person_metadata, person_id, person_info[person_id]): i
+                   for i, person_id in enumerate(person_ids) if i not in results}
+        
+        for completed, future in enumerate(tqdm(as_completed(futures), total=len(futures),
+                                                desc="Extracting metadata"), start=1):
+            i = futures[future]
+            try:
+                metadata = future.result()
+                if metadata:
+                    results[i] = metadata
+                    append_checkpoint(checkpoint, metadata)
+            except Exception as e:
+                logger.error(f"Failed to extract {person_ids[i]}: {e}")
+                failed_ids.append(person_ids[i])
             
-        except Exception as e:
-            logger.error(f"Failed to extract {person_id}: {e}")
-            failed_ids.append(person_id)
-            time.sleep(3)  # Wait longer on error
+            # Flush the backup every 50 persons (more frequent for long runs)
+            if completed % 50 == 0:
+                checkpoint.flush()
+                logger.info(f"\n  Checkpoint: {len(results)} profiles extracted so far")
+
+    # Keep the original person_ids order regardless of completion order
+    all_metadata = [results[k] for k in sorted(results)]
 
     logger.info(f"\nSuccessfully extracted {len(all_metadata)} profiles")
     logger.info(f"Failed: {len(failed_ids)} profiles")
@@ -549,10 +754,14 @@ def main():
                                    key=completeness_score,
                                    reverse=True)[:target_count]
 
+    # Resolve event locations for the profiles being kept
+    logger.info("\nStep 4: Resolving event locations...")
+    resolve_event_locations(complete_metadata)
+
     # Save to JSON
-    logger.info(f"\nStep 4: Saving to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(complete_metadata, f, indent=2, ensure_ascii=False)
+    logger.info(f"\nStep 5: Saving to {output_path}...")
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(complete_metadata, option=orjson.OPT_INDENT_2))
 
     # Print summary statistics
     logger.info("\n" + "="*60)
@@ -568,20 +777,18 @@ def main():
         logger.info(f"Average events per person: {avg_events:.1f}")
         
         # Event type breakdown
-        event_types = {}
-        for person in complete_metadata:
-            for event in person.get("life_events", []):
-                event_type = event.get("event_type", "other")
-                event_types[event_type] = event_types.get(event_type, 0) + 1
+        event_types = Counter(
+            event.get("event_type", "other")
+            for person in complete_metadata
+            for event in person.get("life_events", [])
+        )
         
         logger.info(f"\nEvent type breakdown:")
-        for event_type, count in sorted(event_types.items(), key=lambda x: x[1], reverse=True):
+        for event_type, count in event_types.most_common():
             logger.info(f"  {event_type}: {count}")
         
         # Occupation diversity
-        all_occupations = set()
-        for person in complete_metadata:
-            all_occupations.update(person.get("occupation", []))
+        all_occupations = set().union(*(person.get("occupation", []) for person in complete_metadata))
         logger.info(f"\nUnique occupations: {len(all_occupations)}")
     
     logger.info("="*60)
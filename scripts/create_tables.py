@@ -8,204 +8,310 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import json
+import threading
+import time
+from functools import lru_cache
 from google.cloud import bigquery
 import config
+from bq_client import get_client, logger
 
-def create_persons_table(client):
-    """Create the persons table"""
-    
-    table_id = f"{config.PROJECT_ID}.{config.DATASET_ID}.persons"
-    
-    schema = [
-        bigquery.SchemaField("person_id", "STRING", mode="REQUIRED", description="Unique identifier for person"),
-        bigquery.SchemaField("wikidata_id", "STRING", mode="REQUIRED", description="Wikidata QID (e.g., Q937)"),
-        bigquery.SchemaField("name", "STRING", mode="REQUIRED", description="Full name of the person"),
-        bigquery.SchemaField("description", "STRING", mode="NULLABLE", description="Short description/bio"),
-        bigquery.SchemaField("occupation", "STRING", mode="REPEATED", description="List of occupations"),
-        bigquery.SchemaField("field_of_work", "STRING", mode="REPEATED", description="Fields of work"),
-        bigquery.SchemaField("citizenship", "STRING", mode="REPEATED", description="Countries of citizenship"),
-        bigquery.SchemaField("languages", "STRING", mode="REPEATED", description="Languages spoken/written/signed"),
-        bigquery.SchemaField("birth_date", "DATE", mode="NULLABLE", description="Date of birth"),
-        bigquery.SchemaField("death_date", "DATE", mode="NULLABLE", description="Date of death (null if living)"),
-        bigquery.SchemaField("birth_place", "STRING", mode="NULLABLE", description="Place of birth"),
-        bigquery.SchemaField("death_place", "STRING", mode="NULLABLE", description="Place of death"),
-        bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED", description="Record creation timestamp"),
-    ]
+# Fully qualified dataset, interpolated into every table/view reference
+_DATASET = f"{config.PROJECT_ID}.{config.DATASET_ID}"
+
+# Dataset table metadata fetched within a run is reused for this long
+TABLE_CACHE_TTL_SECONDS = 300
+
+_table_cache = {}
+_table_cache_lock = threading.Lock()
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas")
+
+def load_schema(name):
+    """
+    Load schemas/<name>.json (BigQuery's native schema JSON format)
+    Same parsing as client.schema_from_json, without needing a client
+    """
+    with open(os.path.join(SCHEMA_DIR, f"{name}.json")) as f:
+        return [bigquery.SchemaField.from_api_repr(field) for field in json.load(f)]
+
+# Parsed once at import; edit the JSON files to change a schema
+PERSONS_SCHEMA = load_schema("persons")
+LIFE_EVENTS_SCHEMA = load_schema("life_events")
+EMBEDDINGS_SCHEMA = load_schema("embeddings")
+COORDINATES_3D_SCHEMA = load_schema("coordinates_3d")
+
+# Storage Write API proto types per BigQuery type. DATE and TIMESTAMP use
+# the string encodings so loaders can send the ISO strings they already build
+PROTO_TYPES = {
+    "STRING": "string",
+    "INT64": "int64",
+    "INTEGER": "int64",
+    "FLOAT64": "double",
+    "FLOAT": "double",
+    "BOOL": "bool",
+    "BOOLEAN": "bool",
+    "BYTES": "bytes",
+    "DATE": "string",
+    "TIMESTAMP": "string",
+}
+
+# proto2 labels carry BigQuery's column modes one-to-one
+PROTO_LABELS = {"NULLABLE": "optional", "REQUIRED": "required", "REPEATED": "repeated"}
+
+# Table specs: (name, schema, description, clustering_fields, partition_by)
+TABLE_SPECS = [
+    ("persons", PERSONS_SCHEMA,
+     "Biographical information for all persons in the system",
+     ["person_id"],  # Point lookups and joins on person_id
+     None),
+    ("life_events", LIFE_EVENTS_SCHEMA,
+     "Life events for all persons (education, employment, awards, etc.)",
+     # Per-person event lookups; start_date second so date-range filters
+     # still prune blocks where partitioning cannot help (below)
+     ["person_id", "start_date"],
+     # Yearly, not daily: event dates span centuries and daily partitions
+     # would blow past the per-table partition limit. BigQuery only
+     # partitions dates from 1960-01-01 on; earlier events (most of this
+     # historical dataset) all share the __UNPARTITIONED__ partition, so
+     # pruning only covers modern events and the clustering does the rest
+     "DATE_TRUNC(start_date, YEAR)"),
+    ("embeddings", EMBEDDINGS_SCHEMA,
+     "High-dimensional embeddings for all persons",
+     ["person_id"],  # Joins on person_id
+     None),
+    ("coordinates_3d", COORDINATES_3D_SCHEMA,
+     "3D coordinates for visualization after dimensionality reduction",
+     ["cluster_id", "person_id"],  # Per-cluster scans, then joins on person_id
+     None),
+]
+
+def _quote(text):
+    """Render text as a GoogleSQL double-quoted string literal"""
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _schema_to_ddl(schema):
+    """Render SchemaFields as the column list of a CREATE TABLE statement"""
+    columns = []
+    for field in schema:
+        column_type = f"ARRAY<{field.field_type}>" if field.mode == "REPEATED" else field.field_type
+        not_null = " NOT NULL" if field.mode == "REQUIRED" else ""
+        options = f" OPTIONS(description={_quote(field.description)})" if field.description else ""
+        columns.append(f"  {field.name} {column_type}{not_null}{options}")
+    return ",\n".join(columns)
+
+@lru_cache(maxsize=None)
+def build_ddl_script(drop_existing=False):
+    """
+    Build one multi-statement script creating every table in TABLE_SPECS
     
-    table = bigquery.Table(table_id, schema=schema)
-    table.description = "Biographical information for all persons in the system"
+    Args:
+        drop_existing: Prepend DROP TABLE IF EXISTS for each table so the
+            whole drop-and-recreate runs as a single job
     
-    try:
-        table = client.create_table(table)
-        print(f"✅ Created table: persons")
-        print(f"   Columns: {len(schema)}")
-        return table
-    except Exception as e:
-        if "Already Exists" in str(e):
-            print(f"✅ Table persons already exists")
-        else:
-            print(f"❌ Error creating persons table: {e}")
-            raise
-
-def create_life_events_table(client):
-    """Create the life_events table"""
-    
-    table_id = f"{config.PROJECT_ID}.{config.DATASET_ID}.life_events"
-    
-    schema = [
-        bigquery.SchemaField("event_id", "STRING", mode="REQUIRED", description="Unique identifier for event"),
-        bigquery.SchemaField("person_id", "STRING", mode="REQUIRED", description="Reference to persons.person_id"),
-        bigquery.SchemaField("event_type", "STRING", mode="REQUIRED", description="Type: education, employment, residence, award, etc."),
-        bigquery.SchemaField("event_title", "STRING", mode="REQUIRED", description="Title/name of the event"),
-        bigquery.SchemaField("event_description", "STRING", mode="NULLABLE", description="Detailed description"),
-        bigquery.SchemaField("start_date", "DATE", mode="NULLABLE", description="Event start date"),
-        bigquery.SchemaField("end_date", "DATE", mode="NULLABLE", description="Event end date (null for ongoing/point events)"),
-        bigquery.SchemaField("point_in_time", "DATE", mode="NULLABLE", description="Point in time for instant events (awards, ceremonies)"),
-        bigquery.SchemaField("location", "STRING", mode="NULLABLE", description="Location where event occurred"),
-        bigquery.SchemaField("organization", "STRING", mode="NULLABLE", description="Associated organization/institution"),
-        bigquery.SchemaField("role_or_degree", "STRING", mode="NULLABLE", description="Role, position, or academic degree"),
-        bigquery.SchemaField("field_or_major", "STRING", mode="NULLABLE", description="Field of study, major, or area of work"),
-        bigquery.SchemaField("sport", "STRING", mode="NULLABLE", description="Sport (for athletic events)"),
-        bigquery.SchemaField("instrument", "STRING", mode="NULLABLE", description="Musical instrument (for musicians)"),
-        bigquery.SchemaField("source", "STRING", mode="NULLABLE", description="Data source (e.g., Wikidata property)"),
-        bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED", description="Record creation timestamp"),
-    ]
+    The schemas are module constants, so the script is rendered once per process
+    """
+    statements = []
     
-    table = bigquery.Table(table_id, schema=schema)
-    table.description = "Life events for all persons (education, employment, awards, etc.)"
+    if drop_existing:
+        for name, *_ in TABLE_SPECS:
+            statements.append(f"DROP TABLE IF EXISTS `{_DATASET}.{name}`")
     
-    try:
-        table = client.create_table(table)
-        print(f"✅ Created table: life_events")
-        print(f"   Columns: {len(schema)}")
-        return table
-    except Exception as e:
-        if "Already Exists" in str(e):
-            print(f"✅ Table life_events already exists")
-        else:
-            print(f"❌ Error creating life_events table: {e}")
-            raise
-
-def create_embeddings_table(client):
-    """Create the embeddings table"""
+    for name, schema, description, clustering_fields, partition_by in TABLE_SPECS:
+        partition = f"\nPARTITION BY {partition_by}" if partition_by else ""
+        cluster_by = f"\nCLUSTER BY {', '.join(clustering_fields)}" if clustering_fields else ""
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS `{_DATASET}.{name}` (\n"
+            f"{_schema_to_ddl(schema)}\n"
+            f"){partition}{cluster_by}\n"
+            f"OPTIONS(description={_quote(description)})"
+        )
     
-    table_id = f"{config.PROJECT_ID}.{config.DATASET_ID}.embeddings"
+    return ";\n\n".join(statements) + ";"
+
+def build_proto_schema(name, schema):
+    """
+    Render a table schema as a proto2 message for the BigQuery Storage Write API
     
-    schema = [
-        bigquery.SchemaField("person_id", "STRING", mode="REQUIRED", description="Reference to persons.person_id"),
-        bigquery.SchemaField("embedding_vector", "FLOAT64", mode="REPEATED", description="High-dimensional embedding vector"),
-        bigquery.SchemaField("embedding_model", "STRING", mode="REQUIRED", description="Model used (e.g., text-embedding-004)"),
-        bigquery.SchemaField("embedding_dim", "INT64", mode="REQUIRED", description="Dimension of embedding vector"),
-        bigquery.SchemaField("embedding_text", "STRING", mode="NULLABLE", description="Text that was embedded (for reference)"),
-        bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED", description="Embedding generation timestamp"),
+    Loaders pass the compiled descriptor to BigQueryWriteClient.append_rows,
+    sending rows in binary instead of through JSON inserts
+    """
+    message = "".join(part.capitalize() for part in name.split("_")) + "Row"
+    lines = [
+        f"// Generated by scripts/create_tables.py from schemas/{name}.json; do not edit",
+        'syntax = "proto2";',
+        "",
+        "package lifeembedding;",
+        "",
+        f"message {message} {{",
     ]
+    for number, field in enumerate(schema, 1):
+        lines.append(f"  {PROTO_LABELS[field.mode]} {PROTO_TYPES[field.field_type]} {field.name} = {number};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def emit_proto_schemas():
+    """Write schemas/<table>.proto for every table, skipping files that are already current"""
+    for name, schema, *_ in TABLE_SPECS:
+        path = os.path.join(SCHEMA_DIR, f"{name}.proto")
+        proto = build_proto_schema(name, schema)
+        
+        if os.path.exists(path):
+            with open(path) as f:
+                if f.read() == proto:
+                    continue
+        
+        with open(path, "w") as f:
+            f.write(proto)
+        logger.info(f"📝 Wrote Storage Write API schema: schemas/{name}.proto")
+
+def create_all_tables(client, drop_existing=False):
+    """Create every table in TABLE_SPECS with a single BigQuery script job"""
     
-    table = bigquery.Table(table_id, schema=schema)
-    table.description = "High-dimensional embeddings for all persons"
+    script = build_ddl_script(drop_existing=drop_existing)
+    client.query(script, location=config.DATASET_LOCATION).result()
+    clear_table_cache()
     
-    try:
-        table = client.create_table(table)
-        print(f"✅ Created table: embeddings")
-        print(f"   Columns: {len(schema)}")
-        return table
-    except Exception as e:
-        if "Already Exists" in str(e):
-            print(f"✅ Table embeddings already exists")
+    for name, schema, *_ in TABLE_SPECS:
+        if drop_existing:
+            logger.info(f"✅ Dropped and recreated table: {name}")
         else:
-            print(f"❌ Error creating embeddings table: {e}")
-            raise
-
-def create_coordinates_3d_table(client):
-    """Create the coordinates_3d table"""
-    
-    table_id = f"{config.PROJECT_ID}.{config.DATASET_ID}.coordinates_3d"
-    
-    schema = [
-        bigquery.SchemaField("person_id", "STRING", mode="REQUIRED", description="Reference to persons.person_id"),
-        bigquery.SchemaField("x", "FLOAT64", mode="REQUIRED", description="X coordinate in 3D space"),
-        bigquery.SchemaField("y", "FLOAT64", mode="REQUIRED", description="Y coordinate in 3D space"),
-        bigquery.SchemaField("z", "FLOAT64", mode="REQUIRED", description="Z coordinate in 3D space"),
-        bigquery.SchemaField("reduction_method", "STRING", mode="REQUIRED", description="Dimensionality reduction method used (e.g., PCA+UMAP)"),
-        bigquery.SchemaField("cluster_id", "INT64", mode="NULLABLE", description="Cluster assignment (null if not clustered yet)"),
-        bigquery.SchemaField("cluster_label", "STRING", mode="NULLABLE", description="Human-readable cluster label"),
-        bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED", description="Coordinate generation timestamp"),
-    ]
+            logger.info(f"✅ Table ready: {name}")
+        logger.info(f"   Columns: {len(schema)}")
     
-    table = bigquery.Table(table_id, schema=schema)
-    table.description = "3D coordinates for visualization after dimensionality reduction"
+    emit_proto_schemas()
+
+# One round trip for everything verify_tables prints: column list,
+# clustering/partitioning from COLUMNS, description from TABLE_OPTIONS,
+# and row count/size from the __TABLES__ meta-table
+TABLE_METADATA_QUERY = """
+WITH cols AS (
+  SELECT
+    table_name,
+    ARRAY_AGG(STRUCT(column_name, data_type, is_nullable) ORDER BY ordinal_position) AS columns,
+    ARRAY_AGG(IF(clustering_ordinal_position IS NULL, NULL, column_name) IGNORE NULLS
+              ORDER BY clustering_ordinal_position) AS clustering_fields,
+    MAX(IF(is_partitioning_column = 'YES', column_name, NULL)) AS partition_field
+  FROM `{dataset_id}`.INFORMATION_SCHEMA.COLUMNS
+  GROUP BY table_name
+),
+opts AS (
+  SELECT table_name, option_value AS description
+  FROM `{dataset_id}`.INFORMATION_SCHEMA.TABLE_OPTIONS
+  WHERE option_name = 'description'
+)
+SELECT
+  t.table_name,
+  o.description,
+  s.row_count,
+  s.size_bytes,
+  c.columns,
+  c.clustering_fields,
+  c.partition_field
+FROM `{dataset_id}`.INFORMATION_SCHEMA.TABLES t
+JOIN cols c USING (table_name)
+LEFT JOIN opts o USING (table_name)
+LEFT JOIN `{dataset_id}.__TABLES__` s ON s.table_id = t.table_name
+"""
+
+def _fetch_all_table_metadata(client, dataset_id):
+    """
+    Fetch metadata for every table in the dataset with a single query
     
-    try:
-        table = client.create_table(table)
-        print(f"✅ Created table: coordinates_3d")
-        print(f"   Columns: {len(schema)}")
-        return table
-    except Exception as e:
-        if "Already Exists" in str(e):
-            print(f"✅ Table coordinates_3d already exists")
-        else:
-            print(f"❌ Error creating coordinates_3d table: {e}")
-            raise
+    Returns:
+        Dict of table name -> dict with description, row_count, size_bytes,
+        columns, clustering_fields and partition_field
+    """
+    with _table_cache_lock:
+        entry = _table_cache.get(dataset_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+    
+    query = TABLE_METADATA_QUERY.format(dataset_id=dataset_id)
+    metadata = {}
+    for row in client.query(query, location=config.DATASET_LOCATION).result():
+        description = row.description
+        # TABLE_OPTIONS returns option values as SQL literals ("...")
+        if description and description.startswith('"') and description.endswith('"'):
+            description = description[1:-1]
+        metadata[row.table_name] = {
+            "description": description,
+            "row_count": row.row_count or 0,
+            "size_bytes": row.size_bytes or 0,
+            "columns": row.columns,
+            "clustering_fields": row.clustering_fields,
+            "partition_field": row.partition_field,
+        }
+    
+    with _table_cache_lock:
+        _table_cache[dataset_id] = (time.monotonic() + TABLE_CACHE_TTL_SECONDS, metadata)
+    return metadata
+
+def clear_table_cache():
+    """Forget cached table metadata (call after DDL changes the tables)"""
+    with _table_cache_lock:
+        _table_cache.clear()
 
 def verify_tables(client):
     """Verify all tables exist and show their schemas"""
     
-    dataset_id = f"{config.PROJECT_ID}.{config.DATASET_ID}"
-    tables = list(client.list_tables(dataset_id))
-    
-    print(f"\n📊 Tables in dataset {config.DATASET_ID}:")
-    print("="*60)
-    
-    expected_tables = ["persons", "life_events", "embeddings", "coordinates_3d"]
-    
-    for table_name in expected_tables:
-        table_id = f"{dataset_id}.{table_name}"
-        try:
-            table = client.get_table(table_id)
-            print(f"\n✅ {table_name}")
-            print(f"   Description: {table.description}")
-            print(f"   Columns: {len(table.schema)}")
-            print(f"   Rows: {table.num_rows}")
-            print(f"   Size: {table.num_bytes / 1024:.2f} KB")
-            
-            # Show schema
-            print(f"   Schema:")
-            for field in table.schema[:5]:  # Show first 5 fields
-                mode = f"[{field.mode}]" if field.mode != "NULLABLE" else ""
-                print(f"      - {field.name}: {field.field_type} {mode}")
-            if len(table.schema) > 5:
-                print(f"      ... and {len(table.schema) - 5} more fields")
-                
-        except Exception as e:
-            print(f"❌ {table_name}: Not found or error - {e}")
-    
-    print("\n" + "="*60)
+    logger.info(f"\n📊 Tables in dataset {config.DATASET_ID}:")
+    logger.info("="*60)
+    
+    try:
+        metadata = _fetch_all_table_metadata(client, _DATASET)
+    except Exception as e:
+        logger.error(f"❌ Could not read table metadata - {e}")
+        return
+    
+    for table_name, *_ in TABLE_SPECS:
+        table = metadata.get(table_name)
+        if table is None:
+            logger.error(f"❌ {table_name}: Not found")
+            continue
+        
+        columns = table["columns"]
+        logger.info(f"\n✅ {table_name}")
+        logger.info(f"   Description: {table['description']}")
+        logger.info(f"   Columns: {len(columns)}")
+        logger.info(f"   Rows: {table['row_count']}")
+        logger.info(f"   Clustered by: {', '.join(table['clustering_fields']) if table['clustering_fields'] else 'none'}")
+        logger.info(f"   Partitioned by: {table['partition_field'] or 'none'}")
+        logger.info(f"   Size: {table['size_bytes'] / 1024:.2f} KB")
+        
+        # Show schema
+        logger.info(f"   Schema:")
+        for column in columns[:5]:  # Show first 5 fields
+            required = "[REQUIRED]" if column["is_nullable"] == "NO" else ""
+            logger.info(f"      - {column['column_name']}: {column['data_type']} {required}")
+        if len(columns) > 5:
+            logger.info(f"      ... and {len(columns) - 5} more fields")
+    
+    logger.info("\n" + "="*60)
 
 def main():
     """Create all tables"""
     
-    print("="*60)
-    print("Creating BigQuery Tables for LifeEmbedding")
-    print("="*60)
-    print(f"Project: {config.PROJECT_ID}")
-    print(f"Dataset: {config.DATASET_ID}")
-    print(f"Location: {config.DATASET_LOCATION}")
-    print("="*60)
+    logger.info("="*60)
+    logger.info("Creating BigQuery Tables for LifeEmbedding")
+    logger.info("="*60)
+    logger.info(f"Project: {config.PROJECT_ID}")
+    logger.info(f"Dataset: {config.DATASET_ID}")
+    logger.info(f"Location: {config.DATASET_LOCATION}")
+    logger.info("="*60)
     
-    client = bigquery.Client(project=config.PROJECT_ID)
+    client = get_client()
     
     # Create all tables
-    print("\n🔧 Creating tables...")
-    print("Note: If tables already exist, they will not be modified.")
-    print("To update schema, you must drop and recreate tables.")
-    create_persons_table(client)
-    create_life_events_table(client)
-    create_embeddings_table(client)
-    create_coordinates_3d_table(client)
+    logger.info("\n🔧 Creating tables...")
+    logger.info("Note: If tables already exist, they will not be modified.")
+    logger.info("To update schema, you must drop and recreate tables.")
+    create_all_tables(client)
     
     # Verify
     verify_tables(client)
     
-    print("\n✅ Step 2.2 Complete! All tables created successfully.")
+    logger.info("\n✅ Step 2.2 Complete! All tables created successfully.")
 
 if __name__ == "__main__":
     main()
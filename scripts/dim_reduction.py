@@ -21,6 +21,9 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import json
 import os
+import urllib.error
+import urllib.request
+import joblib
 
 # Scientific computing libraries
 from sklearn.decomposition import PCA
@@ -34,6 +37,14 @@ from google.cloud import bigquery
 # Local imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from embedding_codec import unpack_embedding_matrix
+from create_views import refresh_cluster_top_occupations, refresh_visualization_snapshot
+
+# Model paths in config are relative to the project root, where the backend
+# loads them from, not to the directory the script is run in
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PCA_MODEL_PATH = os.path.join(PROJECT_ROOT, config.PCA_MODEL_FILE)
+UMAP_MODEL_PATH = os.path.join(PROJECT_ROOT, config.UMAP_MODEL_FILE)
 
 
 class DimensionalityReducer:
@@ -79,6 +90,7 @@ class DimensionalityReducer:
         SELECT 
             e.person_id,
             e.embedding_vector,
+            e.embedding_scale,
             e.embedding_model,
             e.embedding_dim,
             p.name,
@@ -96,6 +108,7 @@ class DimensionalityReducer:
             
             self.embeddings_data = []
             embeddings_list = []
+            scales = []
             
             for row in results:
                 self.embeddings_data.append({
@@ -107,8 +120,9 @@ class DimensionalityReducer:
                     'embedding_dim': row.embedding_dim
                 })
                 embeddings_list.append(row.embedding_vector)
+                scales.append(row.embedding_scale)
             
-            self.embeddings_768d = np.array(embeddings_list)
+            self.embeddings_768d = unpack_embedding_matrix(embeddings_list, scales)
             
             print(f"✓ Loaded {len(self.embeddings_data)} embeddings")
             print(f"  Embedding shape: {self.embeddings_768d.shape}")
@@ -398,12 +412,39 @@ class DimensionalityReducer:
                 print(f"    Unique clusters: {result.num_clusters}")
                 print(f"    Avg coordinates: ({result.avg_x:.2f}, {result.avg_y:.2f}, {result.avg_z:.2f})")
                 
+                # Refresh roll-ups served by the clusters and visualization endpoints
+                # (clusters_summary is a materialized view and refreshes itself)
+                refresh_cluster_top_occupations(self.bq_client)
+                refresh_visualization_snapshot(self.bq_client)
+                
                 return len(records)
                 
         except Exception as e:
             print(f"✗ Error saving to BigQuery: {e}")
             raise
     
+    def save_reduction_models(self, pca_path: str = PCA_MODEL_PATH,
+                              umap_path: str = UMAP_MODEL_PATH):
+        """
+        Persist the fitted PCA and UMAP models for the backend API
+        
+        PCA arrays are cast to float32 and dumped uncompressed so the API
+        can memory-map them with joblib.load(mmap_mode='r')
+        
+        Args:
+            pca_path: Path to save the PCA model
+            umap_path: Path to save the UMAP model
+        """
+        print(f"\nSaving reduction models...")
+        
+        for attr in ('components_', 'mean_', 'explained_variance_'):
+            setattr(self.pca_model, attr, getattr(self.pca_model, attr).astype(np.float32))
+        
+        for path, model in ((pca_path, self.pca_model), (umap_path, self.umap_model)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump(model, path, compress=0)
+            print(f"✓ Saved {path}")
+    
     def save_coordinates_locally(self, output_path: str = 'data/processed/coordinates_3d.json'):
         """
         Save coordinates locally as backup
@@ -492,6 +533,38 @@ class DimensionalityReducer:
         plt.savefig(output_path, dpi=150, bbox_inches='tight')
         print(f"✓ Saved 3D visualization to {output_path}")
         
+    def invalidate_api_cache(self):
+        """
+        Ask the backend API to drop its cached query results
+        
+        Without this the API keeps serving the previous coordinates until
+        its cache TTL expires
+        """
+        url = f"{config.API_BASE_URL}/api/{config.API_VERSION}/admin/cache/invalidate"
+        
+        if not config.ADMIN_API_KEY:
+            print(f"\nSkipping API cache invalidation: config.ADMIN_API_KEY is not set")
+            print(f"  Cached results will expire within {config.CACHE_TTL_SECONDS}s")
+            return
+        
+        print(f"\nInvalidating API cache at {url}...")
+        
+        try:
+            request = urllib.request.Request(url, method='POST',
+                                             headers={'X-Admin-Key': config.ADMIN_API_KEY})
+            with urllib.request.urlopen(request, timeout=10):
+                pass
+            print(f"✓ API cache invalidated")
+        except urllib.error.HTTPError as e:
+            if e.code == 403:
+                print(f"  ⚠️  API rejected the admin key (403); check ADMIN_API_KEY matches the API's config")
+            else:
+                print(f"  ⚠️  API returned an error ({e.code} {e.reason})")
+            print(f"  Cached results will expire within {config.CACHE_TTL_SECONDS}s")
+        except Exception as e:
+            print(f"  ⚠️  Could not reach API ({e})")
+            print(f"  Cached results will expire within {config.CACHE_TTL_SECONDS}s")
+        
     def run_full_pipeline(self, n_clusters: int = 10):
         """
         Run complete dimensionality reduction and clustering pipeline
@@ -520,16 +593,22 @@ class DimensionalityReducer:
         # Step 4: Clustering
         self.perform_clustering(n_clusters=n_clusters)
         
-        # Step 5: Save to BigQuery (will skip if streaming buffer active)
+        # Step 5: Persist fitted models so the API can project user embeddings
+        self.save_reduction_models()
+        
+        # Step 6: Save to BigQuery (will skip if streaming buffer active)
         num_inserted = self.save_coordinates_to_bigquery()
         
-        # Step 6: Save locally (always)
+        # Step 7: Save locally (always)
         if num_inserted == 0 or not hasattr(self, '_coordinates_saved_locally'):
             self.save_coordinates_locally()
         
-        # Step 7: Visualize
+        # Step 8: Visualize
         self.visualize_3d_clusters()
         
+        # Step 9: Make the running API drop results cached from the old coordinates
+        self.invalidate_api_cache()
+        
         print("\n" + "="*60)
         print("✓ PIPELINE COMPLETE")
         print("="*60)
@@ -539,6 +618,7 @@ class DimensionalityReducer:
         print(f"  - {self.n_clusters} clusters identified")
         print(f"  - Coordinates stored in BigQuery: coordinates_3d table")
         print(f"  - Local backup: data/processed/coordinates_3d.json")
+        print(f"  - Reduction models: {PCA_MODEL_PATH}, {UMAP_MODEL_PATH}")
         print(f"  - Visualization: data/processed/visualization_3d.png")
         print("\nNext: Proceed to Phase 6 (Backend API Development)")
 
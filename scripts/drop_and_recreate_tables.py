@@ -9,67 +9,50 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from google.cloud import bigquery
 import config
+import create_tables
+from bq_client import get_client, logger
 
-def drop_tables(client):
-    """Drop all existing tables"""
+def confirm_drop():
+    """Ask the user to confirm dropping all existing tables"""
     
-    tables = ["persons", "life_events", "embeddings", "coordinates_3d"]
+    tables = [name for name, *_ in create_tables.TABLE_SPECS]
     
-    print("\n⚠️  WARNING: About to drop all tables and their data!")
-    print("Tables to be dropped:")
+    logger.warning("\n⚠️  WARNING: About to drop all tables and their data!")
+    logger.info("Tables to be dropped:")
     for table in tables:
-        print(f"  - {table}")
+        logger.info(f"  - {table}")
     
     response = input("\nAre you sure you want to continue? (yes/no): ")
     if response.lower() != "yes":
-        print("❌ Operation cancelled.")
+        logger.error("❌ Operation cancelled.")
         return False
     
-    dataset_id = f"{config.PROJECT_ID}.{config.DATASET_ID}"
-    
-    for table_name in tables:
-        table_id = f"{dataset_id}.{table_name}"
-        try:
-            client.delete_table(table_id, not_found_ok=True)
-            print(f"✅ Dropped table: {table_name}")
-        except Exception as e:
-            print(f"❌ Error dropping {table_name}: {e}")
-    
     return True
 
 def main():
     """Drop and recreate all tables"""
     
-    print("="*60)
-    print("Drop and Recreate BigQuery Tables")
-    print("="*60)
-    print(f"Project: {config.PROJECT_ID}")
-    print(f"Dataset: {config.DATASET_ID}")
-    print("="*60)
+    logger.info("="*60)
+    logger.info("Drop and Recreate BigQuery Tables")
+    logger.info("="*60)
+    logger.info(f"Project: {config.PROJECT_ID}")
+    logger.info(f"Dataset: {config.DATASET_ID}")
+    logger.info("="*60)
     
-    client = bigquery.Client(project=config.PROJECT_ID)
+    client = get_client()
     
-    # Drop existing tables
-    if not drop_tables(client):
+    if not confirm_drop():
         return
     
-    # Recreate tables with new schema
-    print("\n🔧 Recreating tables with updated schema...")
-    print("Running create_tables.py...")
-    
-    # Import and run create_tables
-    import create_tables
-    create_tables.create_persons_table(client)
-    create_tables.create_life_events_table(client)
-    create_tables.create_embeddings_table(client)
-    create_tables.create_coordinates_3d_table(client)
+    # Drop and recreate in one script job (DROP TABLE IF EXISTS + CREATE TABLE)
+    logger.info("\n🔧 Dropping and recreating tables with updated schema...")
+    create_tables.create_all_tables(client, drop_existing=True)
     
     # Verify
     create_tables.verify_tables(client)
     
-    print("\n✅ Tables recreated successfully with updated schema!")
+    logger.info("\n✅ Tables recreated successfully with updated schema!")
 
 if __name__ == "__main__":
     main()
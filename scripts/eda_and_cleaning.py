@@ -9,12 +9,17 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
+import itertools
+import orjson
+import ijson
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import Counter, defaultdict
+from collections import Counter
+from contextlib import nullcontext
 from datetime import datetime
+from multiprocessing import Pool
 import logging
 import config
 
@@ -34,187 +39,195 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
 def load_crawl_data(filepath):
-    """Load the crawled JSON data"""
-    logger.info(f"Loading data from {filepath}...")
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    logger.info(f"Loaded {len(data)} person records")
-    return data
-
-def analyze_field_completeness(data):
-    """Analyze completeness of each field across all persons"""
+    """
+    Stream person records from a crawl JSON file one at a time
+    
+    Parses incrementally with ijson, so memory stays flat regardless of
+    file size; each pass over the data re-opens the file
+    """
+    logger.info(f"Streaming data from {filepath}...")
+    with open(filepath, 'rb') as f:
+        # use_float: numbers as float rather than Decimal, which orjson can't encode
+        yield from ijson.items(f, 'item', use_float=True)
+
+# Fields reported by the completeness analysis
+PERSON_FIELDS = [
+    'wikidata_id', 'name', 'description', 'birth_date', 'death_date',
+    'birth_place', 'death_place', 'occupation', 'field_of_work',
+    'citizenship', 'languages'
+]
+PERSON_LIST_FIELDS = ['occupation', 'field_of_work', 'citizenship', 'languages']
+EVENT_FIELDS = ['start_date', 'end_date', 'point_in_time', 'location',
+                'organization', 'role_or_degree', 'field_or_major']
+EVENT_DATE_FIELDS = ['start_date', 'end_date', 'point_in_time']
+
+# Persons per columnar batch in run_eda and clean_and_filter_data;
+# bounds the memory a batch's DataFrames can take while keeping pandas
+# calls coarse-grained
+BATCH_SIZE = 10000
+
+# Worker processes for per-person cleaning (1 = clean in this process).
+# Shipping records to workers pickles them both ways, which costs about as
+# much as cleaning them, so a pool only pays off with several spare cores.
+# Filtering and event selection stay serial and vectorized either way
+CLEAN_WORKERS = 1
+CLEAN_CHUNKSIZE = 64
+
+def extract_years(date_strings):
+    """
+    Years of ISO date strings as an int array, dropping unparseable dates and
+    years outside 1800-2025 (sanity check)
+    
+    The year prefix is cut with str.partition, which stops at the first '-'
+    (no list allocated, unlike split), and the prefixes are parsed in one
+    vectorized call. Missing values (None/NaN) are dropped
+    """
+    heads = [d.partition('-')[0] if isinstance(d, str) else None for d in date_strings]
+    years = pd.to_numeric(pd.Series(heads, dtype=object), errors='coerce').to_numpy(dtype=float)
+    return years[(years >= 1800) & (years <= 2025)].astype(int)
+
+def upper_median(values):
+    """
+    Upper middle element of an array (the true median for odd lengths)
+    
+    Same value as sorted(values)[len(values) // 2], found with an O(n)
+    partition instead of a full sort
+    """
+    middle = values.size // 2
+    return np.partition(values, middle)[middle]
+
+def log_lines(lines, title=None):
+    """
+    Emit report lines, under an optional title line, as a single INFO record
+    
+    One record per report section instead of one per line saves a handler
+    emit (and file flush) per line. lines may be a generator; it is only
+    consumed when INFO is enabled
+    """
+    if logger.isEnabledFor(logging.INFO):
+        if title is not None:
+            lines = itertools.chain([title], lines)
+        logger.info('\n'.join(lines))
+
+def analyze_field_completeness(field_counts, total_persons):
+    """Report completeness of each field across all persons"""
     logger.info("\n" + "="*60)
     logger.info("FIELD COMPLETENESS ANALYSIS")
     logger.info("="*60)
     
-    total_persons = len(data)
     field_stats = {}
     
     # Person-level fields
-    person_fields = [
-        'wikidata_id', 'name', 'description', 'birth_date', 'death_date',
-        'birth_place', 'death_place', 'occupation', 'field_of_work',
-        'citizenship', 'languages'
-    ]
-    
-    for field in person_fields:
-        non_null_count = 0
-        for person in data:
-            value = person.get(field)
-            # Check if value is not None and not empty (for arrays)
-            if value is not None:
-                if isinstance(value, list):
-                    if len(value) > 0:
-                        non_null_count += 1
-                else:
-                    non_null_count += 1
-        
+    for field in PERSON_FIELDS:
+        non_null_count = field_counts[field]
         completeness_pct = (non_null_count / total_persons) * 100
         field_stats[field] = {
             'non_null': non_null_count,
             'null': total_persons - non_null_count,
             'completeness_pct': completeness_pct
         }
-        logger.info(f"{field:20s}: {non_null_count:4d}/{total_persons} ({completeness_pct:5.1f}% complete)")
+    
+    log_lines('%-20s: %4d/%d (%5.1f%% complete)'
+              % (field, stats['non_null'], total_persons, stats['completeness_pct'])
+              for field, stats in field_stats.items())
     
     return field_stats
 
-def analyze_life_events(data):
-    """Analyze life events distribution and completeness"""
+def analyze_life_events(events_per_person, event_types, event_field_completeness):
+    """Report life events distribution and completeness"""
     logger.info("\n" + "="*60)
     logger.info("LIFE EVENTS ANALYSIS")
     logger.info("="*60)
     
     # Events per person
-    events_per_person = [len(person.get('life_events', [])) for person in data]
-    
+    counts = np.asarray(events_per_person)
     logger.info(f"\nEvents per person statistics:")
-    logger.info(f"  Total persons: {len(data)}")
-    logger.info(f"  Mean events: {sum(events_per_person) / len(events_per_person):.2f}")
-    logger.info(f"  Median events: {sorted(events_per_person)[len(events_per_person)//2]}")
-    logger.info(f"  Min events: {min(events_per_person)}")
-    logger.info(f"  Max events: {max(events_per_person)}")
-    logger.info(f"  Persons with 0 events: {sum(1 for e in events_per_person if e == 0)}")
-    logger.info(f"  Persons with <3 events: {sum(1 for e in events_per_person if e < 3)}")
+    logger.info(f"  Total persons: {counts.size}")
+    logger.info(f"  Mean events: {counts.mean():.2f}")
+    logger.info(f"  Median events: {upper_median(counts)}")
+    logger.info(f"  Min events: {counts.min()}")
+    logger.info(f"  Max events: {counts.max()}")
+    logger.info(f"  Persons with 0 events: {np.count_nonzero(counts == 0)}")
+    logger.info(f"  Persons with <3 events: {np.count_nonzero(counts < 3)}")
     
     # Event type breakdown
-    event_types = Counter()
-    event_field_completeness = defaultdict(lambda: {'total': 0, 'non_null': 0})
-    
-    total_events = 0
-    for person in data:
-        for event in person.get('life_events', []):
-            total_events += 1
-            event_type = event.get('event_type', 'unknown')
-            event_types[event_type] += 1
-            
-            # Track field completeness within events
-            for field in ['start_date', 'end_date', 'point_in_time', 'location', 
-                         'organization', 'role_or_degree', 'field_or_major']:
-                event_field_completeness[field]['total'] += 1
-                if event.get(field) is not None:
-                    event_field_completeness[field]['non_null'] += 1
-    
+    total_events = sum(event_types.values())
     logger.info(f"\nTotal life events: {total_events}")
-    logger.info(f"\nEvent type breakdown:")
-    for event_type, count in event_types.most_common():
-        pct = (count / total_events) * 100
-        logger.info(f"  {event_type:20s}: {count:5d} ({pct:5.1f}%)")
-    
-    logger.info(f"\nEvent field completeness:")
-    for field, stats in sorted(event_field_completeness.items()):
-        pct = (stats['non_null'] / stats['total']) * 100 if stats['total'] > 0 else 0
-        logger.info(f"  {field:20s}: {stats['non_null']:5d}/{stats['total']:5d} ({pct:5.1f}%)")
-    
-    return events_per_person, event_types, event_field_completeness
+    log_lines((
+        '  %-20s: %5d (%5.1f%%)' % (event_type, count, (count / total_events) * 100)
+        for event_type, count in event_types.most_common()
+    ), "\nEvent type breakdown:")
+    
+    log_lines((
+        '  %-20s: %5d/%5d (%5.1f%%)'
+        % (field, stats['non_null'], stats['total'],
+           (stats['non_null'] / stats['total']) * 100 if stats['total'] > 0 else 0)
+        for field, stats in sorted(event_field_completeness.items())
+    ), "\nEvent field completeness:")
+    
+    return event_field_completeness
 
-def analyze_temporal_coverage(data):
-    """Analyze temporal coverage of dates"""
+def analyze_temporal_coverage(birth_years, death_years, event_years):
+    """Report temporal coverage of dates"""
     logger.info("\n" + "="*60)
     logger.info("TEMPORAL COVERAGE ANALYSIS")
     logger.info("="*60)
     
-    birth_years = []
-    death_years = []
-    event_years = []
-    
-    for person in data:
-        # Birth years
-        if person.get('birth_date'):
-            try:
-                year = int(person['birth_date'].split('-')[0])
-                if 1800 <= year <= 2025:  # Sanity check
-                    birth_years.append(year)
-            except:
-                pass
-        
-        # Death years
-        if person.get('death_date'):
-            try:
-                year = int(person['death_date'].split('-')[0])
-                if 1800 <= year <= 2025:
-                    death_years.append(year)
-            except:
-                pass
-        
-        # Event years
-        for event in person.get('life_events', []):
-            for date_field in ['start_date', 'end_date', 'point_in_time']:
-                date_val = event.get(date_field)
-                if date_val:
-                    try:
-                        year = int(date_val.split('-')[0])
-                        if 1800 <= year <= 2025:
-                            event_years.append(year)
-                    except:
-                        pass
-    
-    if birth_years:
+    if birth_years.size:
         logger.info(f"\nBirth years:")
-        logger.info(f"  Range: {min(birth_years)} - {max(birth_years)}")
-        logger.info(f"  Count: {len(birth_years)}")
+        logger.info(f"  Range: {birth_years.min()} - {birth_years.max()}")
+        logger.info(f"  Count: {birth_years.size}")
     
-    if death_years:
+    if death_years.size:
         logger.info(f"\nDeath years:")
-        logger.info(f"  Range: {min(death_years)} - {max(death_years)}")
-        logger.info(f"  Count: {len(death_years)}")
+        logger.info(f"  Range: {death_years.min()} - {death_years.max()}")
+        logger.info(f"  Count: {death_years.size}")
     
-    if event_years:
+    if event_years.size:
         logger.info(f"\nEvent years:")
-        logger.info(f"  Range: {min(event_years)} - {max(event_years)}")
-        logger.info(f"  Count: {len(event_years)}")
+        logger.info(f"  Range: {event_years.min()} - {event_years.max()}")
+        logger.info(f"  Count: {event_years.size}")
     
     return birth_years, death_years, event_years
 
-def analyze_occupation_diversity(data):
-    """Analyze occupation and field diversity"""
+def analyze_occupation_diversity(all_occupations, all_fields):
+    """Report occupation and field diversity"""
     logger.info("\n" + "="*60)
     logger.info("OCCUPATION & FIELD DIVERSITY ANALYSIS")
     logger.info("="*60)
     
-    all_occupations = Counter()
-    all_fields = Counter()
-    
-    for person in data:
-        for occ in person.get('occupation', []):
-            all_occupations[occ] += 1
-        for field in person.get('field_of_work', []):
-            all_fields[field] += 1
-    
     logger.info(f"\nTotal unique occupations: {len(all_occupations)}")
-    logger.info(f"\nTop 20 occupations:")
-    for occ, count in all_occupations.most_common(20):
-        logger.info(f"  {occ:40s}: {count:4d}")
+    log_lines((
+        '  %-40s: %4d' % (occ, count) for occ, count in all_occupations.most_common(20)
+    ), "\nTop 20 occupations:")
     
     logger.info(f"\nTotal unique fields of work: {len(all_fields)}")
-    logger.info(f"\nTop 20 fields of work:")
-    for field, count in all_fields.most_common(20):
-        logger.info(f"  {field:40s}: {count:4d}")
+    log_lines((
+        '  %-40s: %4d' % (field, count) for field, count in all_fields.most_common(20)
+    ), "\nTop 20 fields of work:")
     
     return all_occupations, all_fields
 
 def calculate_profile_quality_score(person):
     """Calculate a quality score for a person profile (0-100)"""
+    events = person.get('life_events', [])
+    events_with_dates = sum(1 for e in events if e.get('start_date') or e.get('point_in_time'))
+    events_with_location = sum(1 for e in events if e.get('location'))
+    return score_profile(person, len(events), events_with_dates, events_with_location)
+
+def score_profile(person, num_events, events_with_dates, events_with_location):
+    """
+    Quality score (0-100) from a person's fields and pre-counted event stats
+    
+    Lets a caller that already walks the events score the profile without
+    iterating them again
+    """
+    score = profile_field_points(person)
+    score += int(event_points(num_events, events_with_dates, events_with_location))
+    return min(score, 100)
+
+def profile_field_points(person):
+    """Quality points earned by a person's own fields (60 max)"""
     score = 0
     
     # Required fields (40 points)
@@ -228,71 +241,264 @@ def calculate_profile_quality_score(person):
     if person.get('birth_place'): score += 5
     if person.get('field_of_work') and len(person['field_of_work']) > 0: score += 10
     
-    # Life events (40 points)
-    events = person.get('life_events', [])
-    num_events = len(events)
-    if num_events >= 10:
-        score += 20
-    elif num_events >= 5:
-        score += 15
-    elif num_events >= 3:
-        score += 10
-    elif num_events >= 1:
-        score += 5
-    
-    # Event quality (20 points max)
-    events_with_dates = sum(1 for e in events if e.get('start_date') or e.get('point_in_time'))
-    events_with_location = sum(1 for e in events if e.get('location'))
-    if num_events > 0:
-        date_pct = events_with_dates / num_events
-        loc_pct = events_with_location / num_events
-        score += int(date_pct * 15)
-        score += int(loc_pct * 5)
+    return score
+
+def event_points(num_events, events_with_dates, events_with_location):
+    """
+    Quality points earned by life events (40 max)
+    
+    Takes scalars or equal-length arrays, so run_eda can score every person
+    in one vectorized call
+    """
+    num_events = np.asarray(num_events)
+    
+    # Life events (20 points)
+    score = np.select(
+        [num_events >= 10, num_events >= 5, num_events >= 3, num_events >= 1],
+        [20, 15, 10, 5],
+        default=0
+    )
     
-    return min(score, 100)
+    # Event quality (20 points max); counts are 0 when there are no events
+    per_event = np.maximum(num_events, 1)
+    score += (np.asarray(events_with_dates) / per_event * 15).astype(int)
+    score += (np.asarray(events_with_location) / per_event * 5).astype(int)
+    
+    return score
 
-def identify_quality_profiles(data):
-    """Identify high and low quality profiles"""
+def identify_quality_profiles(profiles_with_scores):
+    """
+    Report high and low quality profiles
+    
+    Args:
+        profiles_with_scores: (name, num_events, score) tuples
+    """
     logger.info("\n" + "="*60)
     logger.info("PROFILE QUALITY ASSESSMENT")
     logger.info("="*60)
     
-    # Calculate scores
-    profiles_with_scores = []
-    for person in data:
-        score = calculate_profile_quality_score(person)
-        profiles_with_scores.append((person, score))
-    
     # Sort by score
-    profiles_with_scores.sort(key=lambda x: x[1], reverse=True)
+    profiles_with_scores.sort(key=lambda x: x[2], reverse=True)
     
     # Overall statistics
-    scores = [score for _, score in profiles_with_scores]
-    avg_score = sum(scores) / len(scores)
+    scores = np.fromiter((score for _, _, score in profiles_with_scores), dtype=int,
+                         count=len(profiles_with_scores))
     
     logger.info(f"\nOverall quality statistics:")
-    logger.info(f"  Mean score: {avg_score:.1f}")
-    logger.info(f"  Median score: {sorted(scores)[len(scores)//2]}")
-    logger.info(f"  Min score: {min(scores)}")
-    logger.info(f"  Max score: {max(scores)}")
-    logger.info(f"  Profiles with score >= 80: {sum(1 for s in scores if s >= 80)}")
-    logger.info(f"  Profiles with score >= 60: {sum(1 for s in scores if s >= 60)}")
-    logger.info(f"  Profiles with score < 40: {sum(1 for s in scores if s < 40)}")
+    logger.info(f"  Mean score: {scores.mean():.1f}")
+    logger.info(f"  Median score: {upper_median(scores)}")
+    logger.info(f"  Min score: {scores.min()}")
+    logger.info(f"  Max score: {scores.max()}")
+    logger.info(f"  Profiles with score >= 80: {np.count_nonzero(scores >= 80)}")
+    logger.info(f"  Profiles with score >= 60: {np.count_nonzero(scores >= 60)}")
+    logger.info(f"  Profiles with score < 40: {np.count_nonzero(scores < 40)}")
     
     # Top 10
-    logger.info(f"\nTop 10 highest quality profiles:")
-    for i, (person, score) in enumerate(profiles_with_scores[:10], 1):
-        logger.info(f"  {i:2d}. {person.get('name', 'Unknown'):40s} - Score: {score} - Events: {len(person.get('life_events', []))}")
+    log_lines((
+        '  %2d. %-40s - Score: %s - Events: %s' % (i, name, score, num_events)
+        for i, (name, num_events, score) in enumerate(profiles_with_scores[:10], 1)
+    ), "\nTop 10 highest quality profiles:")
     
     # Bottom 10
-    logger.info(f"\nBottom 10 lowest quality profiles:")
-    for i, (person, score) in enumerate(profiles_with_scores[-10:], 1):
-        logger.info(f"  {i:2d}. {person.get('name', 'Unknown'):40s} - Score: {score} - Events: {len(person.get('life_events', []))}")
+    log_lines((
+        '  %2d. %-40s - Score: %s - Events: %s' % (i, name, score, num_events)
+        for i, (name, num_events, score) in enumerate(profiles_with_scores[-10:], 1)
+    ), "\nBottom 10 lowest quality profiles:")
     
     return profiles_with_scores
 
-def clean_and_filter_data(data, min_quality_score=40, min_events=3):
-    """Clean data and filter out low-quality profiles"""
+def _truthy(column):
+    """Elementwise truthiness of an object column (None, NaN and '' are False)"""
+    return column.notna() & column.astype(bool)
+
+def flatten_events(persons):
+    """
+    All events of a batch as one list, fetching each person's life_events once
+    
+    Returns:
+        Tuple of (number of events of each person as an int array, the
+        events person by person)
+    """
+    event_lists = [person.get('life_events', []) for person in persons]
+    sizes = np.fromiter(map(len, event_lists), dtype=int, count=len(event_lists))
+    return sizes, [event for events in event_lists for event in events]
+
+def count_present_fields(persons):
+    """
+    Persons in a batch with each PERSON_FIELDS field present: non-null and,
+    for array fields, non-empty
+    
+    Computed as column reductions over a DataFrame of the batch
+    """
+    df = pd.DataFrame.from_records(persons, columns=PERSON_FIELDS)
+    present = df.notna()
+    for field in PERSON_LIST_FIELDS:
+        present[field] &= df[field].map(len, na_action='ignore').ne(0)
+    return present.sum().to_dict()
+
+def summarize_event_batch(events, events_per_person):
+    """
+    Event statistics for a batch of persons, computed column-wise
+    
+    The batch's events are laid out as one DataFrame (one column per field,
+    event_type as a categorical) instead of being walked dict by dict
+    
+    Args:
+        events: All events of the batch, person by person
+        events_per_person: Number of events of each person in the batch
+    
+    Returns:
+        Tuple of (event type counts in first-seen order, non-null counts in
+        EVENT_FIELDS order, event years, dated events per person, located
+        events per person)
+    """
+    df = pd.DataFrame.from_records(events, columns=['event_type'] + EVENT_FIELDS)
+    event_type = df['event_type'].fillna('unknown').astype('category')
+    
+    type_totals = event_type.value_counts(sort=False)
+    type_counts = {t: int(type_totals[t]) for t in event_type.unique()}
+    non_null = df[EVENT_FIELDS].notna().sum().to_numpy()
+    event_years = extract_years(pd.concat([df[field] for field in EVENT_DATE_FIELDS]))
+    dated, located = count_scored_events(df, events_per_person)
+    
+    return type_counts, non_null, event_years, dated, located
+
+def count_scored_events(df, events_per_person):
+    """
+    Dated and located events per person, for the quality score
+    
+    Args:
+        df: A batch's events as a DataFrame (needs start_date, point_in_time
+            and location), person by person
+        events_per_person: Number of events of each person in the batch
+    """
+    owner = np.repeat(np.arange(len(events_per_person)), events_per_person)
+    has_date = _truthy(df['start_date']) | _truthy(df['point_in_time'])
+    has_location = _truthy(df['location'])
+    dated = np.bincount(owner, weights=has_date.to_numpy(), minlength=len(events_per_person))
+    located = np.bincount(owner, weights=has_location.to_numpy(), minlength=len(events_per_person))
+    return dated.astype(int), located.astype(int)
+
+def run_eda(data):
+    """
+    Run every EDA analysis over the records in a single pass
+    
+    The records are consumed once, so data can be a stream. Field
+    completeness and events are summarized column-wise every BATCH_SIZE
+    persons; the rest is tallied as records arrive. Each analyze_*
+    function then reports on the accumulated statistics
+    """
+    total_persons = 0
+    field_counts = Counter()
+    events_per_person = []
+    event_types = Counter()
+    event_field_non_null = np.zeros(len(EVENT_FIELDS), dtype=np.int64)
+    birth_dates = []
+    death_dates = []
+    event_years = []
+    all_occupations = Counter()
+    all_fields = Counter()
+    names = []
+    field_points = []
+    dated_events = []
+    located_events = []
+    batch_persons = []
+    batch_events = []
+    batch_sizes = []
+    
+    def flush_batch():
+        """Fold the buffered batch's field and event statistics into the totals"""
+        field_counts.update(count_present_fields(batch_persons))
+        type_counts, non_null, years, dated, located = summarize_event_batch(batch_events, batch_sizes)
+        event_types.update(type_counts)
+        event_field_non_null[:] += non_null
+        event_years.append(years)
+        dated_events.extend(dated.tolist())
+        located_events.extend(located.tolist())
+        batch_persons.clear()
+        batch_events.clear()
+        batch_sizes.clear()
+    
+    for person in data:
+        total_persons += 1
+        
+        # Field completeness is counted column-wise per batch
+        batch_persons.append(person)
+        
+        # Birth/death dates (years are extracted after the pass)
+        if person.get('birth_date'):
+            birth_dates.append(person['birth_date'])
+        if person.get('death_date'):
+            death_dates.append(person['death_date'])
+        
+        # Life events are buffered and summarized per batch
+        events = person.get('life_events', [])
+        num_events = len(events)
+        events_per_person.append(num_events)
+        batch_events.extend(events)
+        batch_sizes.append(num_events)
+        
+        # Occupation diversity
+        all_occupations.update(person.get('occupation') or ())
+        all_fields.update(person.get('field_of_work') or ())
+        
+        # Quality: keep only what the report prints, not the record itself;
+        # the event part of the score is computed for everyone after the pass
+        names.append(person.get('name', 'Unknown'))
+        field_points.append(profile_field_points(person))
+        
+        if len(batch_sizes) >= BATCH_SIZE:
+            flush_batch()
+    
+    if batch_sizes:
+        flush_batch()
+    
+    scores = np.minimum(
+        np.asarray(field_points, dtype=int)
+        + event_points(events_per_person, dated_events, located_events),
+        100
+    )
+    profiles_with_scores = list(zip(names, events_per_person, scores.tolist()))
+    
+    birth_years = extract_years(birth_dates)
+    death_years = extract_years(death_dates)
+    event_years = np.concatenate(event_years) if event_years else np.empty(0, dtype=int)
+    
+    # Every event counts toward every field's total
+    total_events = sum(events_per_person)
+    event_field_completeness = {
+        field: {'total': total_events, 'non_null': int(non_null)}
+        for field, non_null in zip(EVENT_FIELDS, event_field_non_null)
+    } if total_events else {}
+    
+    field_stats = analyze_field_completeness(field_counts, total_persons)
+    event_field_stats = analyze_life_events(events_per_person, event_types, event_field_completeness)
+    analyze_temporal_coverage(birth_years, death_years, event_years)
+    analyze_occupation_diversity(all_occupations, all_fields)
+    profiles_with_scores = identify_quality_profiles(profiles_with_scores)
+    
+    return {
+        'total_persons': total_persons,
+        'field_stats': field_stats,
+        'events_per_person': events_per_person,
+        'event_types': event_types,
+        'event_field_stats': event_field_stats,
+        'birth_years': birth_years,
+        'death_years': death_years,
+        'event_years': event_years,
+        'occupations': all_occupations,
+        'fields': all_fields,
+        'profiles_with_scores': profiles_with_scores,
+    }
+
+def clean_and_filter_data(data, min_quality_score=40, min_events=3, workers=CLEAN_WORKERS):
+    """
+    Clean data and filter out low-quality profiles
+    
+    Yields cleaned profiles as it goes; the filtering summary is logged once
+    the input is exhausted. With workers > 1 accepted profiles are cleaned
+    in a process pool, in input order
+    """
     logger.info("\n" + "="*60)
     logger.info("DATA CLEANING & FILTERING")
     logger.info("="*60)
@@ -301,135 +507,263 @@ def clean_and_filter_data(data, min_quality_score=40, min_events=3):
     logger.info(f"  Minimum quality score: {min_quality_score}")
     logger.info(f"  Minimum life events: {min_events}")
     
-    cleaned_data = []
+    total_count = 0
+    accepted_count = 0
     rejected_count = 0
     rejection_reasons = Counter()
-    
-    for person in data:
-        # Calculate quality score
-        score = calculate_profile_quality_score(person)
-        
-        # Check required fields
-        if not person.get('wikidata_id'):
-            rejection_reasons['missing_wikidata_id'] += 1
-            rejected_count += 1
-            continue
-        
-        if not person.get('name'):
-            rejection_reasons['missing_name'] += 1
-            rejected_count += 1
-            continue
-        
-        # Check quality score
-        if score < min_quality_score:
-            rejection_reasons['low_quality_score'] += 1
-            rejected_count += 1
-            continue
-        
-        # Check minimum events
-        events = person.get('life_events', [])
-        if len(events) < min_events:
-            rejection_reasons['insufficient_events'] += 1
-            rejected_count += 1
-            continue
+    batch = []
+    
+    def process(batch, pool):
+        """Filter and clean one batch, updating the running tallies"""
+        nonlocal accepted_count, rejected_count
+        accepted, reasons = filter_batch(batch, min_quality_score, min_events)
+        accepted_count += len(accepted)
+        rejected_count += len(batch) - len(accepted)
+        rejection_reasons.update(reasons)
+        return clean_batch(accepted, pool)
+    
+    # Filter and clean a batch at a time
+    with (Pool(workers) if workers > 1 else nullcontext()) as pool:
+        for person in data:
+            total_count += 1
+            batch.append(person)
+            if len(batch) >= BATCH_SIZE:
+                yield from process(batch, pool)
+                batch = []
         
-        # Clean person data
-        cleaned_person = clean_person_data(person)
-        cleaned_data.append(cleaned_person)
+        if batch:
+            yield from process(batch, pool)
     
     logger.info(f"\nFiltering results:")
-    logger.info(f"  Original profiles: {len(data)}")
-    logger.info(f"  Accepted profiles: {len(cleaned_data)}")
+    logger.info(f"  Original profiles: {total_count}")
+    logger.info(f"  Accepted profiles: {accepted_count}")
     logger.info(f"  Rejected profiles: {rejected_count}")
     logger.info(f"\nRejection reasons:")
-    for reason, count in rejection_reasons.most_common():
-        logger.info(f"  {reason:30s}: {count:4d}")
-    
-    return cleaned_data
+    log_lines('  %-30s: %4d' % (reason, count) for reason, count in rejection_reasons.most_common())
 
-def clean_person_data(person):
-    """Clean and standardize a person's data"""
-    cleaned = person.copy()
-    
+def filter_batch(persons, min_quality_score, min_events):
+    """
+    Apply the acceptance checks to a batch of persons as boolean masks
+    
+    Checks run cheapest first (wikidata_id, name, minimum events, quality
+    score) and a person is rejected for the first one it fails; only
+    persons passing the other checks are scored
+    
+    Returns:
+        Tuple of (accepted persons in order, rejection reason counts)
+    """
+    num_events = np.fromiter((len(p.get('life_events', [])) for p in persons), dtype=int, count=len(persons))
+    has_id = np.fromiter((bool(p.get('wikidata_id')) for p in persons), dtype=bool, count=len(persons))
+    has_name = np.fromiter((bool(p.get('name')) for p in persons), dtype=bool, count=len(persons))
+    has_required = has_id & has_name
+    enough_events = num_events >= min_events
+    
+    # Score the remaining candidates only
+    candidates = np.flatnonzero(has_required & enough_events)
+    scored = [persons[i] for i in candidates]
+    field_points = np.fromiter((profile_field_points(p) for p in scored), dtype=int, count=len(scored))
+    scored_events, batch_events = flatten_events(scored)
+    events = pd.DataFrame.from_records(batch_events, columns=['start_date', 'point_in_time', 'location'])
+    dated, located = count_scored_events(events, scored_events)
+    scores = np.minimum(field_points + event_points(scored_events, dated, located), 100)
+    good_score = np.zeros(len(persons), dtype=bool)
+    good_score[candidates] = scores >= min_quality_score
+    
+    rejections = {
+        'missing_wikidata_id': ~has_id,
+        'missing_name': has_id & ~has_name,
+        'insufficient_events': has_required & ~enough_events,
+        'low_quality_score': has_required & enough_events & ~good_score,
+    }
+    accept = has_required & enough_events & good_score
+    
+    reasons = {reason: int(mask.sum()) for reason, mask in rejections.items() if mask.any()}
+    return [person for person, ok in zip(persons, accept) if ok], reasons
+
+def select_clean_events(persons):
+    """
+    Pick the events cleaning keeps for each person in a batch
+    
+    Drops events without a title or organization, then duplicates (same
+    type + title + start_date) within a person, keeping the first. The
+    decision is made column-wise over the whole batch; the kept events are
+    the original dicts
+    
+    Returns:
+        One list of kept events per person
+    """
+    sizes, events = flatten_events(persons)
+    
+    df = pd.DataFrame.from_records(events, columns=['event_type', 'event_title', 'start_date', 'organization'])
+    df['owner'] = np.repeat(np.arange(len(persons)), sizes)
+    
+    # Skip events without meaningful content
+    keep = (_truthy(df['event_title']) | _truthy(df['organization'])).to_numpy(dtype=bool, copy=True)
+    
+    # Deduplicate among the remaining events
+    candidates = df[keep]
+    duplicate = candidates.duplicated(subset=['owner', 'event_type', 'event_title', 'start_date'])
+    keep[np.flatnonzero(keep)[duplicate.to_numpy()]] = False
+    
+    kept = []
+    offset = 0
+    for size in sizes:
+        kept.append([event for event, k in zip(events[offset:offset + size], keep[offset:offset + size]) if k])
+        offset += size
+    return kept
+
+def clean_batch(persons, pool=None):
+    """
+    Clean a batch of accepted persons, yielding the cleaned profiles in order
+    
+    Args:
+        persons: Accepted raw person records
+        pool: Optional multiprocessing pool to run clean_person_data in
+    """
+    if not persons:
+        return
+    work = zip(persons, select_clean_events(persons))
+    if pool is None:
+        for person, events in work:
+            yield clean_person_data(person, events)
+    else:
+        yield from pool.starmap(clean_person_data, work, chunksize=CLEAN_CHUNKSIZE)
+
+def clean_person_data(person, kept_events=None):
+    """
+    Clean and standardize a person's data
+    
+    The record and its kept events are updated in place and returned;
+    records streamed from load_crawl_data are not shared, so no copy is made
+    
+    Args:
+        person: Raw person record
+        kept_events: The person's events after content filtering and
+            deduplication, if already selected by select_clean_events
+    """
     # Fill missing description
-    if not cleaned.get('description'):
-        cleaned['description'] = "No description available"
+    if not person.get('description'):
+        person['description'] = "No description available"
     
     # Ensure arrays are lists (not None)
-    for field in ['occupation', 'field_of_work', 'citizenship', 'languages']:
-        if not cleaned.get(field):
-            cleaned[field] = []
+    for field in PERSON_LIST_FIELDS:
+        if not person.get(field):
+            person[field] = []
     
     # Clean life events
+    if kept_events is None:
+        kept_events = select_clean_events([person])[0]
+    
     cleaned_events = []
-    seen_events = set()
+    events_with_dates = 0
+    events_with_location = 0
     
-    for event in person.get('life_events', []):
-        # Skip events without meaningful content
-        if not event.get('event_title') and not event.get('organization'):
-            continue
-        
-        # Deduplicate (same type + title + start_date)
-        event_key = (
-            event.get('event_type', ''),
-            event.get('event_title', ''),
-            event.get('start_date', '')
-        )
-        if event_key in seen_events:
-            continue
-        seen_events.add(event_key)
-        
+    for event in kept_events:
         # Clean event data
         cleaned_event = clean_event_data(event)
         cleaned_events.append(cleaned_event)
+        
+        # Counted here so scoring the cleaned profile needs no second walk
+        if cleaned_event.get('start_date') or cleaned_event.get('point_in_time'):
+            events_with_dates += 1
+        if cleaned_event.get('location'):
+            events_with_location += 1
     
-    cleaned['life_events'] = cleaned_events
+    person['life_events'] = cleaned_events
     
     # Add metadata
-    cleaned['quality_score'] = calculate_profile_quality_score(cleaned)
-    cleaned['num_life_events'] = len(cleaned_events)
+    person['quality_score'] = score_profile(person, len(cleaned_events),
+                                            events_with_dates, events_with_location)
+    person['num_life_events'] = len(cleaned_events)
     
-    return cleaned
+    return person
 
 def clean_event_data(event):
-    """Clean and standardize event data"""
-    cleaned = event.copy()
-    
+    """Clean and standardize event data, updating the event in place"""
     # Ensure event_description exists
-    if not cleaned.get('event_description'):
-        event_type = cleaned.get('event_type', 'event')
-        org = cleaned.get('organization', '')
+    if not event.get('event_description'):
+        event_type = event.get('event_type', 'event')
+        org = event.get('organization', '')
         if org:
-            cleaned['event_description'] = f"{event_type} at {org}"
+            event['event_description'] = f"{event_type} at {org}"
         else:
-            cleaned['event_description'] = f"{event_type} event"
+            event['event_description'] = f"{event_type} event"
     
     # Clean text fields (strip whitespace)
-    for field in ['event_title', 'event_description', 'location', 'organization']:
-        if cleaned.get(field):
-            cleaned[field] = cleaned[field].strip()
+    for field in ['event_title', 'event_description', 'location', 'organization',
+                  'role_or_degree', 'field_or_major']:
+        if event.get(field):
+            event[field] = event[field].strip()
     
-    return cleaned
+    return event
 
 def save_cleaned_data(cleaned_data, output_path):
-    """Save cleaned data to JSON"""
+    """
+    Save cleaned profiles to a JSON array, writing one record per line
+    
+    cleaned_data may be a stream; records are written as they arrive
+    
+    Returns:
+        Number of profiles written
+    """
     logger.info(f"\nSaving cleaned data to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
-    logger.info(f"Saved {len(cleaned_data)} cleaned profiles")
+    count = 0
+    # orjson emits UTF-8 bytes directly (non-ASCII kept as-is, no escaping)
+    with open(output_path, 'wb') as f:
+        f.write(b'[')
+        for person in cleaned_data:
+            f.write(b',\n' if count else b'\n')
+            f.write(orjson.dumps(person))
+            count += 1
+        f.write(b'\n]\n')
+    logger.info(f"Saved {count} cleaned profiles")
+    return count
+
+def tally_cleaned_profiles(profiles, plot_stats):
+    """
+    Pass cleaned profiles through unchanged, recording what the plots need
+    
+    Lets generate_visualizations run without re-reading the saved file.
+    plot_stats gets 'events_per_person' and 'scores' lists and an
+    'event_types' list holding the type of every event
+    """
+    events_per_person = plot_stats.setdefault('events_per_person', [])
+    event_types = plot_stats.setdefault('event_types', [])
+    scores = plot_stats.setdefault('scores', [])
+    for person in profiles:
+        events_per_person.append(person['num_life_events'])
+        event_types.extend(event.get('event_type', 'unknown') for event in person['life_events'])
+        scores.append(person['quality_score'])
+        yield person
 
-def generate_visualizations(data, output_dir):
-    """Generate visualization plots"""
+def plot_histogram(values, bins):
+    """Draw a histogram of values, binned with NumPy, on the current figure"""
+    counts, edges = np.histogram(values, bins=bins)
+    plt.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
+
+def generate_visualizations(plot_stats, output_dir):
+    """
+    Generate visualization plots
+    
+    Args:
+        plot_stats: Statistics of the cleaned profiles, as collected by
+            tally_cleaned_profiles
+        output_dir: Directory the PNG files are written to
+    """
     logger.info("\n" + "="*60)
     logger.info("GENERATING VISUALIZATIONS")
     logger.info("="*60)
     
     os.makedirs(output_dir, exist_ok=True)
     
+    events_per_person = np.asarray(plot_stats['events_per_person'], dtype=int)
+    # Categorical: counting the few distinct types is a single pass over codes
+    type_counts = pd.Series(plot_stats['event_types'], dtype='category').value_counts().head(15)
+    scores = np.asarray(plot_stats['scores'], dtype=int)
+    
     # 1. Events per person distribution
-    events_per_person = [len(p.get('life_events', [])) for p in data]
     plt.figure(figsize=(10, 6))
-    plt.hist(events_per_person, bins=30, edgecolor='black')
+    plot_histogram(events_per_person, bins=30)
     plt.xlabel('Number of Life Events')
     plt.ylabel('Number of Persons')
     plt.title('Distribution of Life Events per Person')
@@ -438,14 +772,8 @@ def generate_visualizations(data, output_dir):
     logger.info("  ✓ Saved events_per_person.png")
     
     # 2. Event types breakdown
-    event_types = Counter()
-    for person in data:
-        for event in person.get('life_events', []):
-            event_types[event.get('event_type', 'unknown')] += 1
-    
     plt.figure(figsize=(12, 6))
-    types, counts = zip(*event_types.most_common(15))
-    plt.bar(types, counts)
+    plt.bar(type_counts.index.astype(str), type_counts.to_numpy())
     plt.xlabel('Event Type')
     plt.ylabel('Count')
     plt.title('Event Type Distribution (Top 15)')
@@ -456,9 +784,8 @@ def generate_visualizations(data, output_dir):
     logger.info("  ✓ Saved event_types.png")
     
     # 3. Quality score distribution
-    scores = [calculate_profile_quality_score(p) for p in data]
     plt.figure(figsize=(10, 6))
-    plt.hist(scores, bins=20, edgecolor='black')
+    plot_histogram(scores, bins=20)
     plt.xlabel('Quality Score')
     plt.ylabel('Number of Persons')
     plt.title('Distribution of Profile Quality Scores')
@@ -481,43 +808,42 @@ def main():
     output_file = os.path.join(config.DATA_DIR, "processed", "wikidata_people_cleaned.json")
     viz_dir = os.path.join(config.DATA_DIR, "processed", "eda_visualizations")
     
-    # Load data
-    data = load_crawl_data(input_file)
-    
-    # Run EDA
-    field_stats = analyze_field_completeness(data)
-    events_per_person, event_types, event_field_stats = analyze_life_events(data)
-    birth_years, death_years, event_years = analyze_temporal_coverage(data)
-    occupations, fields = analyze_occupation_diversity(data)
-    profiles_with_scores = identify_quality_profiles(data)
-    
-    # Clean and filter data
-    cleaned_data = clean_and_filter_data(
-        data, 
-        min_quality_score=40,  # Relatively lenient for v1
-        min_events=3
+    # Run EDA (one streaming pass over the crawl)
+    eda = run_eda(load_crawl_data(input_file))
+    total_persons = eda['total_persons']
+    
+    # Clean, filter and save in a second streaming pass, tallying the
+    # plot inputs on the way through
+    plot_stats = {}
+    cleaned_count = save_cleaned_data(
+        tally_cleaned_profiles(
+            clean_and_filter_data(
+                load_crawl_data(input_file),
+                min_quality_score=40,  # Relatively lenient for v1
+                min_events=3
+            ),
+            plot_stats
+        ),
+        output_file
     )
     
-    # Save cleaned data
-    save_cleaned_data(cleaned_data, output_file)
-    
-    # Generate visualizations
-    generate_visualizations(cleaned_data, viz_dir)
+    # Generate visualizations of the cleaned data
+    generate_visualizations(plot_stats, viz_dir)
     
     # Final summary
     logger.info("\n" + "="*60)
     logger.info("SUMMARY")
     logger.info("="*60)
-    logger.info(f"Original profiles: {len(data)}")
-    logger.info(f"Cleaned profiles: {len(cleaned_data)}")
-    logger.info(f"Rejection rate: {((len(data) - len(cleaned_data)) / len(data) * 100):.1f}%")
+    logger.info(f"Original profiles: {total_persons}")
+    logger.info(f"Cleaned profiles: {cleaned_count}")
+    logger.info(f"Rejection rate: {((total_persons - cleaned_count) / total_persons * 100):.1f}%")
     logger.info(f"\nOutput files:")
     logger.info(f"  Cleaned data: {output_file}")
     logger.info(f"  Visualizations: {viz_dir}/")
     logger.info(f"  Log file: {config.LOGS_DIR}/eda_cleaning.log")
     logger.info("="*60)
     
-    return cleaned_data
+    return cleaned_count
 
 if __name__ == "__main__":
     main()
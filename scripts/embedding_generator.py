@@ -10,29 +10,296 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.cloud import bigquery
+from google.cloud.exceptions import GoogleCloudError
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery_storage_v1
+from google.cloud.bigquery_storage_v1 import types as write_types, writer as bq_writer
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
 from vertexai.language_models import TextEmbeddingModel
 import vertexai
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 import logging
+import logging.handlers
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import threading
 import time
-import json
+import orjson
+import base64
+import gzip
+import hashlib
+import itertools
+import random
+import sqlite3
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
 import config
+from embedding_codec import pack_embedding
+from create_tables import EMBEDDINGS_SCHEMA, PROTO_LABELS, PROTO_TYPES
 
 # Import our event text processor
-from event_text_processor import EventTextProcessor
+from event_text_processor import EventTextProcessor, CHARS_PER_TOKEN, MAX_NARRATIVE_CHARS
 
-# Set up logging
+# Set up logging: embedding workers only queue records; a background
+# listener writes them to the console and, buffered LOG_BUFFER_RECORDS at a
+# time (sooner on errors), to the log file
+LOG_BUFFER_RECORDS = 1000
+
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler(f'{config.LOGS_DIR}/embedding_generator.log')
+_log_file_handler.setFormatter(_log_formatter)
+_log_console_handler = logging.StreamHandler()
+_log_console_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.handlers.MemoryHandler(LOG_BUFFER_RECORDS, flushLevel=logging.ERROR, target=_log_file_handler),
+    _log_console_handler
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# force: importing event_text_processor has already configured the root logger.
+# Records are queued with the bare message; the listener's handlers format them
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'{config.LOGS_DIR}/embedding_generator.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+    force=True
 )
 logger = logging.getLogger(__name__)
 
+# get_embeddings calls kept in flight at once; each is a network round-trip
+EMBEDDING_MAX_WORKERS = 8
+# Overall Vertex AI request rate shared by those workers. Each quota error
+# (429) halves it, down to the minimum; each success wins back
+# RATE_RECOVERY of the difference to the full rate
+VERTEX_REQUESTS_PER_MINUTE = 600
+VERTEX_MIN_REQUESTS_PER_MINUTE = 30
+RATE_RECOVERY = 0.05
+
+# Transient Vertex AI errors are retried with exponential backoff (with
+# jitter) from BACKOFF_BASE_SECONDS, capped at BACKOFF_MAX_SECONDS
+RETRYABLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+)
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 30
+
+# Batches that still fail are listed here for reprocessing
+FAILED_BATCHES_FILE = os.path.join(config.LOGS_DIR, "failed_batches.json")
+
+# Per-request limits of text-embedding-004: at most 250 texts and about 20k
+# input tokens in total. Tokens are estimated with CHARS_PER_TOKEN; narratives
+# already fit the per-text limit (event_text_processor truncates them)
+EMBEDDING_MAX_BATCH = 250
+EMBEDDING_MAX_REQUEST_TOKENS = 20000
+
+# Persistent cache of narrative embeddings (packed float16 blobs, as stored in
+# BigQuery, keyed by content hash), so reruns only embed narratives that changed
+EMBEDDING_CACHE_FILE = os.path.join(config.DATA_DIR, "embeddings", "cache.sqlite")
+# Keys per cache lookup query (below SQLite's bound-parameter limit)
+CACHE_LOOKUP_CHUNK = 500
+
+# Narratives read, cache-checked and embedded per round in process_and_embed_all
+PERSONS_PER_CHUNK = 10000
+# Batches between progress lines within a chunk
+PROGRESS_EVERY_BATCHES = 100
+
+# Local backup of generated embeddings; reruns load it instead of re-embedding
+EMBEDDINGS_FILE = os.path.join(config.DATA_DIR, "embeddings", "person_embeddings.parquet")
+
+# Records identify their narrative by hash and length; set this to also store
+# its first 1000 characters in embedding_text, for debugging
+STORE_EMBEDDING_TEXT = False
+
+# Serialized rows per Storage Write API append, under its 10 MB request limit
+APPEND_MAX_BYTES = 9 * 1024 * 1024
+# Large writes are spread over this many streams appended from parallel
+# threads (client-side serialization and one connection each); smaller
+# writes use fewer so every stream carries at least MIN_ROWS_PER_WRITE_STREAM
+WRITE_STREAMS = 4
+MIN_ROWS_PER_WRITE_STREAM = 10000
+
+
+def request_ranges(texts: List[str], max_texts: int = EMBEDDING_MAX_BATCH) -> List[Tuple[int, int]]:
+    """
+    Split texts into consecutive (start, end) ranges that each fit in one
+    get_embeddings request: at most max_texts texts (capped at
+    EMBEDDING_MAX_BATCH) and EMBEDDING_MAX_REQUEST_TOKENS estimated tokens
+    """
+    max_texts = min(max_texts, EMBEDDING_MAX_BATCH)
+    ranges = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        # The model reads no more than MAX_NARRATIVE_CHARS of any text
+        text_tokens = min(len(text), MAX_NARRATIVE_CHARS) // CHARS_PER_TOKEN
+        if i > start and (i - start >= max_texts or tokens + text_tokens > EMBEDDING_MAX_REQUEST_TOKENS):
+            ranges.append((start, i))
+            start = i
+            tokens = 0
+        tokens += text_tokens
+    if start < len(texts):
+        ranges.append((start, len(texts)))
+    return ranges
+
+
+def build_row_descriptor(schema, message_name: str) -> descriptor_pb2.DescriptorProto:
+    """
+    Build the proto2 descriptor of a table row at runtime, matching the
+    schemas/<table>.proto emitted by create_tables (no protoc step needed)
+    """
+    descriptor = descriptor_pb2.DescriptorProto(name=message_name)
+    for number, field in enumerate(schema, 1):
+        descriptor.field.add(
+            name=field.name,
+            number=number,
+            type=descriptor_pb2.FieldDescriptorProto.Type.Value(f"TYPE_{PROTO_TYPES[field.field_type].upper()}"),
+            label=descriptor_pb2.FieldDescriptorProto.Label.Value(f"LABEL_{PROTO_LABELS[field.mode].upper()}"),
+        )
+    return descriptor
+
+
+def build_row_class(descriptor: descriptor_pb2.DescriptorProto):
+    """Return a message class for serializing rows described by descriptor"""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name=f"{descriptor.name}.proto", package="lifeembedding", syntax="proto2"
+    )
+    file_proto.message_type.add().CopyFrom(descriptor)
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName(f"lifeembedding.{descriptor.name}"))
+
+
+def prefetch(iterable, maxsize: int) -> Iterator:
+    """
+    Iterate over iterable from a background thread, keeping up to maxsize
+    items ready ahead of the consumer
+    
+    Errors raised while producing are re-raised in the consumer
+    """
+    items = queue.Queue(maxsize)
+    end = object()
+    errors = []
+    
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            items.put(end)
+    
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is end:
+            break
+        yield item
+    if errors:
+        raise errors[0]
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls at least 60/per_minute seconds apart
+    
+    The spacing adapts to backpressure: throttled() halves the rate (not
+    below min_per_minute) and succeeded() steps it back toward per_minute
+    """
+    
+    def __init__(self, per_minute: float, min_per_minute: Optional[float] = None):
+        self.base_interval = 60.0 / per_minute
+        self.max_interval = 60.0 / (min_per_minute or per_minute)
+        self.interval = self.base_interval
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def throttled(self):
+        """Halve the request rate after a quota error"""
+        with self._lock:
+            self.interval = min(self.max_interval, self.interval * 2)
+    
+    def succeeded(self):
+        """Recover part of the rate lost to earlier quota errors"""
+        with self._lock:
+            self.interval -= (self.interval - self.base_interval) * RATE_RECOVERY
+
+
+class LocalEmbeddingsWriter:
+    """
+    Writes embedding records to the local Parquet backup, one row group per
+    write() call, so the backup never needs every record at once
+    
+    Vectors are packed float16, the same bytes BigQuery stores, in a
+    fixed-size binary column; the other fields are plain columns. The file
+    is built under a temporary name and moved into place only when the
+    context exits cleanly, so an interrupted run leaves no partial backup
+    for a rerun to pick up (the embedding cache keeps its progress instead)
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._partial_path = path + '.partial'
+        self._writer = None
+    
+    def __enter__(self):
+        return self
+    
+    def write(self, embedding_records: List[Dict[str, Any]]):
+        """Append records as one row group"""
+        if not embedding_records:
+            return
+        
+        columns = {
+            name: [record[name] for record in embedding_records]
+            for name in embedding_records[0] if name != 'embedding_vector'
+        }
+        # Records already hold the packed bytes; joined, they are the column's data buffer
+        vectors = b''.join(record['embedding_vector'] for record in embedding_records)
+        columns['embedding_vector'] = pa.FixedSizeBinaryArray.from_buffers(
+            pa.binary(len(embedding_records[0]['embedding_vector'])), len(embedding_records),
+            [None, pa.py_buffer(vectors)]
+        )
+        
+        if self._writer is None:
+            table = pa.table(columns)
+            self._writer = pq.ParquetWriter(self._partial_path, table.schema, compression='zstd')
+        else:
+            # Later row groups take the first one's column types
+            table = pa.Table.from_pydict(columns, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(embedding_records)
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._writer is None:
+            return
+        self._writer.close()
+        if exc_type is None:
+            os.replace(self._partial_path, self.path)
+        else:
+            os.remove(self._partial_path)
+
 
 class EmbeddingGenerator:
     """Generates embeddings using Vertex AI text-embedding-004 model"""
@@ -43,11 +310,28 @@ class EmbeddingGenerator:
         # Initialize Vertex AI
         vertexai.init(project=config.PROJECT_ID, location=config.VERTEX_AI_REGION)
         self.embedding_model = TextEmbeddingModel.from_pretrained(config.EMBEDDING_MODEL)
+        self.rate_limiter = RateLimiter(VERTEX_REQUESTS_PER_MINUTE, VERTEX_MIN_REQUESTS_PER_MINUTE)
+        
+        # Embeddings from earlier runs
+        os.makedirs(os.path.dirname(EMBEDDING_CACHE_FILE), exist_ok=True)
+        self.cache = sqlite3.connect(EMBEDDING_CACHE_FILE)
+        self.cache.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings_f16 (hash BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
         
         # Initialize BigQuery
         self.bq_client = bigquery.Client(project=config.PROJECT_ID)
         self.dataset_id = config.DATASET_ID
         self.embeddings_table = f"{config.PROJECT_ID}.{self.dataset_id}.embeddings"
+        self.load_job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND
+        )
+        
+        # Storage Write API client and the binary row format for embeddings
+        self.write_client = bigquery_storage_v1.BigQueryWriteClient()
+        self.row_descriptor = build_row_descriptor(EMBEDDINGS_SCHEMA, "EmbeddingsRow")
+        self.row_class = build_row_class(self.row_descriptor)
         
         logger.info(f"Initialized EmbeddingGenerator")
         logger.info(f"  Vertex AI region: {config.VERTEX_AI_REGION}")
@@ -66,13 +350,8 @@ class EmbeddingGenerator:
         """
         
         try:
-            # Truncate text if too long (Vertex AI limit is ~20k tokens)
-            if len(text) > 10000:
-                text = text[:10000]
-                logger.warning(f"Text truncated to 10000 characters")
-            
             # Get embedding
-            embeddings = self.embedding_model.get_embeddings([text])
+            embeddings = self._request_embeddings([text])
             
             # Extract the vector
             vector = embeddings[0].values
@@ -87,31 +366,24 @@ class EmbeddingGenerator:
         """
         Generate embeddings for multiple texts in batch
         
+        Texts beyond what one request may carry (see request_ranges) are
+        sent as several requests. Texts are sent as given; narratives are
+        truncated to the model's input limit when they are generated
+        
         Args:
-            texts: List of texts to embed (max 5 for Vertex AI)
+            texts: List of texts to embed
         
         Returns:
             List of embedding vectors
         """
         
         try:
-            # Vertex AI recommends max 5 texts per batch
-            if len(texts) > 5:
-                logger.warning(f"Batch size {len(texts)} exceeds recommended limit of 5")
-            
-            # Truncate long texts
-            truncated_texts = []
-            for text in texts:
-                if len(text) > 10000:
-                    truncated_texts.append(text[:10000])
-                else:
-                    truncated_texts.append(text)
-            
-            # Get embeddings (no task_type parameter for older SDK)
-            embeddings = self.embedding_model.get_embeddings(truncated_texts)
-            
-            # Extract vectors
-            vectors = [emb.values for emb in embeddings]
+            vectors = []
+            for start, end in request_ranges(texts):
+                embeddings = self._request_embeddings(texts[start:end])
+                
+                # Extract vectors
+                vectors.extend(emb.values for emb in embeddings)
             
             return vectors
             
@@ -119,39 +391,105 @@ class EmbeddingGenerator:
             logger.error(f"Error generating batch embeddings: {e}")
             raise
     
-    def load_processed_narratives(self, filepath: str) -> List[Tuple[str, str, str, str]]:
+    def _request_embeddings(self, texts: List[str]):
+        """
+        One get_embeddings call, retried on transient errors
+        
+        Waits for the shared rate limiter before every attempt and backs off
+        exponentially between attempts; the last error is raised. Quota
+        errors also slow the limiter down for every worker
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            self.rate_limiter.wait()
+            try:
+                # No task_type parameter for older SDK
+                embeddings = self.embedding_model.get_embeddings(texts)
+                self.rate_limiter.succeeded()
+                return embeddings
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, api_exceptions.ResourceExhausted):
+                    self.rate_limiter.throttled()
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1)
+                logger.warning(f"Vertex AI error ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _embed_one_batch(self, batch_idx: int, texts: List[str]) -> Tuple[Optional[List[List[float]]], Optional[str]]:
         """
-        Load pre-processed narratives from JSON file
+        Embed one batch of narratives
+        
+        Runs on a worker thread; pacing across workers is left to the shared
+        rate limiter
         
         Returns:
-            List of tuples: (person_id, name, narrative_text, metadata_json)
+            Tuple of (vectors, None), or (None, error message) if the batch
+            failed after retries
+        """
+        try:
+            return self.generate_embeddings_batch(texts), None
+        except Exception as e:
+            logger.error(f"Error processing batch {batch_idx}: {e}")
+            return None, str(e)
+    
+    @staticmethod
+    def cache_key(narrative: str) -> bytes:
+        """Embedding cache key: SHA-256 of the model name and the narrative"""
+        return hashlib.sha256(f"{config.EMBEDDING_MODEL}\x00{narrative}".encode('utf-8')).digest()
+    
+    def lookup_cached_embeddings(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        """Cached packed vectors aligned with keys (None where not cached)"""
+        found = {}
+        for i in range(0, len(keys), CACHE_LOOKUP_CHUNK):
+            chunk = keys[i:i+CACHE_LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self.cache.execute(
+                f"SELECT hash, vector FROM embeddings_f16 WHERE hash IN ({placeholders})", chunk
+            ))
+        return [found.get(key) for key in keys]
+    
+    def store_cached_embeddings(self, keys: List[bytes], vectors: List[bytes]):
+        """Add freshly generated packed vectors to the cache (committed immediately)"""
+        with self.cache:
+            self.cache.executemany(
+                "INSERT OR REPLACE INTO embeddings_f16 (hash, vector) VALUES (?, ?)",
+                zip(keys, vectors)
+            )
+    
+    def load_processed_narratives(self, filepath: str) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
         """
-        logger.info(f"Loading pre-processed narratives from {filepath}...")
+        Stream pre-processed narratives from a newline-delimited JSON file
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        Records are parsed a line at a time, so memory stays flat regardless
+        of the number of persons
         
-        results = []
-        for item in data:
-            person_id = item['person_id']
-            name = item['name']
-            narrative = item['narrative']
-            metadata = str(item['metadata'])
-            results.append((person_id, name, narrative, metadata))
+        Yields:
+            Tuples of (person_id, name, narrative_text, metadata)
+        """
+        logger.info(f"Streaming pre-processed narratives from {filepath}...")
         
-        logger.info(f"✓ Loaded {len(results)} pre-processed narratives")
-        return results
+        with open(filepath, 'rb') as f:
+            for line in f:
+                item = orjson.loads(line)
+                yield item['person_id'], item['name'], item['narrative'], item['metadata']
     
-    def process_and_embed_all(self, batch_size: int = 5, use_cached: bool = True) -> List[Dict[str, Any]]:
+    def process_and_embed_all(self, batch_size: int = 100, use_cached: bool = True) -> List[Dict[str, Any]]:
         """
         Process all persons, generate narratives, and create embeddings
         
+        Narratives are consumed PERSONS_PER_CHUNK at a time; each chunk is
+        checked against the embedding cache and its misses are embedded
+        before the next chunk is read
+        
         Args:
-            batch_size: Number of texts to embed per API call (max 5 for Vertex AI)
+            batch_size: Maximum number of texts to embed per API call (capped at
+                EMBEDDING_MAX_BATCH; batches of long texts are smaller to fit the
+                request token limit)
             use_cached: If True, load pre-processed narratives from file if available
         
         Returns:
-            List of embedding records ready for BigQuery insertion
+            List of embedding records ready for BigQuery insertion, with
+            embedding_vector as packed float16 bytes
         """
         
         logger.info("="*60)
@@ -159,136 +497,284 @@ class EmbeddingGenerator:
         logger.info("="*60)
         
         # Try to load cached narratives first
-        narratives_file = os.path.join(config.DATA_DIR, "processed", "person_narratives.json")
+        narratives_file = os.path.join(config.DATA_DIR, "processed", "person_narratives.ndjson")
         
         if use_cached and os.path.exists(narratives_file):
             logger.info(f"Found cached narratives at {narratives_file}")
-            person_data = self.load_processed_narratives(narratives_file)
+            person_iter = self.load_processed_narratives(narratives_file)
         else:
             logger.info("Processing narratives from BigQuery (no cache found or use_cached=False)")
             processor = EventTextProcessor()
-            person_data = processor.process_all_persons()
+            person_iter = processor.process_all_persons_iter()
         
-        logger.info(f"\nGenerating embeddings for {len(person_data)} persons...")
+        # Narratives for the next chunk are produced while this one embeds
+        person_iter = prefetch(person_iter, PERSONS_PER_CHUNK)
+        
+        logger.info(f"\nGenerating embeddings...")
         logger.info(f"Batch size: {batch_size}")
         
         embedding_records = []
         total_api_calls = 0
-        
-        # Process in batches
-        for i in range(0, len(person_data), batch_size):
-            batch = person_data[i:i+batch_size]
-            
-            # Extract texts and metadata
-            batch_texts = [narrative for _, _, narrative, _ in batch]
-            batch_person_ids = [person_id for person_id, _, _, _ in batch]
-            batch_names = [name for _, name, _, _ in batch]
-            
-            try:
-                # Generate embeddings for batch
-                vectors = self.generate_embeddings_batch(batch_texts)
-                total_api_calls += 1
+        persons_seen = 0
+        cache_hits = 0
+        duplicates = 0
+        batch_idx = 0
+        failed_batches = []
+        
+        # Shared by every record of this run, so computed once
+        created_at = datetime.utcnow().isoformat()
+        model_name = config.EMBEDDING_MODEL
+        
+        # Batches are embedded concurrently; map yields results in batch order
+        logger.info(f"Backing up embeddings to {EMBEDDINGS_FILE}")
+        
+        with ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS) as executor, \
+                LocalEmbeddingsWriter(EMBEDDINGS_FILE) as backup:
+            while True:
+                person_data = list(itertools.islice(person_iter, PERSONS_PER_CHUNK))
+                if not person_data:
+                    break
+                
+                # Unpacked into columns once; everything below indexes these
+                person_ids, _, narratives, _ = zip(*person_data)
+                
+                # Narratives embedded by an earlier run come from the cache
+                keys = [self.cache_key(narrative) for narrative in narratives]
+                vectors = self.lookup_cached_embeddings(keys)
+                todo = [i for i, vector in enumerate(vectors) if vector is None]
+                cache_hits += len(person_data) - len(todo)
+                
+                # Identical narratives are embedded once; the first index of
+                # each is sent and its vector is shared with the rest
+                copies = {}
+                for i in todo:
+                    copies.setdefault(keys[i], []).append(i)
+                todo = [indices[0] for indices in copies.values()]
+                duplicates += sum(len(indices) - 1 for indices in copies.values())
                 
-                # Create records for BigQuery (match the actual table schema)
-                for j, vector in enumerate(vectors):
-                    person_id = batch_person_ids[j]
-                    name = batch_names[j]
-                    narrative = batch_texts[j]
+                ranges = request_ranges([narratives[i] for i in todo], batch_size)
+                batches = [todo[start:end] for start, end in ranges]
+                results = executor.map(self._embed_one_batch, range(batch_idx, batch_idx + len(batches)),
+                                       ([narratives[i] for i in batch] for batch in batches))
+                
+                for batch, (batch_vectors, error) in zip(batches, results):
+                    batch_idx += 1
+                    if batch_vectors is None:
+                        # Kept for reprocessing; continue with next batch
+                        failed_batches.append({
+                            'batch': batch_idx - 1,
+                            'person_ids': [person_ids[j] for i in batch for j in copies[keys[i]]],
+                            'error': error,
+                        })
+                        continue
+                    total_api_calls += 1
+                    
+                    # Packed once here; the cache, the local backup and both
+                    # BigQuery writers all take these bytes as they are
+                    batch_vectors = [pack_embedding(vector) for vector in batch_vectors]
+                    for i, vector in zip(batch, batch_vectors):
+                        for j in copies[keys[i]]:
+                            vectors[j] = vector
+                    self.store_cached_embeddings([keys[i] for i in batch], batch_vectors)
                     
-                    record = {
+                    # Progress logging
+                    if batch_idx % PROGRESS_EVERY_BATCHES == 0:
+                        logger.info(f"  Embedded {batch_idx} batches ({total_api_calls} API calls)")
+                
+                # Create records for BigQuery (match the actual table schema), in input
+                # order; persons whose batch failed have no vector and are skipped
+                chunk_records = [
+                    {
                         'person_id': person_id,
                         'embedding_vector': vector,
-                        'embedding_model': config.EMBEDDING_MODEL,  # Changed from model_name
-                        'embedding_dim': len(vector),  # Changed from embedding_dimension
-                        'embedding_text': narrative[:1000],  # Changed from source_text
-                        'created_at': datetime.utcnow().isoformat()
+                        'embedding_model': model_name,
+                        'embedding_dim': len(vector) // 2,  # 2 bytes per float16 value
+                        'embedding_text': narrative[:1000] if STORE_EMBEDDING_TEXT else None,
+                        'embedding_text_sha1': hashlib.sha1(narrative.encode('utf-8')).hexdigest(),
+                        'embedding_text_length': len(narrative),
+                        'created_at': created_at
                     }
-                    
-                    embedding_records.append(record)
+                    for person_id, narrative, vector in zip(person_ids, narratives, vectors)
+                    if vector is not None
+                ]
+                backup.write(chunk_records)
+                embedding_records.extend(chunk_records)
                 
-                # Progress logging
-                if (i // batch_size + 1) % 10 == 0:
-                    logger.info(f"  Processed {i+len(batch)}/{len(person_data)} persons ({total_api_calls} API calls)")
-                
-                # Rate limiting (Vertex AI has generous limits, but be safe)
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"Error processing batch at index {i}: {e}")
-                # Continue with next batch
-                continue
+                persons_seen += len(person_data)
+                logger.info(f"  Processed {persons_seen} persons ({cache_hits} from cache, "
+                            f"{duplicates} duplicates, {total_api_calls} API calls)")
+        
+        if failed_batches:
+            with open(FAILED_BATCHES_FILE, 'wb') as f:
+                f.write(orjson.dumps(failed_batches, option=orjson.OPT_INDENT_2))
+            logger.warning(f"{len(failed_batches)} batches failed; listed in {FAILED_BATCHES_FILE}")
         
         logger.info(f"\n✓ Generated {len(embedding_records)} embeddings")
+        logger.info(f"  From cache: {cache_hits}")
+        logger.info(f"  Duplicate narratives: {duplicates}")
         logger.info(f"  Total API calls: {total_api_calls}")
         logger.info(f"  Embedding dimension: {embedding_records[0]['embedding_dim'] if embedding_records else 'N/A'}")
-        
-        # Save embeddings locally
-        self._save_embeddings_locally(embedding_records)
+        logger.info(f"  Saved locally: {backup.rows}")
         
         return embedding_records
     
-    def _save_embeddings_locally(self, embedding_records: List[Dict[str, Any]]):
-        """Save embeddings to local JSON file as backup"""
-        
-        embeddings_file = os.path.join(config.DATA_DIR, "embeddings", "person_embeddings.json")
-        
-        logger.info(f"\nSaving embeddings locally to {embeddings_file}...")
-        
-        with open(embeddings_file, 'w', encoding='utf-8') as f:
-            json.dump(embedding_records, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"✓ Saved {len(embedding_records)} embeddings locally")
-    
     def load_embeddings_from_local(self, filepath: str) -> List[Dict[str, Any]]:
-        """Load embeddings from local JSON file"""
+        """Load embeddings from a local Parquet file (vectors as packed float16 bytes)"""
         
         logger.info(f"Loading embeddings from {filepath}...")
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            embedding_records = json.load(f)
+        embedding_records = pq.read_table(filepath, memory_map=True).to_pylist()
         
         logger.info(f"✓ Loaded {len(embedding_records)} embeddings from local file")
         return embedding_records
     
-    def insert_embeddings_to_bigquery(self, embedding_records: List[Dict[str, Any]], batch_size: int = 100):
+    def insert_embeddings_to_bigquery(self, embedding_records: List[Dict[str, Any]]):
         """
-        Insert embedding records into BigQuery
+        Write embedding records to BigQuery through the Storage Write API
+        
+        Rows are appended as binary protos to PENDING streams, written in
+        parallel, and committed atomically at the end. If any step fails
+        nothing has been committed, so the records are loaded with a single
+        load job instead
         
         Args:
             embedding_records: List of embedding records
-            batch_size: Number of records per insert batch
+        
+        Returns:
+            Tuple of (rows written, rows failed)
         """
         
-        logger.info(f"\nInserting {len(embedding_records)} embeddings into BigQuery...")
+        logger.info(f"\nWriting {len(embedding_records)} embeddings to BigQuery...")
         
-        total_inserted = 0
-        failed_inserts = 0
+        if not embedding_records:
+            return 0, 0
         
-        for i in range(0, len(embedding_records), batch_size):
-            batch = embedding_records[i:i+batch_size]
-            
-            try:
-                errors = self.bq_client.insert_rows_json(self.embeddings_table, batch)
-                
-                if errors:
-                    logger.error(f"Errors inserting batch {i//batch_size + 1}: {errors}")
-                    failed_inserts += len(batch)
-                else:
-                    total_inserted += len(batch)
-                    
-                if (i // batch_size + 1) % 5 == 0:
-                    logger.info(f"  Inserted {total_inserted} embeddings so far...")
-                    
-            except Exception as e:
-                logger.error(f"Error inserting batch at index {i}: {e}")
-                failed_inserts += len(batch)
+        try:
+            total_inserted = self._write_embeddings_streams(embedding_records)
+            failed_inserts = 0
+        except Exception as e:
+            logger.warning(f"Storage Write API failed ({e}); falling back to a load job")
+            total_inserted, failed_inserts = self._load_embeddings_job(embedding_records)
         
-        logger.info(f"\n✓ Insertion complete")
+        logger.info(f"\n✓ Write complete")
         logger.info(f"  Successfully inserted: {total_inserted}")
         logger.info(f"  Failed: {failed_inserts}")
         
         return total_inserted, failed_inserts
     
+    def _serialize_rows(self, embedding_records: List[Dict[str, Any]]) -> Iterator[List[bytes]]:
+        """Yield serialized rows in groups of at most APPEND_MAX_BYTES"""
+        group = []
+        group_bytes = 0
+        for record in embedding_records:
+            row = self.row_class(
+                **{key: value for key, value in record.items() if value is not None}
+            ).SerializeToString()
+            if group and group_bytes + len(row) > APPEND_MAX_BYTES:
+                yield group
+                group = []
+                group_bytes = 0
+            group.append(row)
+            group_bytes += len(row)
+        if group:
+            yield group
+    
+    def _write_embeddings_streams(self, embedding_records: List[Dict[str, Any]]) -> int:
+        """
+        Split the records over up to WRITE_STREAMS PENDING write streams,
+        appended concurrently, and commit them all in one atomic call
+        
+        Returns:
+            Number of rows committed
+        """
+        project, dataset, table = self.embeddings_table.split('.')
+        parent = self.write_client.table_path(project, dataset, table)
+        
+        stream_count = min(WRITE_STREAMS, -(-len(embedding_records) // MIN_ROWS_PER_WRITE_STREAM))
+        per_stream = -(-len(embedding_records) // stream_count)
+        slices = [embedding_records[i:i + per_stream] for i in range(0, len(embedding_records), per_stream)]
+        
+        with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+            streams = list(executor.map(self._append_pending_stream, itertools.repeat(parent), slices))
+        
+        commit = self.write_client.batch_commit_write_streams(
+            write_types.BatchCommitWriteStreamsRequest(parent=parent, write_streams=[name for name, _ in streams])
+        )
+        if commit.stream_errors:
+            raise RuntimeError(f"commit failed: {commit.stream_errors[0].error_message}")
+        
+        return sum(row_count for _, row_count in streams)
+    
+    def _append_pending_stream(self, parent: str, embedding_records: List[Dict[str, Any]]) -> Tuple[str, int]:
+        """
+        Append records to a new PENDING write stream and finalize it
+        
+        Returns:
+            Tuple of (stream name, rows appended)
+        """
+        stream = self.write_client.create_write_stream(
+            parent=parent,
+            write_stream=write_types.WriteStream(type_=write_types.WriteStream.Type.PENDING),
+        )
+        
+        # The schema is sent once, on the first request of the connection
+        template = write_types.AppendRowsRequest(
+            write_stream=stream.name,
+            proto_rows=write_types.AppendRowsRequest.ProtoData(
+                writer_schema=write_types.ProtoSchema(proto_descriptor=self.row_descriptor)
+            ),
+        )
+        append_stream = bq_writer.AppendRowsStream(self.write_client, template)
+        
+        offset = 0
+        futures = []
+        try:
+            for rows in self._serialize_rows(embedding_records):
+                request = write_types.AppendRowsRequest(
+                    offset=offset,
+                    proto_rows=write_types.AppendRowsRequest.ProtoData(
+                        rows=write_types.ProtoRows(serialized_rows=rows)
+                    ),
+                )
+                futures.append(append_stream.send(request))
+                offset += len(rows)
+            for future in futures:
+                future.result()
+        finally:
+            append_stream.close()
+        
+        self.write_client.finalize_write_stream(name=stream.name)
+        return stream.name, offset
+    
+    def _load_embeddings_job(self, embedding_records: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Load embedding records with a single load job
+        
+        The records are staged as a gzipped NDJSON temp file and appended in
+        one job (free, no streaming-insert quotas or per-request row caps)
+        
+        Returns:
+            Tuple of (rows loaded, rows failed)
+        """
+        
+        with tempfile.TemporaryFile() as raw:
+            # Level 1 keeps compression cheap next to encoding
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1) as staging:
+                for record in embedding_records:
+                    # BYTES columns take base64 in JSON rows
+                    row = {**record, 'embedding_vector': base64.b64encode(record['embedding_vector']).decode('ascii')}
+                    # orjson emits UTF-8 bytes directly, non-ASCII text unescaped
+                    staging.write(orjson.dumps(row) + b'\n')
+            
+            try:
+                raw.seek(0)
+                job = self.bq_client.load_table_from_file(raw, self.embeddings_table, job_config=self.load_job_config)
+                job.result()
+                return job.output_rows, 0
+            except GoogleCloudError as e:
+                logger.error(f"BigQuery error loading embeddings: {e}")
+                return 0, len(embedding_records)
+    
     def validate_embeddings(self):
         """Validate embeddings in BigQuery"""
         
@@ -322,21 +808,28 @@ class EmbeddingGenerator:
                 SELECT 
                     person_id,
                     embedding_dim,
-                    LENGTH(embedding_text) as text_length,
+                    embedding_text_length as text_length,
+                    embedding_text_sha1,
                     created_at
                 FROM `{self.embeddings_table}`
                 LIMIT 5
             """
         }
         
-        for query_name, query in queries.items():
-            logger.info(f"\n{query_name}:")
-            try:
-                result = self.bq_client.query(query).result()
-                for row in result:
-                    logger.info(f"  {dict(row)}")
-            except Exception as e:
-                logger.error(f"Error running query: {e}")
+        # Independent queries: run them all at once, then report in order
+        with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_QUERIES) as executor:
+            futures = {
+                query_name: executor.submit(lambda q: list(self.bq_client.query(q).result()), query)
+                for query_name, query in queries.items()
+            }
+            
+            for query_name, future in futures.items():
+                logger.info(f"\n{query_name}:")
+                try:
+                    for row in future.result():
+                        logger.info(f"  {dict(row)}")
+                except Exception as e:
+                    logger.error(f"Error running query: {e}")
 
 
 def main():
@@ -350,27 +843,21 @@ def main():
     generator = EmbeddingGenerator()
     
     # Check if embeddings already exist locally
-    embeddings_file = os.path.join(config.DATA_DIR, "embeddings", "person_embeddings.json")
-    
-    if os.path.exists(embeddings_file):
-        logger.info(f"\n✓ Found existing embeddings at {embeddings_file}")
+    if os.path.exists(EMBEDDINGS_FILE):
+        logger.info(f"\n✓ Found existing embeddings at {EMBEDDINGS_FILE}")
         logger.info("Loading from local file instead of regenerating...")
-        embedding_records = generator.load_embeddings_from_local(embeddings_file)
+        embedding_records = generator.load_embeddings_from_local(EMBEDDINGS_FILE)
     else:
         logger.info("\nNo local embeddings found. Generating new embeddings...")
         # Generate embeddings for all persons
-        embedding_records = generator.process_and_embed_all(batch_size=5)
+        embedding_records = generator.process_and_embed_all()
     
     if not embedding_records:
         logger.error("No embeddings available. Exiting.")
         return
     
-    # Insert into BigQuery
-    logger.info("\nInserting embeddings into BigQuery...")
-    total_inserted, failed = generator.insert_embeddings_to_bigquery(
-        embedding_records, 
-        batch_size=100
-    )
+    # Load into BigQuery
+    total_inserted, failed = generator.insert_embeddings_to_bigquery(embedding_records)
     
     # Validate
     if total_inserted > 0:
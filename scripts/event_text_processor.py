@@ -10,10 +10,16 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from google.cloud import bigquery
-from typing import List, Dict, Any, Tuple
+from google.cloud import bigquery_storage
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import itertools
+from contextlib import nullcontext
+import multiprocessing
 import logging
-from datetime import datetime
-import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import date, datetime
+import orjson
 import config
 
 # Set up logging
@@ -27,80 +33,430 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns read for narratives, per table
+PERSON_COLUMNS = (
+    'person_id', 'wikidata_id', 'name', 'description', 'occupation', 'field_of_work',
+    'birth_date', 'death_date', 'birth_place', 'death_place',
+)
+EVENT_COLUMNS = (
+    'event_id', 'event_type', 'event_title', 'event_description', 'start_date', 'end_date',
+    'point_in_time', 'location', 'organization', 'role_or_degree', 'field_or_major',
+)
+
+
+# One shared str per distinct value of the repetitive event text fields
+# (organizations, places, award titles, ...), so the event set holds each
+# value once however many events repeat it
+_shared_strings: Dict[str, str] = {}
+
+
+def _shared(value: Optional[str]) -> Optional[str]:
+    """The shared copy of value (None and '' are returned as-is)"""
+    if not value:
+        return value
+    return _shared_strings.setdefault(value, value)
+
+
+def _shared_text(value: Optional[str]) -> Optional[str]:
+    """_shared for narrative text, with whitespace runs collapsed and the ends stripped"""
+    if not value:
+        return value
+    return _shared(' '.join(value.split()))
+
+
+@dataclass(slots=True)
+class Event:
+    """A life event row; fields are in EVENT_COLUMNS order"""
+    event_id: str
+    event_type: str
+    event_title: Optional[str]
+    event_description: Optional[str]
+    # Dates are datetime.date from BigQuery, or 'YYYY-MM-DD' strings
+    start_date: Any
+    end_date: Any
+    point_in_time: Any
+    location: Optional[str]
+    organization: Optional[str]
+    role_or_degree: Optional[str]
+    field_or_major: Optional[str]
+    # Set once from the fields; see is_event_valid_for_narrative
+    is_valid: bool = field(init=False)
+    
+    def __post_init__(self):
+        # Lowercased once here; narrative code compares it as-is. Text fields
+        # are whitespace-normalized here, whatever loaded the rows, so
+        # narratives can join their parts without a clean-up pass
+        self.event_type = _shared((self.event_type or '').lower())
+        self.event_title = _shared_text(self.event_title)
+        self.location = _shared_text(self.location)
+        self.organization = _shared_text(self.organization)
+        self.role_or_degree = _shared_text(self.role_or_degree)
+        self.field_or_major = _shared_text(self.field_or_major)
+        self.is_valid = bool(
+            (self.organization or self.event_title or self.location)
+            and (self.start_date or self.end_date or self.point_in_time)
+        )
+
+
+# Event types grouped together for the life narrative
+_EMPLOYMENT_TYPES = frozenset({'employment', 'position'})
+_WORK_TYPES = frozenset({'notable_work', 'participant_in', 'significant_event', 'sports_team'})
+_RESIDENCE_TYPES = frozenset({'residence', 'work_location'})
+
+# Narrative bucket of each event type; any other type goes to 'other'
+EVENT_BUCKET_NAMES = ('education', 'career', 'award', 'work', 'residence', 'other')
+_EVENT_BUCKETS = {
+    'education': 'education',
+    'award': 'award',
+    **dict.fromkeys(_EMPLOYMENT_TYPES, 'career'),
+    **dict.fromkeys(_WORK_TYPES, 'work'),
+    **dict.fromkeys(_RESIDENCE_TYPES, 'residence'),
+}
+
+
+# Every person LEFT JOINed to their events, each person's rows together and
+# in chronological order. Column lists are filled in here, once; project and
+# dataset are filled in per processor
+PERSONS_WITH_EVENTS_SQL = f"""
+        SELECT 
+            {', '.join(f'p.{column}' for column in PERSON_COLUMNS)},
+            {', '.join(f'e.{column}' for column in EVENT_COLUMNS)}
+        FROM `{{project}}.{{dataset}}.persons` p
+        LEFT JOIN `{{project}}.{{dataset}}.life_events` e
+            ON p.person_id = e.person_id
+        ORDER BY 
+            p.name,
+            p.person_id,
+            COALESCE(e.start_date, e.point_in_time, e.end_date, '9999-12-31') ASC
+        """
+
+# Joined rows fetched per result page
+QUERY_PAGE_SIZE = 10000
+
+# Worker processes building narratives (1 = build in this process).
+# Shipping a person's events to a worker and its result back costs about
+# four times as much as building the narrative, so a pool is opt-in and
+# only pays off with many spare cores. Persons are handed to the pool
+# NARRATIVE_BATCH_PERSONS at a time so the fetch keeps streaming instead of
+# being read into memory up front
+NARRATIVE_WORKERS = 1
+NARRATIVE_BATCH_PERSONS = 10000
+NARRATIVE_CHUNKSIZE = 32
+
+# Tokens are estimated at 4 characters each; narratives are truncated once,
+# here, to the embedding model's per-text input limit
+CHARS_PER_TOKEN = 4
+MAX_NARRATIVE_CHARS = config.EMBEDDING_MAX_INPUT_TOKENS * CHARS_PER_TOKEN
+
+
+def truncate_narrative(narrative: str) -> Tuple[str, bool]:
+    """
+    Cut a narrative to MAX_NARRATIVE_CHARS at the last word boundary
+    
+    Returns:
+        Tuple of (narrative, whether it was truncated)
+    """
+    if len(narrative) <= MAX_NARRATIVE_CHARS:
+        return narrative, False
+    cut = narrative.rfind(' ', 0, MAX_NARRATIVE_CHARS + 1)
+    return narrative[:cut if cut > 0 else MAX_NARRATIVE_CHARS], True
+
+
+# Indexed by month number; January is dropped from narratives, as a month
+# of 01 usually means only the year is known
+_MONTH_NAMES = (
+    None, 'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+)
+# Month names keyed by the two-digit text of 'YYYY-MM' strings, so the usual
+# form is looked up without parsing an int
+_MONTH_NAMES_BY_TEXT = {f"{month:02d}": _MONTH_NAMES[month] for month in range(2, 13)}
+
+
+def _format_date_object(date_value: date) -> str:
+    """'January 1973' style text for a date (year only in January)"""
+    if date_value.month == 1:
+        return str(date_value.year)
+    return f"{_MONTH_NAMES[date_value.month]} {date_value.year}"
+
+
+def _format_date_string(date_value: str) -> str:
+    """'January 1973' style text for a 'YYYY[-MM[-DD]]' string (year only for month 01)"""
+    year, sep, rest = date_value.partition('-')
+    month_text = rest.partition('-')[0]
+    if not sep or month_text == '01':
+        return year
+    month_name = _MONTH_NAMES_BY_TEXT.get(month_text)
+    if month_name is not None:
+        return f"{month_name} {year}"
+    try:
+        month = int(month_text)
+    except ValueError as e:
+        logger.warning("Error formatting date %s: %s", date_value, e)
+        return date_value
+    if 1 <= month <= 12:
+        return f"{_MONTH_NAMES[month]} {year}"
+    return year
+
+
+# Formatted dates and years are memoized: the same dates recur across events
+# and persons. Both are hashable as BigQuery returns them (date or str)
+DATE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_date_cached(date_value) -> str:
+    """format_date for a non-empty value"""
+    # Handle datetime.date objects from BigQuery
+    if hasattr(date_value, 'year'):
+        return _format_date_object(date_value)
+    return _format_date_string(str(date_value))
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _year_of(date_value) -> str:
+    """Year of a datetime.date or 'YYYY-...' string, as text"""
+    if hasattr(date_value, 'year'):
+        return str(date_value.year)
+    return str(date_value).partition('-')[0]
+
+
+# Event narrative handlers, one per event type. Each appends its clauses to
+# parts (which may already hold a temporal prefix) and returns False when the
+# event lacks what its type needs. has_in is True when parts already contain
+# an "in " clause.
+
+def _handle_education(event: Event, parts: List[str], has_in: bool) -> bool:
+    organization = event.organization
+    location = event.location
+    if not organization and not location:
+        return False  # Skip if no school/location
+    
+    field_or_major = event.field_or_major
+    if field_or_major:
+        parts.append(f"studied {field_or_major}")
+    else:
+        parts.append("studied")
+    
+    if organization:
+        parts.append(f"at {organization}")
+    elif location:
+        parts.append(f"in {location}")
+    
+    role_or_degree = event.role_or_degree
+    if role_or_degree:
+        parts.append(f"earning a {role_or_degree}")
+    return True
+
+
+def _handle_employment(event: Event, parts: List[str], has_in: bool) -> bool:
+    organization = event.organization
+    location = event.location
+    if not organization and not location:
+        return False  # Skip if no employer/location
+    
+    role_or_degree = event.role_or_degree
+    if role_or_degree:
+        parts.append(f"worked as {role_or_degree}")
+    else:
+        parts.append("worked")
+    
+    if organization:
+        parts.append(f"at {organization}")
+    elif location:
+        parts.append(f"in {location}")
+    
+    field_or_major = event.field_or_major
+    if field_or_major and not role_or_degree:
+        parts.append(f"in {field_or_major}")
+    return True
+
+
+def _handle_work_location(event: Event, parts: List[str], has_in: bool) -> bool:
+    location = event.location
+    organization = event.organization
+    if not location and not organization:
+        return False  # Skip if no location
+    
+    parts.append("worked in")
+    if location:
+        parts.append(location)
+    elif organization:
+        parts.append(f"the {organization} area")
+    return True
+
+
+def _handle_residence(event: Event, parts: List[str], has_in: bool) -> bool:
+    location = event.location
+    organization = event.organization
+    if not location and not organization:
+        return False  # Skip if no location
+    
+    parts.append("lived in")
+    if location:
+        parts.append(location)
+    elif organization:
+        parts.append(organization)
+    return True
+
+
+def _handle_award(event: Event, parts: List[str], has_in: bool) -> bool:
+    event_title = event.event_title
+    organization = event.organization
+    if not event_title and not organization:
+        return False  # Skip if no award name
+    
+    parts.append("received")
+    if event_title:
+        parts.append(event_title)
+        has_in = has_in or 'in ' in event_title
+    elif organization:
+        parts.append(f"an award from {organization}")
+        has_in = has_in or 'in ' in organization
+    
+    location = event.location
+    if location and not has_in:
+        parts.append(f"in {location}")
+    return True
+
+
+def _handle_notable_work(event: Event, parts: List[str], has_in: bool) -> bool:
+    event_title = event.event_title
+    organization = event.organization
+    if not event_title and not organization:
+        return False  # Skip if no work name
+    
+    parts.append("created")
+    if event_title:
+        parts.append(event_title)
+    elif organization:
+        parts.append(organization)
+    return True
+
+
+def _handle_participation(event: Event, parts: List[str], has_in: bool) -> bool:
+    event_title = event.event_title
+    organization = event.organization
+    if not event_title and not organization:
+        return False  # Skip if no event name
+    
+    # "participated in" is itself the "in " clause, so no location is added
+    parts.append("participated in")
+    if event_title:
+        parts.append(event_title)
+    elif organization:
+        parts.append(organization)
+    return True
+
+
+def _handle_sports_team(event: Event, parts: List[str], has_in: bool) -> bool:
+    organization = event.organization
+    if not organization:
+        return False  # Skip if no team name
+    
+    parts.append(f"played for {organization}")
+    
+    role_or_degree = event.role_or_degree
+    if role_or_degree:
+        parts.append(f"as {role_or_degree}")
+    return True
+
+
+def _handle_generic(event: Event, parts: List[str], has_in: bool) -> bool:
+    """Generic format for unknown event types"""
+    organization = event.organization
+    event_title = event.event_title
+    location = event.location
+    if organization:
+        parts.append(f"was associated with {organization}")
+    elif event_title:
+        parts.append(f"was involved in {event_title}")
+    elif location:
+        parts.append(f"was active in {location}")
+    else:
+        return False  # Skip if nothing meaningful
+    return True
+
+
+_EVENT_HANDLERS: Dict[str, Callable[[Event, List[str], bool], bool]] = {
+    'education': _handle_education,
+    'employment': _handle_employment,
+    'position': _handle_employment,
+    'work_location': _handle_work_location,
+    'residence': _handle_residence,
+    'award': _handle_award,
+    'notable_work': _handle_notable_work,
+    'significant_event': _handle_participation,
+    'participant_in': _handle_participation,
+    'sports_team': _handle_sports_team,
+}
+
+
+# Narrative-only processor of a pool worker, set by _init_narrative_worker
+_worker_processor = None
+
+
+def _init_narrative_worker():
+    global _worker_processor
+    _worker_processor = EventTextProcessor(connect=False)
+
+
+def _build_person_result(person_events: Tuple[Dict[str, Any], List["Event"]]):
+    """Pool entry point: build_person_result in a worker process"""
+    return _worker_processor.build_person_result(*person_events)
+
 
 class EventTextProcessor:
     """Processes life events into narrative text for embeddings"""
     
-    def __init__(self):
-        """Initialize BigQuery client"""
-        self.client = bigquery.Client(project=config.PROJECT_ID)
+    def __init__(self, connect: bool = True):
+        """
+        Initialize BigQuery clients
+        
+        Args:
+            connect: False for a processor that only builds narratives
+                (no BigQuery clients), as used in pool workers
+        """
         self.dataset_id = config.DATASET_ID
+        if not connect:
+            return
+        self.client = bigquery.Client(project=config.PROJECT_ID)
+        # Query results are downloaded as Arrow over the Storage Read API
+        self.bqstorage_client = bigquery_storage.BigQueryReadClient()
+        self._persons_with_events_sql = PERSONS_WITH_EVENTS_SQL.format(
+            project=config.PROJECT_ID, dataset=self.dataset_id)
         logger.info(f"Initialized EventTextProcessor for project: {config.PROJECT_ID}")
     
-    def fetch_all_persons(self) -> List[Dict[str, Any]]:
-        """Fetch all persons from BigQuery"""
-        
-        query = f"""
-        SELECT 
-            person_id,
-            wikidata_id,
-            name,
-            description,
-            occupation,
-            field_of_work,
-            birth_date,
-            death_date,
-            birth_place,
-            death_place
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.persons`
-        ORDER BY name
+    def fetch_all_persons_with_events(self) -> Iterator[Tuple[Dict[str, Any], List[Event]]]:
         """
+        Fetch every person with their life events in a single query
         
-        logger.info("Fetching all persons from BigQuery...")
-        result = self.client.query(query).result()
-        
-        persons = []
-        for row in result:
-            persons.append(dict(row))
-        
-        logger.info(f"Fetched {len(persons)} persons")
-        return persons
-    
-    def fetch_life_events_for_person(self, person_id: str) -> List[Dict[str, Any]]:
-        """Fetch all life events for a specific person, sorted chronologically"""
+        Persons are LEFT JOINed to their events and sorted by name, then
+        chronologically, so each person's rows arrive together and are
+        grouped as the result streams in. Rows arrive as Arrow record
+        batches from the Storage Read API (a single ordered stream, as the
+        query has an ORDER BY)
         
-        query = f"""
-        SELECT 
-            event_id,
-            event_type,
-            event_title,
-            event_description,
-            start_date,
-            end_date,
-            point_in_time,
-            location,
-            organization,
-            role_or_degree,
-            field_or_major
-        FROM `{config.PROJECT_ID}.{self.dataset_id}.life_events`
-        WHERE person_id = @person_id
-        ORDER BY 
-            COALESCE(start_date, point_in_time, end_date, '9999-12-31') ASC
+        Yields:
+            Tuples of (person, events sorted chronologically); persons
+            without events get an empty list
         """
         
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("person_id", "STRING", person_id)
-            ]
+        logger.info("Fetching all persons and life events from BigQuery...")
+        result = self.client.query(self._persons_with_events_sql).result(page_size=QUERY_PAGE_SIZE)
+        rows = itertools.chain.from_iterable(
+            batch.to_pylist() for batch in result.to_arrow_iterable(bqstorage_client=self.bqstorage_client)
         )
         
-        result = self.client.query(query, job_config=job_config).result()
-        
-        events = []
-        for row in result:
-            events.append(dict(row))
-        
-        return events
+        for _, person_rows in itertools.groupby(rows, key=lambda row: row['person_id']):
+            person_rows = list(person_rows)
+            person = {column: person_rows[0][column] for column in PERSON_COLUMNS}
+            # event_id is REQUIRED, so it is NULL only on the row of a person without events
+            events = [
+                Event(*[row[column] for column in EVENT_COLUMNS])
+                for row in person_rows if row['event_id'] is not None
+            ]
+            yield person, events
     
     def format_date(self, date_value) -> str:
         """
@@ -109,32 +465,9 @@ class EventTextProcessor:
         """
         if not date_value:
             return ""
-        
-        try:
-            # Handle datetime.date objects from BigQuery
-            if hasattr(date_value, 'year'):
-                year = str(date_value.year)
-                month = date_value.month if date_value.month != 1 else None
-            else:
-                # Handle string dates
-                parts = str(date_value).split('-')
-                year = parts[0]
-                month = int(parts[1]) if len(parts) > 1 and parts[1] != '01' else None
-            
-            month_names = {
-                1: 'January', 2: 'February', 3: 'March', 4: 'April',
-                5: 'May', 6: 'June', 7: 'July', 8: 'August',
-                9: 'September', 10: 'October', 11: 'November', 12: 'December'
-            }
-            
-            if month and month in month_names:
-                return f"{month_names[month]} {year}"
-            return year
-        except Exception as e:
-            logger.warning(f"Error formatting date {date_value}: {e}")
-            return str(date_value)
-    
-    def is_event_valid_for_narrative(self, event: Dict[str, Any]) -> bool:
+        return _format_date_cached(date_value)
+    
+    def is_event_valid_for_narrative(self, event: Event) -> bool:
         """
         Check if event has enough information to create a meaningful narrative
         
@@ -144,23 +477,12 @@ class EventTextProcessor:
         - location (for residence/work location)
         
         AND at least one temporal field (start_date, end_date, or point_in_time)
-        """
         
-        has_content = any([
-            event.get('organization'),
-            event.get('event_title'),
-            event.get('location')
-        ])
-        
-        has_temporal = any([
-            event.get('start_date'),
-            event.get('end_date'),
-            event.get('point_in_time')
-        ])
-        
-        return has_content and has_temporal
+        Computed once when the Event is built, as event.is_valid
+        """
+        return event.is_valid
     
-    def create_event_narrative(self, event: Dict[str, Any]) -> str:
+    def create_event_narrative(self, event: Event) -> str:
         """
         Create a natural language narrative for a single event
         Returns empty string if event lacks sufficient information
@@ -172,152 +494,38 @@ class EventTextProcessor:
         """
         
         # Skip if not enough information
-        if not self.is_event_valid_for_narrative(event):
+        if not event.is_valid:
             return ""
         
         parts = []
+        # Whether the text so far contains an "in " clause (e.g. "Starting in
+        # 1973"), in which case no "in <location>" is added
+        has_in = False
         
         # Temporal information
-        start_date = event.get('start_date')
-        end_date = event.get('end_date')
-        point_in_time = event.get('point_in_time')
+        start_date = event.start_date
+        end_date = event.end_date
+        point_in_time = event.point_in_time
         
         if start_date and end_date:
             parts.append(f"From {self.format_date(start_date)} to {self.format_date(end_date)}")
         elif start_date:
             parts.append(f"Starting in {self.format_date(start_date)}")
+            has_in = True
         elif point_in_time:
             parts.append(f"In {self.format_date(point_in_time)}")
         elif end_date:
             parts.append(f"Until {self.format_date(end_date)}")
         
-        # Event type verb mapping
-        event_type = event.get('event_type', '').lower()
-        
-        # Main content
-        organization = event.get('organization')
-        event_title = event.get('event_title')
-        location = event.get('location')
-        role_or_degree = event.get('role_or_degree')
-        field_or_major = event.get('field_or_major')
-        
-        # Build the narrative based on event type and available data
-        if event_type == 'education':
-            if not organization and not location:
-                return ""  # Skip if no school/location
-            
-            if field_or_major:
-                parts.append(f"studied {field_or_major}")
-            else:
-                parts.append("studied")
-            
-            if organization:
-                parts.append(f"at {organization}")
-            elif location:
-                parts.append(f"in {location}")
-            
-            if role_or_degree:
-                parts.append(f"earning a {role_or_degree}")
-                
-        elif event_type in ['employment', 'position']:
-            if not organization and not location:
-                return ""  # Skip if no employer/location
-            
-            if role_or_degree:
-                parts.append(f"worked as {role_or_degree}")
-            else:
-                parts.append("worked")
-            
-            if organization:
-                parts.append(f"at {organization}")
-            elif location:
-                parts.append(f"in {location}")
-            
-            if field_or_major and not role_or_degree:
-                parts.append(f"in {field_or_major}")
-                
-        elif event_type == 'work_location':
-            if not location and not organization:
-                return ""  # Skip if no location
-            
-            parts.append("worked in")
-            if location:
-                parts.append(location)
-            elif organization:
-                parts.append(f"the {organization} area")
-                
-        elif event_type == 'residence':
-            if not location and not organization:
-                return ""  # Skip if no location
-            
-            parts.append("lived in")
-            if location:
-                parts.append(location)
-            elif organization:
-                parts.append(organization)
-                
-        elif event_type == 'award':
-            if not event_title and not organization:
-                return ""  # Skip if no award name
-            
-            parts.append("received")
-            if event_title:
-                parts.append(event_title)
-            elif organization:
-                parts.append(f"an award from {organization}")
-            
-            if location and 'in ' not in ' '.join(parts):
-                parts.append(f"in {location}")
-                
-        elif event_type == 'notable_work':
-            if not event_title and not organization:
-                return ""  # Skip if no work name
-            
-            parts.append("created")
-            if event_title:
-                parts.append(event_title)
-            elif organization:
-                parts.append(organization)
-                
-        elif event_type in ['significant_event', 'participant_in']:
-            if not event_title and not organization:
-                return ""  # Skip if no event name
-            
-            parts.append("participated in")
-            if event_title:
-                parts.append(event_title)
-            elif organization:
-                parts.append(organization)
-            
-            if location and 'in ' not in ' '.join(parts):
-                parts.append(f"in {location}")
-                
-        elif event_type == 'sports_team':
-            if not organization:
-                return ""  # Skip if no team name
-            
-            parts.append(f"played for {organization}")
-            
-            if role_or_degree:
-                parts.append(f"as {role_or_degree}")
-        
-        else:
-            # Generic format for unknown event types
-            if organization:
-                parts.append(f"was associated with {organization}")
-            elif event_title:
-                parts.append(f"was involved in {event_title}")
-            elif location:
-                parts.append(f"was active in {location}")
-            else:
-                return ""  # Skip if nothing meaningful
+        handler = _EVENT_HANDLERS.get(event.event_type, _handle_generic)
+        if not handler(event, parts, has_in):
+            return ""
         
-        # Join parts into narrative
+        # Join parts into narrative; parts are never empty and carry no
+        # stray whitespace (Event normalizes its text fields), so no
+        # clean-up pass is needed
         narrative = ' '.join(parts)
         
-        # Clean up extra spaces
-        narrative = ' '.join(narrative.split())
-        
         # Ensure it ends with a period
         if narrative and not narrative.endswith('.'):
             narrative += '.'
@@ -362,11 +570,8 @@ class EventTextProcessor:
                 birth_info.append(f"born in {birth_place}")
             if birth_date:
                 # Handle both datetime.date objects and strings
-                if hasattr(birth_date, 'year'):
-                    birth_year = str(birth_date.year)
-                else:
-                    birth_year = str(birth_date).split('-')[0]
-                    
+                birth_year = _year_of(birth_date)
+                
                 if birth_info:
                     birth_info.append(f"in {birth_year}")
                 else:
@@ -378,116 +583,98 @@ class EventTextProcessor:
         biography = ' '.join(parts)
         return biography
     
-    def create_life_narrative(self, person: Dict[str, Any], events: List[Dict[str, Any]]) -> str:
+    def _partition_events(self, events: List[Event]) -> Tuple[Dict[str, List[Event]], int, int]:
+        """
+        Validate events once and group the valid ones by narrative bucket
+        
+        Returns:
+            Tuple of (valid events per EVENT_BUCKET_NAMES entry, in input
+            order; valid count; skipped count)
+        """
+        buckets = {name: [] for name in EVENT_BUCKET_NAMES}
+        valid_events = 0
+        
+        for event in events:
+            if event.is_valid:
+                valid_events += 1
+                buckets[_EVENT_BUCKETS.get(event.event_type, 'other')].append(event)
+        
+        return buckets, valid_events, len(events) - valid_events
+    
+    def create_life_narrative(self, person: Dict[str, Any], buckets: Dict[str, List[Event]]) -> str:
         """
         Create complete life narrative combining biography and chronological events
         Groups events by type and creates more natural flowing narratives
         
+        Args:
+            person: Person row
+            buckets: Valid events by bucket, from _partition_events
+        
         Format:
         [Biography] [Education] [Career] [Notable Works] [Awards] [Other Events]
         """
         
-        narratives = []
+        # Every sentence goes into out, joined once at the end
+        out = []
         
         # Add biography
         bio = self.create_person_biography(person)
         if bio:
-            narratives.append(bio)
-        
-        # Separate events by type
-        education_events = []
-        career_events = []
-        award_events = []
-        work_events = []
-        residence_events = []
-        other_events = []
+            out.append(bio)
         
-        valid_events = 0
-        skipped_events = 0
-        
-        for event in events:
-            if not self.is_event_valid_for_narrative(event):
-                skipped_events += 1
-                continue
-            
-            valid_events += 1
-            event_type = event.get('event_type', '').lower()
-            
-            if event_type == 'education':
-                education_events.append(event)
-            elif event_type in ['employment', 'position']:
-                career_events.append(event)
-            elif event_type == 'award':
-                award_events.append(event)
-            elif event_type in ['notable_work', 'participant_in', 'significant_event', 'sports_team']:
-                work_events.append(event)
-            elif event_type in ['residence', 'work_location']:
-                residence_events.append(event)
-            else:
-                other_events.append(event)
+        education_events = buckets['education']
+        career_events = buckets['career']
+        award_events = buckets['award']
+        work_events = buckets['work']
+        residence_events = buckets['residence']
         
         # Add education narrative
         if education_events:
-            edu_narrative = self._create_education_narrative(education_events)
-            if edu_narrative:
-                narratives.append(edu_narrative)
+            self._append_education_narrative(out, education_events)
         
         # Add career narrative
         if career_events:
-            career_narrative = self._create_career_narrative(career_events)
-            if career_narrative:
-                narratives.append(career_narrative)
+            self._append_career_narrative(out, career_events)
         
         # Add notable works
         if work_events:
-            for event in work_events[:5]:  # Limit to top 5 works
-                work_narrative = self.create_event_narrative(event)
-                if work_narrative:
-                    narratives.append(work_narrative)
+            self._append_event_narratives(out, work_events[:5])  # Limit to top 5 works
         
         # Add awards (summarized if many)
         if award_events:
-            award_narrative = self._create_awards_narrative(award_events)
-            if award_narrative:
-                narratives.append(award_narrative)
+            self._append_awards_narrative(out, award_events)
         
         # Add residence events (limit to avoid clutter)
         if residence_events:
-            for event in residence_events[:3]:  # Only first 3 residences
-                res_narrative = self.create_event_narrative(event)
-                if res_narrative:
-                    narratives.append(res_narrative)
-        
-        # Log if we skipped many events
-        if skipped_events > len(events) * 0.5:
-            logger.debug(f"Skipped {skipped_events}/{len(events)} events for {person.get('name')} due to missing information")
+            self._append_event_narratives(out, residence_events[:3])  # Only first 3 residences
         
         # Combine into single narrative
-        full_narrative = ' '.join(narratives)
-        
-        return full_narrative
+        return ' '.join(out)
     
-    def _create_education_narrative(self, education_events: List[Dict[str, Any]]) -> str:
-        """Create a flowing narrative for education events"""
+    def _append_event_narratives(self, out: List[str], events: List[Event]):
+        """Append the individual narrative of each event that has one"""
+        for event in events:
+            narrative = self.create_event_narrative(event)
+            if narrative:
+                out.append(narrative)
+    
+    def _append_education_narrative(self, out: List[str], education_events: List[Event]):
+        """Append a flowing narrative for education events"""
         
         if not education_events:
-            return ""
+            return
         
         # If only 1-2 education events, use individual narratives
         if len(education_events) <= 2:
-            narratives = []
-            for event in education_events:
-                narrative = self.create_event_narrative(event)
-                if narrative:
-                    narratives.append(narrative)
-            return ' '.join(narratives)
+            self._append_event_narratives(out, education_events)
+            return
         
         # If many education events, create summary
         schools = []
         for event in education_events:
-            org = event.get('organization')
-            degree = event.get('role_or_degree')
-            field = event.get('field_or_major')
+            org = event.organization
+            degree = event.role_or_degree
+            field = event.field_or_major
             
             if org:
                 school_info = org
@@ -502,34 +689,28 @@ class EventTextProcessor:
         
         if schools:
             if len(schools) == 1:
-                return f"Studied at {schools[0]}."
+                out.append(f"Studied at {schools[0]}.")
             elif len(schools) == 2:
-                return f"Studied at {schools[0]} and {schools[1]}."
+                out.append(f"Studied at {schools[0]} and {schools[1]}.")
             else:
-                return f"Educated at {', '.join(schools[:3])}."
-        
-        return ""
+                out.append(f"Educated at {', '.join(schools[:3])}.")
     
-    def _create_career_narrative(self, career_events: List[Dict[str, Any]]) -> str:
-        """Create a flowing narrative for career events"""
+    def _append_career_narrative(self, out: List[str], career_events: List[Event]):
+        """Append a flowing narrative for career events"""
         
         if not career_events:
-            return ""
+            return
         
         # If only 1-2 positions, use individual narratives
         if len(career_events) <= 2:
-            narratives = []
-            for event in career_events:
-                narrative = self.create_event_narrative(event)
-                if narrative:
-                    narratives.append(narrative)
-            return ' '.join(narratives)
+            self._append_event_narratives(out, career_events)
+            return
         
         # If many positions, create summary
         positions = []
         for event in career_events[:5]:  # Limit to 5 most significant
-            org = event.get('organization')
-            role = event.get('role_or_degree')
+            org = event.organization
+            role = event.role_or_degree
             
             if org:
                 if role:
@@ -539,35 +720,28 @@ class EventTextProcessor:
         
         if positions:
             if len(positions) == 1:
-                return f"Worked as {positions[0]}."
+                out.append(f"Worked as {positions[0]}.")
             elif len(positions) == 2:
-                return f"Career included positions at {positions[0]} and {positions[1]}."
+                out.append(f"Career included positions at {positions[0]} and {positions[1]}.")
             else:
-                return f"Career included positions at {', '.join(positions[:4])}."
-        
-        return ""
+                out.append(f"Career included positions at {', '.join(positions[:4])}.")
     
-    def _create_awards_narrative(self, award_events: List[Dict[str, Any]]) -> str:
-        """Create a flowing narrative for awards"""
+    def _append_awards_narrative(self, out: List[str], award_events: List[Event]):
+        """Append a flowing narrative for awards"""
         
         if not award_events:
-            return ""
+            return
         
         # If only 1-2 awards, use individual narratives
         if len(award_events) <= 2:
-            narratives = []
-            for event in award_events:
-                narrative = self.create_event_narrative(event)
-                if narrative:
-                    narratives.append(narrative)
-            return ' '.join(narratives)
+            self._append_event_narratives(out, award_events)
+            return
         
         # If many awards, create summary
         awards = []
         for event in award_events[:6]:  # Limit to top 6 awards
-            title = event.get('event_title')
-            org = event.get('organization')
-            year = event.get('point_in_time') or event.get('start_date')
+            title = event.event_title
+            year = event.point_in_time or event.start_date
             
             if title:
                 if year:
@@ -579,133 +753,174 @@ class EventTextProcessor:
         if awards:
             if len(awards) <= 3:
                 award_list = ', '.join(awards[:-1]) + f" and {awards[-1]}" if len(awards) > 1 else awards[0]
-                return f"Received honors including {award_list}."
+                out.append(f"Received honors including {award_list}.")
             else:
-                return f"Received numerous honors including {', '.join(awards[:4])} among others."
-        
-        return ""
+                out.append(f"Received numerous honors including {', '.join(awards[:4])} among others.")
     
-    def process_all_persons(self) -> List[Tuple[str, str, str, str]]:
+    def process_all_persons(self) -> List[Tuple[str, str, str, Dict[str, Any]]]:
         """
         Process all persons and create narratives
         
         Returns:
-            List of tuples: (person_id, name, narrative_text, metadata_json)
+            List of tuples: (person_id, name, narrative_text, metadata)
+        """
+        return list(self.process_all_persons_iter())
+    
+    def build_person_result(self, person: Dict[str, Any], events: List[Event]) -> Tuple[str, str, str, Dict[str, Any]]:
+        """
+        Build one person's narrative and its tracking metadata
+        
+        Returns:
+            Tuple of (person_id, name, narrative_text, metadata)
+        """
+        person_id = person['person_id']
+        name = person['name']
+        
+        # Validate and group events once
+        buckets, valid_count, skipped_count = self._partition_events(events)
+        
+        # Log if we skipped many events
+        if skipped_count > len(events) * 0.5:
+            logger.debug("Skipped %d/%d events for %s due to missing information", skipped_count, len(events), name)
+        
+        # Create narrative, cut to what the embedding model reads
+        narrative, truncated = truncate_narrative(self.create_life_narrative(person, buckets))
+        
+        # Create metadata (for tracking)
+        metadata = {
+            'person_id': person_id,
+            'name': name,
+            'wikidata_id': person.get('wikidata_id'),
+            'total_events': len(events),
+            'valid_events': valid_count,
+            'skipped_events': skipped_count,
+            'narrative_length': len(narrative),
+            'truncated': truncated
+        }
+        return person_id, name, narrative, metadata
+    
+    def _build_person_results(self, pool) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Build every person's result in fetch order, in pool if one is given"""
+        persons = self.fetch_all_persons_with_events()
+        if pool is None:
+            for person, events in persons:
+                yield self.build_person_result(person, events)
+            return
+        
+        while True:
+            batch = list(itertools.islice(persons, NARRATIVE_BATCH_PERSONS))
+            if not batch:
+                return
+            yield from pool.imap(_build_person_result, batch, chunksize=NARRATIVE_CHUNKSIZE)
+    
+    def process_all_persons_iter(self, workers: int = NARRATIVE_WORKERS) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """
+        Process all persons, yielding each narrative as soon as it is built
+        
+        Args:
+            workers: Processes building narratives; with more than 1 they are
+                built in a pool of spawned processes, still yielded in fetch
+                order
+        
+        Yields:
+            Tuples of (person_id, name, narrative_text, metadata)
         """
         
         logger.info("="*60)
         logger.info("PROCESSING ALL PERSONS FOR EMBEDDING")
         logger.info("="*60)
         
-        persons = self.fetch_all_persons()
-        results = []
+        processed = 0
         
         total_events = 0
         total_valid_events = 0
         total_skipped_events = 0
         
-        for i, person in enumerate(persons, 1):
-            person_id = person['person_id']
-            name = person['name']
-            
-            # Fetch events
-            events = self.fetch_life_events_for_person(person_id)
-            total_events += len(events)
-            
-            # Count valid events
-            valid_count = sum(1 for e in events if self.is_event_valid_for_narrative(e))
-            skipped_count = len(events) - valid_count
-            total_valid_events += valid_count
-            total_skipped_events += skipped_count
-            
-            # Create narrative
-            narrative = self.create_life_narrative(person, events)
-            
-            # Create metadata (for tracking)
-            metadata = {
-                'person_id': person_id,
-                'name': name,
-                'wikidata_id': person.get('wikidata_id'),
-                'total_events': len(events),
-                'valid_events': valid_count,
-                'skipped_events': skipped_count,
-                'narrative_length': len(narrative)
-            }
-            
-            results.append((person_id, name, narrative, str(metadata)))
-            
-            # Progress logging
-            if i % 50 == 0:
-                logger.info(f"Processed {i}/{len(persons)} persons")
-            
-            # Log sample for first person
-            if i == 1:
-                logger.info(f"\nSample narrative for: {name}")
-                logger.info(f"Total events: {len(events)}")
-                logger.info(f"Valid events: {valid_count}")
-                logger.info(f"Skipped events: {skipped_count}")
-                logger.info(f"Narrative length: {len(narrative)} characters")
-                logger.info(f"Preview: {narrative[:500]}...")
-        
-        logger.info(f"\n✓ Processed {len(results)} person narratives")
+        # Workers are spawned, not forked: this may run on a producer thread of
+        # a process holding live gRPC clients and a logging listener thread
+        spawn = multiprocessing.get_context('spawn')
+        with (spawn.Pool(workers, initializer=_init_narrative_worker) if workers > 1 else nullcontext()) as pool:
+            for i, (person_id, name, narrative, metadata) in enumerate(self._build_person_results(pool), 1):
+                total_events += metadata['total_events']
+                total_valid_events += metadata['valid_events']
+                total_skipped_events += metadata['skipped_events']
+                
+                yield person_id, name, narrative, metadata
+                processed += 1
+                
+                # Progress logging
+                if i % 50 == 0:
+                    logger.info("Processed %d persons", i)
+                
+                # Log sample for first person
+                if i == 1 and logger.isEnabledFor(logging.INFO):
+                    logger.info("\nSample narrative for: %s", name)
+                    logger.info("Total events: %d", metadata['total_events'])
+                    logger.info("Valid events: %d", metadata['valid_events'])
+                    logger.info("Skipped events: %d", metadata['skipped_events'])
+                    logger.info("Narrative length: %d characters", len(narrative))
+                    logger.info("Preview: %s...", narrative[:500])
+        
+        logger.info(f"\n✓ Processed {processed} person narratives")
         logger.info(f"Event statistics:")
         logger.info(f"  Total events: {total_events}")
         logger.info(f"  Valid events: {total_valid_events} ({total_valid_events/total_events*100:.1f}%)")
         logger.info(f"  Skipped events: {total_skipped_events} ({total_skipped_events/total_events*100:.1f}%)")
-        
-        return results
-
 
 def main():
     """Test the event text processor"""
     
     processor = EventTextProcessor()
     
-    # Process all persons
-    results = processor.process_all_persons()
-    
-    # Save processed narratives to file
-    output_file = os.path.join(config.DATA_DIR, "processed", "person_narratives.json")
+    # Save processed narratives as they are built, one JSON record per line
+    output_file = os.path.join(config.DATA_DIR, "processed", "person_narratives.ndjson")
     logger.info(f"\nSaving processed narratives to {output_file}...")
     
-    narratives_data = []
-    for person_id, name, narrative, metadata in results:
-        narratives_data.append({
-            'person_id': person_id,
-            'name': name,
-            'narrative': narrative,
-            'metadata': eval(metadata)  # Convert string back to dict
-        })
+    count = 0
+    total_length = 0
+    min_length = None
+    max_length = 0
+    samples = []
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(narratives_data, f, indent=2, ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        for person_id, name, narrative, metadata in processor.process_all_persons_iter():
+            f.write(orjson.dumps({
+                'person_id': person_id,
+                'name': name,
+                'narrative': narrative,
+                'metadata': metadata
+            }))
+            f.write(b'\n')
+            
+            count += 1
+            total_length += len(narrative)
+            min_length = len(narrative) if min_length is None else min(min_length, len(narrative))
+            max_length = max(max_length, len(narrative))
+            if len(samples) < 3:
+                samples.append((name, narrative))
     
-    logger.info(f"✓ Saved {len(narratives_data)} narratives to {output_file}")
+    logger.info(f"✓ Saved {count} narratives to {output_file}")
     
     # Show statistics
     logger.info("\n" + "="*60)
     logger.info("NARRATIVE STATISTICS")
     logger.info("="*60)
     
-    narrative_lengths = [len(narrative) for _, _, narrative, _ in results]
-    
-    logger.info(f"Total persons: {len(results)}")
-    logger.info(f"Average narrative length: {sum(narrative_lengths) / len(narrative_lengths):.0f} characters")
-    logger.info(f"Min narrative length: {min(narrative_lengths)}")
-    logger.info(f"Max narrative length: {max(narrative_lengths)}")
+    logger.info(f"Total persons: {count}")
+    logger.info(f"Average narrative length: {total_length / count:.0f} characters")
+    logger.info(f"Min narrative length: {min_length}")
+    logger.info(f"Max narrative length: {max_length}")
     
     # Show sample narratives
     logger.info("\n" + "="*60)
     logger.info("SAMPLE NARRATIVES")
     logger.info("="*60)
     
-    for i in range(min(3, len(results))):
-        person_id, name, narrative, _ = results[i]
+    for i, (name, narrative) in enumerate(samples):
         logger.info(f"\n{i+1}. {name}")
         logger.info(f"   {narrative[:400]}...")
     
     logger.info("\n✓ Event text processing complete")
 
-
 if __name__ == "__main__":
     main()